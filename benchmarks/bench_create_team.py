@@ -0,0 +1,123 @@
+"""
+Cost of the "owns an unfinished team" check done by ``create_team`` for a
+user who belongs to many teams: loading every team the user is in vs one
+EXISTS probe on the ``(owner_id, status)`` index.
+
+    python -m benchmarks.bench_create_team --memberships 10 100 1000 5000
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+
+from sqlalchemy import exists, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import src  # noqa: F401  register every model
+from src.accounts.crud import get_user_teams
+from src.accounts.models import User
+from src.models import Base
+from src.teams.crud import UNFINISHED_STATUSES, owns_unfinished_team
+from src.teams.models import StatusChoices, Team, UserTeam
+
+
+async def load_all_teams(session: AsyncSession, user_id: int) -> bool:
+    """The check ``create_team`` used to run."""
+    teams = await get_user_teams(user_id=user_id, session=session, is_paginate=False)
+    return any(
+        team.owner_id == user_id and team.status != StatusChoices.READY
+        for team in teams
+    )
+
+
+async def timed(coro_factory, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await coro_factory()
+    return (time.perf_counter() - start) / repeat
+
+
+async def seed(session: AsyncSession, memberships: int, others: int) -> int:
+    user_id = await session.scalar(
+        insert(User)
+        .values(
+            first_name="Busy",
+            last_name="Member",
+            email="busy@example.com",
+            hashed_password="",
+        )
+        .returning(User.id)
+    )
+    team_ids = (
+        await session.scalars(
+            insert(Team).returning(Team.id),
+            [
+                {
+                    "title": f"Team {index}",
+                    "project_name": "Project",
+                    "description": "",
+                    # Owned teams are finished, so the check has to look at all.
+                    "owner_id": user_id if index % 10 == 0 else user_id + 1 + index,
+                    "status": StatusChoices.READY,
+                }
+                for index in range(memberships + others)
+            ],
+        )
+    ).all()
+    await session.execute(
+        insert(UserTeam),
+        [
+            {"user_id": user_id, "team_id": team_id}
+            for team_id in team_ids[:memberships]
+        ],
+    )
+    await session.commit()
+    return user_id
+
+
+async def main(memberships: list[int], others: int, repeat: int):
+    for count in memberships:
+        with tempfile.NamedTemporaryFile(suffix=".sqlite3") as db:
+            engine = create_async_engine(f"sqlite+aiosqlite:///{db.name}")
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            session_maker = sessionmaker(engine, class_=AsyncSession)
+            async with session_maker() as session:
+                user_id = await seed(session, count, others)
+                assert not await load_all_teams(session, user_id)
+                assert not await owns_unfinished_team(session, user_id)
+
+                legacy = await timed(lambda: load_all_teams(session, user_id), repeat)
+                session.expunge_all()
+                probe = await timed(
+                    lambda: owns_unfinished_team(session, user_id), repeat
+                )
+                print(f"{count} memberships, {count + others} teams")
+                print(f"  load all teams  {legacy * 1e3:8.3f} ms")
+                print(f"  EXISTS          {probe * 1e3:8.3f} ms")
+            await engine.dispose()
+
+    async with create_async_engine("sqlite+aiosqlite://").begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        query = select(
+            exists().where(
+                Team.owner_id == 1, Team.status.in_(UNFINISHED_STATUSES)
+            )
+        )
+        compiled = query.compile(
+            conn.sync_connection, compile_kwargs={"literal_binds": True}
+        )
+        plan = await conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+        print("plan: " + "; ".join(row[-1] for row in plan))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--memberships", type=int, nargs="+", default=[10, 100, 1000, 5000]
+    )
+    parser.add_argument("--others", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.memberships, args.others, args.repeat))
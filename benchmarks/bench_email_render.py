@@ -0,0 +1,55 @@
+"""
+Email body rendering: Starlette ``TemplateResponse`` round trip vs the
+precompiled ``EmailTemplates`` renderer.
+
+    python -m benchmarks.bench_email_render --iterations 5000
+"""
+import argparse
+import timeit
+
+from fastapi.templating import Jinja2Templates
+
+from src.config import BASE_DIR
+from src.emails.templates import EmailTemplates
+
+CONTEXT = {
+    "url": "http://localhost:3000/forgot-password/token",
+    "first_name": "Test",
+    "last_name": "User",
+}
+NAME = "forgot_password_confirmation.html"
+
+
+def main(iterations: int):
+    starlette_templates = Jinja2Templates(directory=f"{BASE_DIR}/src/emails")
+    email_templates = EmailTemplates(BASE_DIR / "src" / "emails", minify=False)
+    minified_templates = EmailTemplates(BASE_DIR / "src" / "emails", minify=True)
+
+    def template_response():
+        return starlette_templates.TemplateResponse(
+            request=None,
+            name=NAME,
+            context=CONTEXT,
+            media_type="text/html",
+        ).body.decode("utf-8")
+
+    cases = {
+        "TemplateResponse": template_response,
+        "EmailTemplates": lambda: email_templates.render(NAME, **CONTEXT),
+        "EmailTemplates (minified)": lambda: minified_templates.render(
+            NAME, **CONTEXT
+        ),
+    }
+    for label, func in cases.items():
+        seconds = timeit.timeit(func, number=iterations)
+        print(
+            f"{label:<26} {seconds / iterations * 1e6:8.1f} us/render"
+            f"  {len(func().encode()):6d} bytes"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+    main(args.iterations)
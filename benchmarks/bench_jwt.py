@@ -0,0 +1,57 @@
+"""
+Auth overhead per request: a fresh ``JWTStrategy`` decoding the bearer
+token every time vs the shared ``CachedJWTStrategy``.
+
+    python -m benchmarks.bench_jwt --requests 20000
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi_users import IntegerIDMixin
+from fastapi_users.authentication import JWTStrategy
+
+from src.accounts.config import SECRET
+from src.accounts.strategy import CachedJWTStrategy
+
+
+class User:
+    id = 1
+
+
+class UserManager(IntegerIDMixin):
+    """Stands in for the database-backed manager so only JWT work is timed."""
+
+    async def get(self, id):
+        return User()
+
+
+async def bench(get_strategy, token: str, requests: int) -> float:
+    user_manager = UserManager()
+    start = time.perf_counter()
+    for _ in range(requests):
+        await get_strategy().read_token(token, user_manager)
+    return time.perf_counter() - start
+
+
+async def main(requests: int):
+    token = await JWTStrategy(secret=SECRET, lifetime_seconds=3600).write_token(
+        User()
+    )
+    cached_strategy = CachedJWTStrategy(secret=SECRET, lifetime_seconds=3600)
+    cases = {
+        "JWTStrategy per request": lambda: JWTStrategy(
+            secret=SECRET, lifetime_seconds=3600
+        ),
+        "CachedJWTStrategy": lambda: cached_strategy,
+    }
+    for label, get_strategy in cases.items():
+        seconds = await bench(get_strategy, token, requests)
+        print(f"{label:<24} {seconds / requests * 1e6:8.2f} us/request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,94 @@
+"""
+What the ``/metrics`` instrumentation costs: one counter increment and one
+histogram observation, a trivial FastAPI endpoint with and without
+``MetricsMiddleware``, and rendering a scrape of ``--routes`` route series.
+
+    python -m benchmarks.bench_metrics --requests 2000
+"""
+import argparse
+import asyncio
+import time
+import timeit
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from src.metrics import Counter, Histogram, MetricsMiddleware, Registry
+
+
+def per_call(statement: str, number: int, **namespace) -> float:
+    timer = timeit.Timer(statement, globals=namespace)
+    return min(timer.repeat(repeat=5, number=number)) / number
+
+
+def build_app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def cpu_per_request(apps: list[FastAPI], count: int, rounds: int = 5):
+    """Best CPU time per request of each app, over interleaved rounds."""
+    clients = [
+        AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+        for app in apps
+    ]
+    best = [float("inf")] * len(apps)
+    for _ in range(rounds):
+        for index, client in enumerate(clients):
+            start = time.process_time()
+            for item_id in range(count):
+                await client.get(f"/items/{item_id}")
+            best[index] = min(best[index], (time.process_time() - start) / count)
+    for client in clients:
+        await client.aclose()
+    return best
+
+
+async def main(count: int, routes: int):
+    registry = Registry()
+    counter = Counter("c_total", "c", ("method", "route", "status"), registry=registry)
+    histogram = Histogram("h_seconds", "h", ("method", "route"), registry=registry)
+    number = 200_000
+    inc = per_call(
+        "counter.inc('GET', '/teams/{team_id}', '200')", number, counter=counter
+    )
+    observe = per_call(
+        "histogram.observe(0.0123, 'GET', '/teams/{team_id}')",
+        number,
+        histogram=histogram,
+    )
+    print(f"Counter.inc        {inc * 1e9:8.0f} ns")
+    print(f"Histogram.observe  {observe * 1e9:8.0f} ns")
+
+    plain, instrumented = await cpu_per_request(
+        [build_app(instrumented=False), build_app(instrumented=True)], count
+    )
+    print(f"GET /items/{{id}}     {plain * 1e6:8.1f} us CPU/request")
+    print(
+        f"  + MetricsMiddleware {instrumented * 1e6:6.1f} us CPU/request"
+        f" ({(instrumented - plain) * 1e6:+.1f} us,"
+        f" {(instrumented / plain - 1) * 100:+.1f}%)"
+    )
+
+    for route in range(routes):
+        for status_code in ("200", "404"):
+            counter.inc("GET", f"/route/{route}/{{id}}", status_code)
+        histogram.observe(0.01, "GET", f"/route/{route}/{{id}}")
+    scrape = per_call("registry.render()", 20, registry=registry)
+    size = len(registry.render())
+    print(f"scrape, {routes} routes   {scrape * 1e3:6.2f} ms, {size} B")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--routes", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.routes))
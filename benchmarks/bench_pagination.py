@@ -0,0 +1,83 @@
+"""
+Deep page latency on ``GET /teams``: OFFSET/LIMIT plus COUNT(*) vs keyset
+(cursor) pagination without a total.
+
+    python -m benchmarks.bench_pagination --teams 60000 --page 1000
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+
+from fastapi_pagination import Params
+from fastapi_pagination.ext.sqlalchemy import paginate
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import src  # noqa: F401  register every model
+from src.models import Base
+from src.pagination import CursorParams, encode_cursor, paginate_keyset
+from src.teams.crud import teams_query
+from src.teams.models import Team
+
+
+async def timed(coro_factory, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await coro_factory()
+    return (time.perf_counter() - start) / repeat
+
+
+async def main(teams: int, page: int, size: int, repeat: int):
+    with tempfile.NamedTemporaryFile(suffix=".sqlite3") as db:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db.name}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(
+                insert(Team),
+                [
+                    {
+                        "title": f"Team {index}",
+                        "project_name": "Project",
+                        "description": "",
+                        "owner_id": index,
+                    }
+                    for index in range(teams)
+                ],
+            )
+        session_maker = sessionmaker(engine, class_=AsyncSession)
+        async with session_maker() as session:
+            query = teams_query(session, None, None, None)
+            offset = (page - 1) * size
+            last_id = await session.scalar(
+                select(Team.id).order_by(Team.id).offset(offset - 1).limit(1)
+            )
+            params = CursorParams(cursor=encode_cursor([last_id]), size=size)
+
+            async def offset_page():
+                return await paginate(
+                    session, query.order_by(Team.id), Params(page=page, size=size)
+                )
+
+            async def keyset_page():
+                return await paginate_keyset(session, query, (Team.id,), params)
+
+            offset_items = [team.id for team in (await offset_page()).items]
+            keyset_items = [team.id for team in (await keyset_page()).items]
+            assert offset_items == keyset_items
+
+            print(f"{teams} teams, page {page} of size {size}")
+            print(f"  OFFSET + COUNT  {await timed(offset_page, repeat) * 1e3:8.2f} ms")
+            print(f"  keyset          {await timed(keyset_page, repeat) * 1e3:8.2f} ms")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--teams", type=int, default=60000)
+    parser.add_argument("--page", type=int, default=1000)
+    parser.add_argument("--size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.teams, args.page, args.size, args.repeat))
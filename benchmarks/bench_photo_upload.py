@@ -0,0 +1,93 @@
+"""
+Event-loop lag while photo uploads are processed: the old inline path
+(read everything, blocking write, Pillow on the loop) vs ``PhotoProcessor``
+(re-encoding in its thread pool).
+
+    python -m benchmarks.bench_photo_upload --uploads 16
+"""
+import argparse
+import asyncio
+import io
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from PIL import Image
+from starlette.datastructures import UploadFile
+
+from src.accounts.photos import PhotoProcessor
+
+
+def sample_photo(size: int) -> bytes:
+    """A JPEG close to the upload limit: noise does not compress well."""
+    rng = random.Random(0)
+    image = Image.frombytes("RGB", (size, size), rng.randbytes(size * size * 3))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=80)
+    return buffer.getvalue()
+
+
+def upload(content: bytes) -> UploadFile:
+    file = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    file.write(content)
+    file.seek(0)
+    return UploadFile(file, size=len(content), filename="avatar.jpg")
+
+
+async def inline(file: UploadFile, directory: Path) -> str:
+    """What ``upload_user_photo`` used to do, on the event loop."""
+    name = f"{directory}/{uuid.uuid4()}.jpg"
+    content = await file.read()
+    with open(name, "wb") as f:
+        f.write(content)
+    img = Image.open(name)
+    img.save(name, optimize=True)
+    return name
+
+
+async def monitor(lags: list, interval: float, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run(label: str, handler, content: bytes, uploads: int):
+    lags = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(monitor(lags, 0.005, stop))
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    await asyncio.gather(*(handler(upload(content)) for _ in range(uploads)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    lags.sort()
+    p99 = lags[int(len(lags) * 0.99) - 1]
+    print(
+        f"  {label:<16} {elapsed * 1e3:8.1f} ms total"
+        f"  loop lag p50 {statistics.median(lags) * 1e3:6.2f} ms"
+        f"  p99 {p99 * 1e3:7.2f} ms  max {lags[-1] * 1e3:7.2f} ms"
+    )
+
+
+async def main(uploads: int, size: int, workers: int):
+    content = sample_photo(size)
+    print(f"{uploads} concurrent uploads of {len(content) / 1024:.0f} KiB")
+    with tempfile.TemporaryDirectory() as directory:
+        processor = PhotoProcessor(directory=Path(directory), workers=workers)
+        await run("inline", lambda f: inline(f, Path(directory)), content, uploads)
+        await run("thread pool", processor.save, content, uploads)
+        processor.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uploads", type=int, default=16)
+    parser.add_argument("--size", type=int, default=900)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+    asyncio.run(main(args.uploads, args.size, args.workers))
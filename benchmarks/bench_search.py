@@ -0,0 +1,74 @@
+"""
+Team title search latency: ``LIKE '%x%'`` full scan vs the trigram FTS5
+index, at growing table sizes.
+
+    python -m benchmarks.bench_search --sizes 10000 100000
+"""
+import argparse
+import random
+import string
+import tempfile
+import time
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+
+import src  # noqa: F401  register every model and the FTS DDL
+from src.models import Base
+from src.search.fts import apply_search, team_terms, teams_fts
+from src.teams.models import Team
+
+
+def word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+
+
+def seed(session: Session, size: int, rng: random.Random):
+    rows = [
+        {
+            "title": f"{word(rng)} {word(rng)}",
+            "project_name": word(rng),
+            "description": " ".join(word(rng) for _ in range(12)),
+            "owner_id": index,
+        }
+        for index in range(size)
+    ]
+    session.execute(insert(Team), rows)
+    session.commit()
+
+
+def timed(session: Session, query, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        session.execute(query).all()
+    return (time.perf_counter() - start) / repeat
+
+
+def main(sizes: list[int], repeat: int):
+    rng = random.Random(42)
+    for size in sizes:
+        with tempfile.NamedTemporaryFile(suffix=".sqlite3") as db:
+            engine = create_engine(f"sqlite:///{db.name}")
+            Base.metadata.create_all(engine)
+            with Session(engine) as session:
+                seed(session, size, rng)
+                term = session.scalar(select(Team.title).limit(1)).split()[0][1:5]
+                like = select(Team).filter(Team.title.contains(term)).limit(50)
+                fts = apply_search(
+                    select(Team), Team, teams_fts, team_terms(title=term), "sqlite"
+                ).limit(50)
+                count = select(func.count()).select_from(Team)
+                print(
+                    f"{session.scalar(count):>7} teams  term={term!r}"
+                    f"  LIKE {timed(session, like, repeat) * 1e3:7.2f} ms"
+                    f"  FTS5 {timed(session, fts, repeat) * 1e3:7.2f} ms"
+                )
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.sizes, args.repeat)
@@ -0,0 +1,160 @@
+"""
+CPU time to turn one ``GET /teams`` page of ORM rows into a response, from
+the previous path (``EmailStr`` re-validated for every member, pathlib-based
+photo URLs, stdlib ``json``) to the current one, one change at a time. Rows
+are loaded once, so the database is not part of the measurement.
+
+    python -m benchmarks.bench_serialization --teams 50 --members 8
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi_pagination import Page, add_pagination, paginate
+from fastapi_pagination.utils import disable_installed_extensions_check
+from httpx import ASGITransport, AsyncClient
+from pydantic import EmailStr, computed_field
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import selectinload, sessionmaker
+
+import src  # noqa: F401  register every model
+from src.accounts.models import User
+from src.accounts.photos import PHOTO_URL, VARIANT_EXTENSIONS
+from src.accounts.schemas import UserRead
+from src.config import PHOTO_VARIANT_FORMATS, PHOTO_VARIANT_SIZES
+from src.models import Base
+from src.teams.models import Team, UserTeam
+from src.teams.schemas import Team as TeamRead
+
+
+class PathUrlsUserRead(UserRead):
+    @computed_field
+    @property
+    def photo_urls(self) -> dict[int, dict[str, str]]:
+        if not self.photo:
+            return {}
+        return {
+            size: {
+                image_format: (
+                    f"{PHOTO_URL}/{Path(self.photo).stem}_{size}"
+                    f".{VARIANT_EXTENSIONS[image_format]}"
+                )
+                for image_format in PHOTO_VARIANT_FORMATS
+            }
+            for size in PHOTO_VARIANT_SIZES
+        }
+
+
+class PreviousUserRead(PathUrlsUserRead):
+    email: EmailStr
+
+
+class PathUrlsTeamRead(TeamRead):
+    members: list[PathUrlsUserRead]
+
+
+class PreviousTeamRead(TeamRead):
+    members: list[PreviousUserRead]
+
+
+async def load_rows(teams: int, members: int) -> list[Team]:
+    with tempfile.NamedTemporaryFile(suffix=".sqlite3") as db:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db.name}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(
+                insert(User),
+                [
+                    {
+                        "first_name": f"First{index}",
+                        "last_name": f"Last{index}",
+                        "email": f"member{index}@bitbuddies.example.com",
+                        "hashed_password": "x",
+                        "photo": f"{index:064x}.jpg",
+                    }
+                    for index in range(teams * members)
+                ],
+            )
+            await conn.execute(
+                insert(Team),
+                [
+                    {
+                        "title": f"Team {index}",
+                        "project_name": "Project",
+                        "description": "A team " * 20,
+                        "owner_id": index * members + 1,
+                        "member_count": members,
+                    }
+                    for index in range(teams)
+                ],
+            )
+            await conn.execute(
+                insert(UserTeam),
+                [
+                    {"user_id": team * members + member + 1, "team_id": team + 1}
+                    for team in range(teams)
+                    for member in range(members)
+                ],
+            )
+        session_maker = sessionmaker(engine, class_=AsyncSession)
+        async with session_maker() as session:
+            rows = (
+                await session.scalars(
+                    select(Team).options(selectinload(Team.members))
+                )
+            ).all()
+        await engine.dispose()
+    return list(rows)
+
+
+def build_app(rows: list[Team], schema, response_class) -> FastAPI:
+    app = FastAPI(default_response_class=response_class)
+
+    @app.get("/teams", response_model=Page[schema])
+    async def teams():
+        return paginate(rows)
+
+    add_pagination(app)
+    return app
+
+
+async def cpu_per_page(app: FastAPI, size: int, repeat: int) -> tuple[float, int]:
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        params = {"size": size}
+        body = (await client.get("/teams", params=params)).content
+        start = time.process_time()
+        for _ in range(repeat):
+            await client.get("/teams", params=params)
+        return (time.process_time() - start) / repeat, len(body)
+
+
+async def main(teams: int, members: int, repeat: int):
+    # paginate() over a list is deliberate: the rows are preloaded.
+    disable_installed_extensions_check()
+    rows = await load_rows(teams, members)
+    print(f"{teams} teams x {members} members per page")
+    paths = {
+        "previous": build_app(rows, PreviousTeamRead, JSONResponse),
+        "+ trusted emails": build_app(rows, PathUrlsTeamRead, JSONResponse),
+        "+ photo URLs": build_app(rows, TeamRead, JSONResponse),
+        "+ orjson (current)": build_app(rows, TeamRead, ORJSONResponse),
+    }
+    for label, app in paths.items():
+        cpu, size = await cpu_per_page(app, teams, repeat)
+        print(f"  {label:<20} {cpu * 1e3:7.2f} ms CPU/page  {size:7d} B")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--teams", type=int, default=50)
+    parser.add_argument("--members", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.teams, args.members, args.repeat))
@@ -0,0 +1,64 @@
+"""
+Email delivery throughput: one FastMail connection per message vs the
+pooled SMTP sessions used by the outbox dispatcher.
+
+    python -m benchmarks.bench_smtp --messages 500
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from fastapi_mail import FastMail, MessageSchema, MessageType
+
+from src.emails.smtp import SMTPConnectionPool
+
+# The stub lives with the tests; put tests/ on the path as pytest does,
+# since importing the tests package itself needs pytest's setup.
+sys.path.append(str(Path(__file__).resolve().parent.parent / "tests"))
+from smtp_stub import SMTPStub  # noqa: E402
+
+
+def build_message(index: int) -> MessageSchema:
+    return MessageSchema(
+        subject=f"Verify account {index}",
+        recipients=["bench@test.com"],
+        body="<p>hello</p>",
+        subtype=MessageType.html,
+    )
+
+
+async def bench_fastmail(smtp: SMTPStub, messages: int) -> float:
+    fm = FastMail(smtp.conf)
+    start = time.perf_counter()
+    for index in range(messages):
+        await fm.send_message(build_message(index))
+    return time.perf_counter() - start
+
+
+async def bench_pool(smtp: SMTPStub, messages: int, size: int) -> float:
+    pool = SMTPConnectionPool(smtp.conf, size=size)
+    start = time.perf_counter()
+    await pool.send_messages([build_message(index) for index in range(messages)])
+    elapsed = time.perf_counter() - start
+    await pool.close()
+    return elapsed
+
+
+async def main(messages: int, size: int):
+    smtp = await SMTPStub().start()
+    fastmail = await bench_fastmail(smtp, messages)
+    print(f"FastMail per message: {messages / fastmail:8.1f} msg/s")
+    pool = await bench_pool(smtp, messages, size)
+    print(f"SMTP pool (size={size}): {messages / pool:8.1f} msg/s")
+    print(f"connections opened: {smtp.connections}")
+    await smtp.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--pool-size", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.messages, args.pool_size))
@@ -0,0 +1,122 @@
+"""
+Concurrent join/leave churn with parallel readers against SQLite: engine
+defaults vs the tuned profile from ``build_engine`` (WAL, NORMAL sync,
+mmap, cache sizing, busy timeout, explicit pool).
+
+    python -m benchmarks.bench_sqlite --writers 20 --readers 20 --ops 50
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import selectinload, sessionmaker
+
+import src  # noqa: F401  register every model
+from src.accounts.models import User
+from src.database import build_engine
+from src.models import Base
+from src.teams.models import Team, UserTeam
+
+
+async def seed(session_maker, users: int, teams: int):
+    async with session_maker() as session:
+        await session.execute(
+            insert(User),
+            [
+                {"email": f"user{index}@bench.com", "hashed_password": "x"}
+                for index in range(users)
+            ],
+        )
+        await session.execute(
+            insert(Team),
+            [
+                {
+                    "title": f"Team {index}",
+                    "project_name": "",
+                    "description": "",
+                    "owner_id": index + 1,
+                }
+                for index in range(teams)
+            ],
+        )
+        await session.commit()
+
+
+async def writer(session_maker, user_id: int, teams: int, ops: int, stats: dict):
+    for op in range(ops):
+        team_id = (user_id + op) % teams + 1
+        try:
+            async with session_maker() as session:
+                await session.execute(
+                    insert(UserTeam).values(user_id=user_id, team_id=team_id)
+                )
+                await session.commit()
+                await session.execute(
+                    delete(UserTeam).where(
+                        UserTeam.user_id == user_id, UserTeam.team_id == team_id
+                    )
+                )
+                await session.commit()
+            stats["writes"] += 2
+        except OperationalError:
+            stats["errors"] += 1
+
+
+async def reader(session_maker, teams: int, ops: int, stats: dict):
+    for op in range(ops):
+        try:
+            async with session_maker() as session:
+                await session.scalar(
+                    select(Team)
+                    .where(Team.id == op % teams + 1)
+                    .options(selectinload(Team.members))
+                )
+            stats["reads"] += 1
+        except OperationalError:
+            stats["errors"] += 1
+
+
+async def run(label: str, make_engine, writers: int, readers: int, ops: int):
+    with tempfile.NamedTemporaryFile(suffix=".sqlite3") as db:
+        engine = make_engine(f"sqlite+aiosqlite:///{db.name}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_maker = sessionmaker(engine, class_=AsyncSession)
+        await seed(session_maker, users=writers, teams=10)
+
+        stats = {"writes": 0, "reads": 0, "errors": 0}
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(
+                writer(session_maker, user_id, 10, ops, stats)
+                for user_id in range(1, writers + 1)
+            ),
+            *(reader(session_maker, 10, ops, stats) for _ in range(readers)),
+        )
+        elapsed = time.perf_counter() - start
+        await engine.dispose()
+
+    print(
+        f"{label:<8} {elapsed:7.2f} s  "
+        f"{stats['writes'] / elapsed:8.1f} writes/s  "
+        f"{stats['reads'] / elapsed:8.1f} reads/s  "
+        f"{stats['errors']} errors"
+    )
+
+
+async def main(writers: int, readers: int, ops: int):
+    await run("defaults", create_async_engine, writers, readers, ops)
+    await run("tuned", build_engine, writers, readers, ops)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=20)
+    parser.add_argument("--readers", type=int, default=20)
+    parser.add_argument("--ops", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.writers, args.readers, args.ops))
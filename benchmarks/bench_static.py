@@ -0,0 +1,137 @@
+"""
+``/static`` served by the plain ``StaticFiles`` mount vs ``CachedStaticFiles``:
+cold-fetch throughput, bytes on the wire, and what repeat page views cost a
+client that honours Cache-Control (plain responses carry no freshness, so
+they are revalidated with If-None-Match on every view).
+
+    python -m benchmarks.bench_static --views 20 --requests 2000
+"""
+import argparse
+import asyncio
+import gzip
+import io
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.staticfiles import StaticFiles
+
+from src.accounts.photos import photo_files
+from src.static import CachedStaticFiles
+
+PHOTO = "9f" * 32 + ".jpg"
+SCRIPT = "app.js"
+
+
+def build_assets(directory: Path) -> list[str]:
+    """A page's worth of assets: avatar variants and a gzip-precompressed script."""
+    rng = random.Random(0)
+    pixels = rng.randbytes(512 * 512 * 3)
+    image = Image.frombytes("RGB", (512, 512), pixels)
+    for name in photo_files(PHOTO):
+        stem, extension = name.rsplit(".", 1)
+        size = int(stem.rsplit("_", 1)[1]) if "_" in stem else 512
+        buffer = io.BytesIO()
+        image.resize((size, size)).save(
+            buffer, format="WEBP" if extension == "webp" else "JPEG", quality=80
+        )
+        (directory / name).write_bytes(buffer.getvalue())
+    script = "".join(
+        f"export function handler{i}(event) {{ return dispatch('{i}', event); }}\n"
+        for i in range(3000)
+    ).encode()
+    (directory / SCRIPT).write_bytes(script)
+    (directory / f"{SCRIPT}.gz").write_bytes(gzip.compress(script, 9))
+    return [name for name in photo_files(PHOTO) if name.endswith(".webp")] + [SCRIPT]
+
+
+def wire_bytes(response) -> int:
+    headers = sum(len(key) + len(value) + 4 for key, value in response.headers.raw)
+    return headers + response.num_bytes_downloaded
+
+
+class Browser:
+    """Keeps responses until Cache-Control says to revalidate them."""
+
+    def __init__(self, client: AsyncClient) -> None:
+        self.client = client
+        self.cache: dict[str, tuple[float, str]] = {}
+        self.requests = 0
+        self.bytes = 0
+
+    async def get(self, url: str) -> None:
+        now = time.monotonic()
+        headers = {"Accept-Encoding": "br, gzip"}
+        cached = self.cache.get(url)
+        if cached is not None:
+            fresh_until, etag = cached
+            if fresh_until > now:
+                return
+            headers["If-None-Match"] = etag
+        response = await self.client.get(url, headers=headers)
+        self.requests += 1
+        self.bytes += wire_bytes(response)
+        max_age = 0
+        for directive in response.headers.get("cache-control", "").split(","):
+            name, _, value = directive.strip().partition("=")
+            if name == "max-age":
+                max_age = int(value)
+        self.cache[url] = (now + max_age, response.headers["etag"])
+
+
+async def throughput(client: AsyncClient, url: str, count: int) -> tuple[float, int]:
+    headers = {"Accept-Encoding": "br, gzip"}
+    start = time.perf_counter()
+    total = 0
+    for _ in range(count):
+        response = await client.get(url, headers=headers)
+        total += wire_bytes(response)
+    return count / (time.perf_counter() - start), total // count
+
+
+async def main(views: int, count: int):
+    with tempfile.TemporaryDirectory() as directory:
+        assets = build_assets(Path(directory))
+        mounts = {
+            "StaticFiles": StaticFiles(directory=directory),
+            "CachedStaticFiles": CachedStaticFiles(directory=directory),
+        }
+        for label, mount in mounts.items():
+            app = Starlette(routes=[Mount("/static", mount)])
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                print(label)
+                for asset in (assets[-1], assets[0]):
+                    rate, size = await throughput(client, f"/static/{asset}", count)
+                    print(f"  GET {asset[-12:]:<12} {rate:8.0f} req/s {size:8d} B")
+
+                browser = Browser(client)
+                for _ in range(views):
+                    for asset in assets:
+                        await browser.get(f"/static/{asset}")
+                print(
+                    f"  {views} page views: {browser.requests} requests,"
+                    f" {browser.bytes / 1024:.1f} KiB"
+                )
+
+                response = await client.get(
+                    f"/static/{assets[-1]}", headers={"Range": "bytes=100000-"}
+                )
+                print(
+                    f"  resume at 100000: {response.status_code},"
+                    f" {wire_bytes(response)} B"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--views", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.views, args.requests))
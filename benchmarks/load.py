@@ -0,0 +1,403 @@
+"""
+Scripted load against the app, either in process through ASGI or over HTTP
+to a local uvicorn, reported per request as requests/s and p50/p95/p99
+latency. A fresh SQLite database is seeded with ``benchmarks.seed`` unless
+``--database-url`` points at one seeded earlier.
+
+Each scenario runs ``--concurrency`` virtual users, each logged in as its
+own seeded account, for ``--duration`` seconds after one warm-up pass.
+Save a run with ``--output`` and hand it to ``--compare`` on another
+commit; ``--fail-over 10`` exits with status 1 when a p95 got more than
+10% slower.
+
+    python -m benchmarks.load --users 10000 --teams 2000 --output before.json
+    python -m benchmarks.load --compare before.json --fail-over 10
+    python -m benchmarks.load --server uvicorn --scenarios login_storm
+"""
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import httpx
+from PIL import Image
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.postgres import free_port
+from benchmarks.seed import PASSWORD, WORDS, Dataset, load_dataset, seed
+from src.accounts.photos import photo_processor
+from src.database import build_engine, get_async_session
+from src.main import app
+from src.teams.models import StatusChoices
+
+PAGE_SIZE = 20
+
+
+class Recorder:
+    """Latencies of the requests made during one scenario, by request name."""
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.elapsed = 0.0
+
+    def record(self, name: str, seconds: float, ok: bool) -> None:
+        self.latencies[name].append(seconds)
+        if not ok:
+            self.errors[name] += 1
+
+    def summary(self) -> dict[str, dict]:
+        results = {}
+        for name, latencies in sorted(self.latencies.items()):
+            latencies = sorted(latencies)
+            results[name] = {
+                "requests": len(latencies),
+                "errors": self.errors[name],
+                "rps": len(latencies) / self.elapsed,
+                "mean_ms": sum(latencies) / len(latencies) * 1e3,
+                **{
+                    f"p{q}_ms": percentile(latencies, q) * 1e3
+                    for q in (50, 95, 99)
+                },
+            }
+        return results
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+class VirtualUser:
+    """One simulated client: its own account, token and random stream."""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        dataset: Dataset,
+        index: int,
+        photos: list[bytes],
+        seed: int,
+    ) -> None:
+        self.client = client
+        self.dataset = dataset
+        self.email = Dataset.email(index)
+        self.photos = photos
+        self.rng = random.Random(seed)
+        self.recorder: Optional[Recorder] = None
+        self.headers: dict[str, str] = {}
+
+    async def request(
+        self, name: str, method: str, url: str, expect=(200,), **kwargs
+    ) -> httpx.Response:
+        start = time.perf_counter()
+        response = await self.client.request(
+            method, url, headers=self.headers, **kwargs
+        )
+        if self.recorder is not None:
+            self.recorder.record(
+                name, time.perf_counter() - start, response.status_code in expect
+            )
+        return response
+
+    async def login(self) -> None:
+        response = await self.request(
+            "POST /auth/jwt/login",
+            "POST",
+            "/auth/jwt/login",
+            data={"username": self.email, "password": PASSWORD},
+        )
+        response.raise_for_status()
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def login_storm(user: VirtualUser) -> None:
+    await user.login()
+
+
+async def team_browse(user: VirtualUser) -> None:
+    rng = user.rng
+    pages = max(len(user.dataset.team_ids) // PAGE_SIZE, 1)
+    params = {"page": rng.randint(1, pages), "size": PAGE_SIZE}
+    roll = rng.random()
+    if roll < 0.3:
+        params = {"title": rng.choice(WORDS), "size": PAGE_SIZE}
+    elif roll < 0.5:
+        statuses = [s for s in StatusChoices if s != StatusChoices.DEFAULT]
+        params["status"] = rng.choice(statuses).value
+    await user.request("GET /teams", "GET", "/teams", params=params)
+    team_id = rng.choice(user.dataset.team_ids)
+    await user.request("GET /teams/{team_id}", "GET", f"/teams/{team_id}")
+    await user.request(
+        "GET /search/teams", "GET", "/search/teams", params={"q": rng.choice(WORDS)}
+    )
+
+
+async def join_leave(user: VirtualUser) -> None:
+    team_id = user.rng.choice(user.dataset.team_ids)
+    # Full teams (400) and teams the user is already in (403) are expected.
+    response = await user.request(
+        "POST /teams/join/{team_id}",
+        "POST",
+        f"/teams/join/{team_id}",
+        expect=(200, 400, 403),
+    )
+    if response.status_code == 200:
+        await user.request(
+            "DELETE /teams/leave/{team_id}", "DELETE", f"/teams/leave/{team_id}"
+        )
+
+
+async def photo_upload(user: VirtualUser) -> None:
+    await user.request(
+        "POST /users/me/upload_photo",
+        "POST",
+        "/users/me/upload_photo",
+        files={"file": ("avatar.jpg", user.rng.choice(user.photos), "image/jpeg")},
+    )
+
+
+SCENARIOS = {
+    "login_storm": login_storm,
+    "team_browse": team_browse,
+    "join_leave": join_leave,
+    "photo_upload": photo_upload,
+}
+
+
+def sample_photos(count: int, size: int = 256) -> list[bytes]:
+    """Distinct JPEGs, so uploads are not all deduplicated by content hash."""
+    rng = random.Random(0)
+    photos = []
+    for _ in range(count):
+        image = Image.frombytes("RGB", (size, size), rng.randbytes(size * size * 3))
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=80)
+        photos.append(buffer.getvalue())
+    return photos
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    dataset: Dataset,
+    name: str,
+    concurrency: int,
+    duration: float,
+    photos: list[bytes],
+    seed: int,
+) -> Recorder:
+    scenario = SCENARIOS[name]
+    users = [
+        VirtualUser(client, dataset, index, photos, seed + index)
+        for index in range(min(concurrency, len(dataset.user_ids)))
+    ]
+    for user in users:
+        await user.login()
+    await asyncio.gather(*(scenario(user) for user in users))
+
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+
+    async def worker(user: VirtualUser) -> None:
+        user.recorder = recorder
+        while time.perf_counter() < deadline:
+            await scenario(user)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(user) for user in users))
+    recorder.elapsed = time.perf_counter() - start
+    return recorder
+
+
+@asynccontextmanager
+async def in_process(database_url: str, photo_dir: str) -> AsyncIterator:
+    engine = build_engine(database_url)
+    session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_async_session():
+        async with session_maker() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = override_get_async_session
+    photo_processor.directory = Path(photo_dir)
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://load", timeout=60
+        ) as client:
+            yield client
+    finally:
+        app.dependency_overrides.pop(get_async_session)
+        photo_processor.shutdown()
+        await engine.dispose()
+
+
+@asynccontextmanager
+async def uvicorn_server(
+    database_url: str, photo_dir: str, workers: int
+) -> AsyncIterator:
+    port = free_port()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "src.main:app",
+            f"--port={port}",
+            f"--workers={workers}",
+            "--log-level=warning",
+            "--no-access-log",
+        ],
+        env={**os.environ, "DATABASE_URL": database_url, "PHOTO_DIR": photo_dir},
+    )
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", timeout=60
+        ) as client:
+            for _ in range(100):
+                try:
+                    await client.get("/")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("uvicorn did not start")
+            yield client
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def git_commit() -> Optional[str]:
+    result = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True
+    )
+    return result.stdout.strip() or None
+
+
+def change(current: float, previous: Optional[float]) -> str:
+    if not previous:
+        return ""
+    return f" ({(current / previous - 1) * 100:+.0f}%)"
+
+
+def print_report(results: dict, baseline: dict) -> list[str]:
+    """Print every scenario; return the requests whose p95 got slower."""
+    slower = []
+    for scenario, requests in results.items():
+        print(scenario)
+        for name, stats in requests.items():
+            before = baseline.get(scenario, {}).get(name, {})
+            print(
+                f"  {name:<30} {stats['requests']:6d} req {stats['errors']:4d} err"
+                f"  {stats['rps']:7.1f}/s{change(stats['rps'], before.get('rps'))}"
+                + "".join(
+                    f"  p{q} {stats[f'p{q}_ms']:7.2f}"
+                    f"{change(stats[f'p{q}_ms'], before.get(f'p{q}_ms'))}"
+                    for q in (50, 95, 99)
+                )
+                + " ms"
+            )
+            if before:
+                ratio = stats["p95_ms"] / before["p95_ms"]
+                slower.append((f"{scenario} {name}", ratio))
+    return slower
+
+
+async def main(args: argparse.Namespace) -> int:
+    with tempfile.TemporaryDirectory(prefix="bitbuddies-load-") as directory:
+        database_url = args.database_url
+        if database_url is None:
+            database_url = f"sqlite+aiosqlite:///{directory}/load.sqlite3"
+            engine = build_engine(database_url)
+            dataset = await seed(engine, args.users, args.teams, args.seed)
+        else:
+            engine = build_engine(database_url)
+            dataset = await load_dataset(engine)
+        await engine.dispose()
+        print(
+            f"{len(dataset.user_ids)} users, {len(dataset.team_ids)} teams,"
+            f" {args.concurrency} virtual users, {args.duration:g} s per scenario,"
+            f" {args.server}"
+        )
+
+        photo_dir = f"{directory}/images"
+        os.makedirs(photo_dir)
+        photos = sample_photos(16)
+        if args.server == "uvicorn":
+            server = uvicorn_server(database_url, photo_dir, args.workers)
+        else:
+            server = in_process(database_url, photo_dir)
+        results = {}
+        async with server as client:
+            for name in args.scenarios:
+                recorder = await run_scenario(
+                    client,
+                    dataset,
+                    name,
+                    args.concurrency,
+                    args.duration,
+                    photos,
+                    args.seed,
+                )
+                results[name] = recorder.summary()
+
+    baseline = {}
+    if args.compare:
+        previous = json.loads(Path(args.compare).read_text())
+        baseline = previous["results"]
+        print(f"Compared with {args.compare} ({previous.get('commit')})")
+    slower = print_report(results, baseline)
+
+    if args.output:
+        settings = {
+            key: getattr(args, key)
+            for key in ("server", "workers", "users", "teams", "concurrency")
+        }
+        settings.update(duration=args.duration, seed=args.seed)
+        Path(args.output).write_text(
+            json.dumps(
+                {"commit": git_commit(), "settings": settings, "results": results},
+                indent=2,
+            )
+        )
+    if args.fail_over is not None:
+        regressions = [
+            (name, ratio)
+            for name, ratio in slower
+            if ratio > 1 + args.fail_over / 100
+        ]
+        for name, ratio in regressions:
+            print(f"p95 regression: {name} {(ratio - 1) * 100:+.0f}%")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS)
+    )
+    parser.add_argument("--server", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--database-url", help="an already seeded database")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--teams", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="save the results as JSON")
+    parser.add_argument("--compare", help="results saved by an earlier --output")
+    parser.add_argument("--fail-over", type=float, help="allowed p95 slowdown, %%")
+    sys.exit(asyncio.run(main(parser.parse_args())))
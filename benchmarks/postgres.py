@@ -0,0 +1,97 @@
+"""
+Throwaway PostgreSQL cluster built with ``initdb`` for running the test
+suite or benchmarks against asyncpg.
+
+    python -m benchmarks.postgres python -m pytest -q
+
+The command runs with ``TEST_DATABASE_URL`` and ``DATABASE_URL`` pointing
+at the new cluster, which is deleted afterwards. Set ``PG_BIN`` when the
+PostgreSQL binaries are not on ``PATH``.
+"""
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+
+def pg_binary(name: str) -> str:
+    pg_bin = os.getenv("PG_BIN")
+    path = str(Path(pg_bin) / name) if pg_bin else shutil.which(name)
+    if not path or not Path(path).exists():
+        raise RuntimeError(f"{name} not found, install PostgreSQL or set PG_BIN")
+    return path
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def temporary_postgres(database: str = "bitbuddies") -> Iterator[str]:
+    """Start a private cluster and yield an asyncpg URL for ``database``."""
+    with tempfile.TemporaryDirectory(prefix="bitbuddies-pg-") as directory:
+        data = Path(directory) / "data"
+        port = free_port()
+        subprocess.run(
+            [
+                pg_binary("initdb"),
+                "-D",
+                str(data),
+                "-U",
+                "postgres",
+                "--auth=trust",
+                "--no-sync",
+            ],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        subprocess.run(
+            [
+                pg_binary("pg_ctl"),
+                "-D",
+                str(data),
+                "-o",
+                f"-F -p {port} -k {directory} -c listen_addresses=127.0.0.1",
+                "-l",
+                str(Path(directory) / "postgres.log"),
+                "-w",
+                "start",
+            ],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            subprocess.run(
+                [
+                    pg_binary("createdb"),
+                    "-h",
+                    "127.0.0.1",
+                    "-p",
+                    str(port),
+                    "-U",
+                    "postgres",
+                    database,
+                ],
+                check=True,
+            )
+            yield f"postgresql+asyncpg://postgres@127.0.0.1:{port}/{database}"
+        finally:
+            subprocess.run(
+                [pg_binary("pg_ctl"), "-D", str(data), "-m", "fast", "-w", "stop"],
+                stdout=subprocess.DEVNULL,
+            )
+
+
+if __name__ == "__main__":
+    with temporary_postgres() as url:
+        env = {**os.environ, "TEST_DATABASE_URL": url, "DATABASE_URL": url}
+        print(url, file=sys.stderr)
+        command = sys.argv[1:] or ["python", "-m", "pytest", "-q"]
+        sys.exit(subprocess.run(command, env=env).returncode)
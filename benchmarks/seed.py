@@ -0,0 +1,156 @@
+"""
+Synthetic users, teams and memberships written to an empty database with
+the bulk importer, for load tests. The data only depends on ``--seed``,
+and every user's password is ``PASSWORD``, hashed once.
+
+    python -m benchmarks.seed --url sqlite+aiosqlite:///./load.sqlite3 \\
+        --users 10000 --teams 2000
+"""
+import argparse
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.accounts.models import Position, User
+from src.database import build_engine
+from src.importer import Importer
+from src.models import Base
+from src.teams.models import StatusChoices, Team
+
+PASSWORD = "load-test-password"
+EMAIL_DOMAIN = "load.example.com"
+
+FIRST_NAMES = ("Anna", "Bohdan", "Chloe", "Dmytro", "Eva", "Felix", "Iryna", "Omar")
+LAST_NAMES = ("Bondar", "Garcia", "Kovalenko", "Nguyen", "Smith", "Tkachuk", "Weber")
+# Title and project words, also used by the load scenarios as search terms.
+WORDS = (
+    "rocket", "garden", "ledger", "pixel", "harbor", "atlas", "beacon", "canvas",
+    "delta", "ember", "falcon", "glacier", "horizon", "island", "jigsaw", "kernel",
+    "lantern", "meadow", "nebula", "orbit", "prairie", "quartz", "river", "summit",
+)
+# Relative frequency of team sizes 1..MAX_TEAM_MEMBERS: mostly small teams,
+# some full ones that refuse joins.
+TEAM_SIZE_WEIGHTS = (10, 14, 16, 14, 10, 8, 6, 6)
+
+
+@dataclass
+class Dataset:
+    user_ids: list[int]
+    team_ids: list[int]
+    memberships: int = 0
+
+    @staticmethod
+    def email(index: int) -> str:
+        return f"user{index}@{EMAIL_DOMAIN}"
+
+
+async def seed(
+    engine: AsyncEngine,
+    users: int,
+    teams: int,
+    seed: int = 0,
+    batch_size: int = 5000,
+) -> Dataset:
+    """
+    Create the schema if needed and insert ``users`` users and ``teams``
+    teams, each owned by a different user who is also a member, through
+    ``Importer``. User ``Dataset.email(i)`` gets id ``user_ids[i]``.
+    """
+    if teams > users:
+        raise ValueError("Every team needs its own owner: teams > users")
+    rng = random.Random(seed)
+    statuses = [choice for choice in StatusChoices if choice != StatusChoices.DEFAULT]
+    positions = [choice for choice in Position if choice != Position.DEFAULT]
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    importer = Importer(
+        engine,
+        password=PASSWORD,
+        verified=True,
+        batch_size=batch_size,
+        transaction_size=max(users, batch_size),
+    )
+
+    await importer.import_users(
+        {
+            "email": Dataset.email(index),
+            "first_name": rng.choice(FIRST_NAMES),
+            "last_name": rng.choice(LAST_NAMES),
+            "position": rng.choice(positions),
+        }
+        for index in range(users)
+    )
+    user_ids = (await load_dataset(engine)).user_ids
+
+    owners = rng.sample(user_ids, teams)
+    await importer.import_teams(
+        {
+            "title": " ".join(rng.sample(WORDS, 2)).title(),
+            "project_name": rng.choice(WORDS),
+            "description": " ".join(rng.choices(WORDS, k=rng.randint(5, 30))),
+            "owner_id": owner,
+            "status": rng.choice(statuses),
+        }
+        for owner in owners
+    )
+    team_ids = (await load_dataset(engine)).team_ids
+
+    # The importer already made every owner a member.
+    sizes = rng.choices(
+        range(1, Team.MAX_TEAM_MEMBERS + 1), weights=TEAM_SIZE_WEIGHTS, k=teams
+    )
+    membership_rows = []
+    for team_id, owner, size in zip(team_ids, owners, sizes):
+        members = {owner}
+        while len(members) < size:
+            members.add(rng.choice(user_ids))
+        membership_rows += [
+            {"user_id": user_id, "team_id": team_id} for user_id in members - {owner}
+        ]
+    await importer.import_memberships(membership_rows)
+
+    return Dataset(user_ids, team_ids, teams + len(membership_rows))
+
+
+async def load_dataset(engine: AsyncEngine) -> Dataset:
+    """The ``Dataset`` of a database seeded earlier."""
+    async with engine.connect() as conn:
+        user_ids = (
+            await conn.scalars(
+                select(User.id)
+                .where(User.email.endswith(f"@{EMAIL_DOMAIN}"))
+                .order_by(User.id)
+            )
+        ).all()
+        team_ids = (await conn.scalars(select(Team.id).order_by(Team.id))).all()
+    return Dataset(list(user_ids), list(team_ids))
+
+
+async def main(url: str, users: int, teams: int, seed_value: int, batch_size: int):
+    engine = build_engine(url)
+    start = time.perf_counter()
+    dataset = await seed(engine, users, teams, seed_value, batch_size)
+    elapsed = time.perf_counter() - start
+    await engine.dispose()
+    rows = len(dataset.user_ids) + len(dataset.team_ids) + dataset.memberships
+    print(
+        f"{len(dataset.user_ids)} users, {len(dataset.team_ids)} teams,"
+        f" {dataset.memberships} memberships in {elapsed:.2f} s"
+        f" ({rows / elapsed:.0f} rows/s)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="sqlite+aiosqlite:///./load.sqlite3")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--teams", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.url, args.users, args.teams, args.seed, args.batch_size))
@@ -7,7 +7,7 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from alembic import context
 from src.models import Base
-from src.database import DATABASE_URL
+from src.config import DATABASE_URL
 
 
 # this is the Alembic Config object, which provides
@@ -24,13 +24,20 @@ if config.config_file_name is not None:
 
 target_metadata = Base.metadata
 
+
+def include_name(name, type_, parent_names):
+    # FTS5 virtual tables and their shadow tables are managed by hand.
+    if type_ == "table":
+        return not (name.endswith("_fts") or "_fts_" in name)
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
 # ... etc.
 
 config.set_main_option("sqlalchemy.url", DATABASE_URL)
-print(DATABASE_URL)
 
 
 def run_migrations_offline() -> None:
@@ -51,6 +58,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -58,7 +66,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,60 @@
+"""add search index
+
+Revision ID: 8c4d2e6f1a90
+Revises: 3b1f0c2a9d7e
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4d2e6f1a90'
+down_revision: Union[str, None] = '3b1f0c2a9d7e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    "teams_fts": ("teams", ("title", "project_name", "description")),
+    "users_fts": ("users", ("first_name", "last_name", "email")),
+}
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for name, (source, columns) in INDEXES.items():
+        names = ", ".join(columns)
+        new = ", ".join(f"new.{c}" for c in columns)
+        old = ", ".join(f"old.{c}" for c in columns)
+        op.execute(
+            f"CREATE VIRTUAL TABLE {name} USING fts5({names}, "
+            f"content='{source}', content_rowid='id', tokenize='trigram')"
+        )
+        op.execute(
+            f"CREATE TRIGGER {name}_ai AFTER INSERT ON {source} BEGIN "
+            f"INSERT INTO {name}(rowid, {names}) VALUES (new.id, {new}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {name}_ad AFTER DELETE ON {source} BEGIN "
+            f"INSERT INTO {name}({name}, rowid, {names}) "
+            f"VALUES ('delete', old.id, {old}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {name}_au AFTER UPDATE OF {names} ON {source} BEGIN "
+            f"INSERT INTO {name}({name}, rowid, {names}) "
+            f"VALUES ('delete', old.id, {old}); "
+            f"INSERT INTO {name}(rowid, {names}) VALUES (new.id, {new}); END"
+        )
+        op.execute(f"INSERT INTO {name}({name}) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for name in INDEXES:
+        for suffix in ("ai", "ad", "au"):
+            op.execute(f"DROP TRIGGER {name}_{suffix}")
+        op.execute(f"DROP TABLE {name}")
@@ -0,0 +1,67 @@
+"""fix enum defaults
+
+Revision ID: 7a3c5e9b2d61
+Revises: 2f6a8d0c4e57
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a3c5e9b2d61'
+down_revision: Union[str, None] = '2f6a8d0c4e57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Enum columns store member names, so the init defaults were never valid.
+SERVER_DEFAULTS = {
+    "teams": ("status", "Initiation", "INITIATION"),
+    "users": ("position", "", "DEFAULT"),
+}
+# SQLite rebuilds a table to change a default, which drops its triggers.
+SEARCH_INDEXES = {
+    "teams": ("teams_fts", ("title", "project_name", "description")),
+    "users": ("users_fts", ("first_name", "last_name", "email")),
+}
+
+
+def create_search_triggers(source: str) -> None:
+    name, columns = SEARCH_INDEXES[source]
+    names = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    op.execute(
+        f"CREATE TRIGGER {name}_ai AFTER INSERT ON {source} BEGIN "
+        f"INSERT INTO {name}(rowid, {names}) VALUES (new.id, {new}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER {name}_ad AFTER DELETE ON {source} BEGIN "
+        f"INSERT INTO {name}({name}, rowid, {names}) "
+        f"VALUES ('delete', old.id, {old}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER {name}_au AFTER UPDATE OF {names} ON {source} BEGIN "
+        f"INSERT INTO {name}({name}, rowid, {names}) "
+        f"VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {name}(rowid, {names}) VALUES (new.id, {new}); END"
+    )
+
+
+def set_server_defaults(index: int) -> None:
+    sqlite = op.get_bind().dialect.name == "sqlite"
+    for table, (column, *defaults) in SERVER_DEFAULTS.items():
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(column, server_default=defaults[index])
+        if sqlite:
+            create_search_triggers(table)
+
+
+def upgrade() -> None:
+    set_server_defaults(1)
+
+
+def downgrade() -> None:
+    set_server_defaults(0)
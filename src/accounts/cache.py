@@ -0,0 +1,96 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from fastapi_users.db import SQLAlchemyUserDatabase
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from src.accounts.models import User
+from src.config import USER_CACHE_TTL, USER_CACHE_SIZE
+
+
+class UserCache:
+    """
+    Short-TTL LRU cache of user rows keyed by user id.
+
+    Only column values are cached, never ORM instances, so every request
+    still gets its own object bound to its own session.
+    """
+
+    def __init__(self, ttl: float = USER_CACHE_TTL, size: int = USER_CACHE_SIZE):
+        self.ttl = ttl
+        self.size = size
+        self._entries: OrderedDict[int, tuple[float, Dict[str, Any]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            self._entries.pop(user_id, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, user: User) -> None:
+        values = {
+            attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs
+        }
+        self._entries[user.id] = (time.monotonic() + self.ttl, values)
+        self._entries.move_to_end(user.id)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def metrics(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "max_size": self.size,
+        }
+
+
+user_cache = UserCache()
+
+
+class CachedUserDatabase(SQLAlchemyUserDatabase):
+    """
+    User database adapter that serves ``get`` by id from ``user_cache``.
+
+    Writes invalidate the entry only after they commit; a ``get`` running
+    before the commit would otherwise cache the old row for a whole TTL.
+    """
+
+    async def get(self, id: int) -> Optional[User]:
+        values = user_cache.get(id)
+        if values is None:
+            user = await super().get(id)
+            if user is not None:
+                user_cache.set(user)
+            return user
+        user = User(**values)
+        make_transient_to_detached(user)
+        return await self.session.merge(user, load=False)
+
+    async def update(self, user: User, update_dict: Dict[str, Any]) -> User:
+        user_id = user.id
+        try:
+            return await super().update(user, update_dict)
+        finally:
+            user_cache.invalidate(user_id)
+
+    async def delete(self, user: User) -> None:
+        user_id = user.id
+        try:
+            await super().delete(user)
+        finally:
+            user_cache.invalidate(user_id)
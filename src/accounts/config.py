@@ -1,15 +1,25 @@
 from fastapi_users.authentication import BearerTransport
-from fastapi_users.authentication import JWTStrategy
 
 from src.accounts.backend import CustomAuthenticationBackend
+from src.accounts.strategy import CachedJWTStrategy
+from src.metrics import Counter
 
 bearer_transport = BearerTransport(tokenUrl="auth/jwt/login")
 
 SECRET = "SECRET"
 
+jwt_strategy = CachedJWTStrategy(secret=SECRET, lifetime_seconds=3600)
 
-def get_jwt_strategy() -> JWTStrategy:
-    return JWTStrategy(secret=SECRET, lifetime_seconds=3600)
+Counter(
+    "jwt_cache_requests_total",
+    "Bearer tokens looked up in the verified-token cache.",
+    ("result",),
+    callback=lambda: {("hit",): jwt_strategy.hits, ("miss",): jwt_strategy.misses},
+)
+
+
+def get_jwt_strategy() -> CachedJWTStrategy:
+    return jwt_strategy
 
 
 auth_backend = CustomAuthenticationBackend(
@@ -1,8 +1,18 @@
 from fastapi_pagination.ext.sqlalchemy import paginate
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
-from src.accounts.models import User
+from src.accounts.models import User, Position
+from src.pagination import CursorParams, paginate_keyset
+from src.search.fts import (
+    apply_search,
+    dialect_name,
+    team_terms,
+    teams_fts,
+    user_terms,
+    users_fts,
+)
 from src.teams.models import UserTeam, Team, StatusChoices
 
 
@@ -19,6 +29,31 @@ async def get_user_by_email(user_email: str, session: AsyncSession):
     return user
 
 
+def user_teams_query(
+    user_id: int,
+    session: AsyncSession,
+    title: str = None,
+    project_name: str = None,
+    status: StatusChoices = None,
+):
+    query = (
+        select(Team)
+        .join(UserTeam)
+        .where(UserTeam.user_id == user_id)
+        .options(selectinload(Team.members))
+    )
+    query = apply_search(
+        query,
+        Team,
+        teams_fts,
+        team_terms(title=title, project_name=project_name),
+        dialect_name(session),
+    )
+    if status:
+        query = query.filter(Team.status == status)
+    return query
+
+
 async def get_user_teams(
     is_paginate: bool,
     user_id: int,
@@ -27,18 +62,41 @@ async def get_user_teams(
     project_name: str = None,
     status: StatusChoices = None,
 ):
-    query = select(Team).join(UserTeam).where(UserTeam.user_id == user_id)
-
     if is_paginate:
-        if title:
-            query = query.filter(Team.title.contains(title))
-        if project_name:
-            query = query.filter(Team.project_name.contains(project_name))
-        if status:
-            query = query.filter(Team.status.contains(status))
-
+        query = user_teams_query(user_id, session, title, project_name, status)
         return await paginate(session, query)
     else:
+        query = select(Team).join(UserTeam).where(UserTeam.user_id == user_id)
         result = await session.execute(query)
         teams = result.scalars().all()
         return teams
+
+
+async def get_user_teams_cursor(
+    user_id: int,
+    session: AsyncSession,
+    params: CursorParams,
+    title: str = None,
+    project_name: str = None,
+    status: StatusChoices = None,
+):
+    query = user_teams_query(user_id, session, title, project_name, status)
+    return await paginate_keyset(session, query, (Team.id,), params)
+
+
+def users_query(
+    session: AsyncSession,
+    full_name: str = None,
+    email: str = None,
+    position: Position = None,
+):
+    query = apply_search(
+        select(User),
+        User,
+        users_fts,
+        user_terms(full_name=full_name, email=email),
+        dialect_name(session),
+    )
+    if position:
+        query = query.filter(User.position == position)
+    return query
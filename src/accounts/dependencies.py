@@ -5,12 +5,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.accounts.crud import get_user
 from src.accounts.models import User
-from src.database import get_async_session
+from src.database import get_read_session
 
 
 async def get_user_by_id(
     user_id: Annotated[int, Path],
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_read_session),
 ) -> User | None:
     """
     Dependency function to retrieve a user by their ID.
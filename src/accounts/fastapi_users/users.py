@@ -1,15 +1,12 @@
-import uuid
 from typing import Type
 
-from PIL import Image
 from fastapi import (
     APIRouter,
     Depends,
     HTTPException,
     Request,
+    Response,
     status,
-    File,
-    UploadFile,
 )
 from fastapi.params import Query
 from fastapi_pagination import Page
@@ -18,15 +15,23 @@ from fastapi_users import exceptions, models, schemas
 from fastapi_users.authentication import Authenticator
 from fastapi_users.manager import BaseUserManager, UserManagerDependency
 from fastapi_users.router.common import ErrorCode, ErrorModel
-from sqlalchemy import select, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.accounts.crud import get_user_teams
+from src.accounts.cache import user_cache
+from src.accounts.crud import get_user_teams, get_user_teams_cursor, users_query
 from src.accounts.dependencies import get_user_by_id
 from src.accounts.models import User, Position
+from src.accounts.photos import PHOTO_UPLOAD_BODY, photo_processor
 from src.accounts.schemas import UserRead, UserPasswordUpdate
-from src.config import BASE_DIR
-from src.database import get_async_session
+from src.database import get_async_session, get_read_session
+from src.etags import if_none_match, not_modified, user_etag
+from src.pagination import (
+    CursorPage,
+    CursorParams,
+    get_cursor_params,
+    paginate_keyset,
+)
+from src.teams.crud import release_all_seats
 from src.teams.models import StatusChoices
 from src.teams.schemas import Team
 
@@ -56,8 +61,14 @@ def get_users_router(
         },
     )
     async def me(
+        request: Request,
+        response: Response,
         user: models.UP = Depends(get_current_active_user),
     ):
+        etag = user_etag(user)
+        if if_none_match(request, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
         return schemas.model_validate(user_schema, user)
 
     @router.get(
@@ -70,36 +81,34 @@ def get_users_router(
         full_name: str = Query(None, description="Filter users by full name"),
         email: str = Query(None, description="Filter users by email"),
         position: Position = Query(None, description="Filter users by position"),
-        session: AsyncSession = Depends(get_async_session),
+        session: AsyncSession = Depends(get_read_session),
     ) -> Page[UserRead]:
-        query = select(User)
-        if full_name:
-            parts = full_name.split()
-            if len(parts) == 2:
-                first_name, last_name = parts
-                if first_name:
-                    query = query.filter(User.first_name.contains(first_name))
-                if last_name:
-                    query = query.filter(User.last_name.contains(last_name))
-            elif len(parts) == 1:
-                name = parts[0]
-                query = query.filter(
-                    or_(User.first_name.contains(name), User.last_name.contains(name))
-                )
-        if email:
-            query = query.filter(User.email.contains(email))
-        if position:
-            query = query.filter(User.position.contains(position))
-
+        query = users_query(session, full_name, email, position)
         return await paginate(session, query)
 
+    @router.get(
+        "/all/cursor",
+        name="get_users_cursor",
+        response_model=CursorPage[UserRead],
+        dependencies=[Depends(get_current_active_user)],
+    )
+    async def get_users_cursor(
+        full_name: str = Query(None, description="Filter users by full name"),
+        email: str = Query(None, description="Filter users by email"),
+        position: Position = Query(None, description="Filter users by position"),
+        params: CursorParams = Depends(get_cursor_params),
+        session: AsyncSession = Depends(get_read_session),
+    ):
+        query = users_query(session, full_name, email, position)
+        return await paginate_keyset(session, query, (User.id,), params)
+
     @router.get(
         "/me/teams",
         response_model=Page[Team],
     )
     async def get_me_teams(
         user: User = Depends(get_current_active_user),
-        session: AsyncSession = Depends(get_async_session),
+        session: AsyncSession = Depends(get_read_session),
         title: str = Query(None, description="filter teams by title"),
         project_name: str = Query(None, description="filter teams by project name."),
         status: StatusChoices = Query(None, description="filter teams by status"),
@@ -113,6 +122,27 @@ def get_users_router(
             session=session,
         )
 
+    @router.get(
+        "/me/teams/cursor",
+        response_model=CursorPage[Team],
+    )
+    async def get_me_teams_cursor(
+        user: User = Depends(get_current_active_user),
+        session: AsyncSession = Depends(get_read_session),
+        params: CursorParams = Depends(get_cursor_params),
+        title: str = Query(None, description="filter teams by title"),
+        project_name: str = Query(None, description="filter teams by project name."),
+        status: StatusChoices = Query(None, description="filter teams by status"),
+    ):
+        return await get_user_teams_cursor(
+            user_id=user.id,
+            session=session,
+            params=params,
+            title=title,
+            project_name=project_name,
+            status=status,
+        )
+
     @router.patch(
         "/me",
         response_model=user_schema,
@@ -185,15 +215,17 @@ def get_users_router(
         user_manager: BaseUserManager[models.UP, models.ID] = Depends(get_user_manager),
         session: AsyncSession = Depends(get_async_session),
     ):
-        if user_manager.password_helper.verify_and_update(
+        verified, _ = await user_manager.password_helper.verify_and_update_async(
             user_schema.current_password, user.hashed_password
-        ):
-            new_user_pass = user_manager.password_helper.hash(
-                password=user_schema.new_password
+        )
+        if verified:
+            new_user_pass = await user_manager.password_helper.hash_async(
+                user_schema.new_password
             )
             user.hashed_password = new_user_pass
             session.add(user)
             await session.commit()
+            user_cache.invalidate(user.id)
         else:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
 
@@ -206,43 +238,27 @@ def get_users_router(
         user: User = Depends(get_current_active_user),
     ):
         if user:
+            await release_all_seats(session, user.id)
             await session.delete(user)
             await session.commit()
+            user_cache.invalidate(user.id)
         else:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
 
     @router.post(
         "/me/upload_photo",
         name="users:upload_photo",
+        openapi_extra=PHOTO_UPLOAD_BODY,
     )
     async def upload_user_photo(
-        file: UploadFile = File(...),
+        request: Request,
         user: User = Depends(get_current_active_user),
         session: AsyncSession = Depends(get_async_session),
     ):
-        if file.size >= 1000000:
-            return {"detail": "UNSUPPORTED_FILE_SIZE"}
-
-        filename = file.filename
-        extension = filename.split(".")[1]
-
-        if extension not in ["jpg", "png", "jpeg", "svg"]:
-            return {"detail": "FILE_EXTENSION_NOT_ALLOWED"}
-
-        token_name = f"{uuid.uuid4()}.{extension}"
-        generated_name = f"{BASE_DIR}/static/images/{token_name}"
-        file_content = await file.read()
-
-        with open(generated_name, "wb") as f:
-            f.write(file_content)
-
-        # Pillow
-        img = Image.open(generated_name)
-        img.save(generated_name, optimize=True)
-
-        user.photo = token_name
+        user.photo = await photo_processor.ingest(request)
         session.add(user)
         await session.commit()
+        user_cache.invalidate(user.id)
         return schemas.model_validate(UserRead, user)
 
     @router.get(
@@ -251,7 +267,15 @@ def get_users_router(
         name="users:user",
         dependencies=[Depends(get_current_active_user)],
     )
-    async def get_user(user_id: User = Depends(get_user_by_id)):
+    async def get_user(
+        request: Request,
+        response: Response,
+        user_id: User = Depends(get_user_by_id),
+    ):
+        etag = user_etag(user_id)
+        if if_none_match(request, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
         return schemas.model_validate(UserRead, user_id)
 
     # @router.patch(
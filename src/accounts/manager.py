@@ -1,42 +1,106 @@
-from typing import Optional
+import time
+from typing import Optional, Dict, Any
 
 from fastapi import Depends, Request, HTTPException
-from fastapi.templating import Jinja2Templates
-from fastapi_mail import MessageSchema, MessageType, FastMail
+from fastapi.security import OAuth2PasswordRequestForm
+from fastapi_mail import MessageSchema, MessageType
 from fastapi_users import (
     BaseUserManager,
     IntegerIDMixin,
     models,
+    schemas,
     exceptions,
 )
 from fastapi_users.jwt import generate_jwt
-from fastapi_users.password import PasswordHelper
-from passlib.context import CryptContext
 
 from src.accounts.config import auth_backend
 from src.accounts.fastapi_users.fastapi_users import CustomFastAPIUsers
 from src.accounts.models import User
-from src.config import conf
+from src.accounts.password import password_helper
 from src.database import get_user_db
+from src.emails.crud import enqueue_message
+from src.emails.dispatcher import dispatcher
+from src.emails.templates import templates
+from src.metrics import Histogram
 
-templates = Jinja2Templates(directory="src/emails")
 SECRET = "SECRET"
 
-context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-password_helper = PasswordHelper(context)
+mail_prepare_seconds = Histogram(
+    "mail_prepare_duration_seconds",
+    "Signing, rendering and queueing a verification or password reset email.",
+    ("email",),
+)
 
 
 class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
     reset_password_token_secret = SECRET
     verification_token_secret = SECRET
 
+    async def create(
+        self,
+        user_create: schemas.UC,
+        safe: bool = False,
+        request: Optional[Request] = None,
+    ) -> models.UP:
+        await self.validate_password(user_create.password, user_create)
+
+        existing_user = await self.user_db.get_by_email(user_create.email)
+        if existing_user is not None:
+            raise exceptions.UserAlreadyExists()
+
+        user_dict = (
+            user_create.create_update_dict()
+            if safe
+            else user_create.create_update_dict_superuser()
+        )
+        password = user_dict.pop("password")
+        user_dict["hashed_password"] = await self.password_helper.hash_async(password)
+
+        created_user = await self.user_db.create(user_dict)
+
+        await self.on_after_register(created_user, request)
+
+        return created_user
+
+    async def authenticate(
+        self, credentials: OAuth2PasswordRequestForm
+    ) -> Optional[models.UP]:
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            # Run the hasher to mitigate timing attack
+            await self.password_helper.hash_async(credentials.password)
+            return None
+
+        verified, updated_password_hash = (
+            await self.password_helper.verify_and_update_async(
+                credentials.password, user.hashed_password
+            )
+        )
+        if not verified:
+            return None
+        if updated_password_hash is not None:
+            await self.user_db.update(user, {"hashed_password": updated_password_hash})
+
+        return user
+
+    async def _update(self, user: models.UP, update_dict: Dict[str, Any]) -> models.UP:
+        update_dict = dict(update_dict)
+        password = update_dict.pop("password", None)
+        if password is not None:
+            await self.validate_password(password, user)
+            update_dict["hashed_password"] = await self.password_helper.hash_async(
+                password
+            )
+        return await super()._update(user, update_dict)
+
     async def generate_data_message(
         self,
         request: Optional[Request],
         user: models.UP,
         verify: bool = False,
     ):
-
+        start = time.perf_counter()
         token_data = {
             "sub": str(user.id),
             "email": user.email,
@@ -52,12 +116,7 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
                 "url": f"http://localhost:3000/verify/{token}",
             }
 
-            html = templates.TemplateResponse(
-                request=request,
-                name="email_confirmation.html",
-                context=template_context,
-                media_type="text/html",
-            ).body.decode("utf-8")
+            html = templates.render("email_confirmation.html", **template_context)
 
             message = MessageSchema(
                 subject="Verify account",
@@ -72,12 +131,9 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
                 "last_name": user.last_name,
             }
 
-            html = templates.TemplateResponse(
-                request=request,
-                name="forgot_password_confirmation.html",
-                context=template_context,
-                media_type="text/html",
-            ).body.decode("utf-8")
+            html = templates.render(
+                "forgot_password_confirmation.html", **template_context
+            )
 
             message = MessageSchema(
                 subject="Forgot password",
@@ -86,9 +142,11 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
                 subtype=MessageType.html,
             )
 
-        fm = FastMail(conf)
-
-        await fm.send_message(message=message)
+        await enqueue_message(self.user_db.session, message)
+        mail_prepare_seconds.observe(
+            time.perf_counter() - start, "verify" if verify else "forgot_password"
+        )
+        dispatcher.notify()
 
     async def on_after_register(
         self,
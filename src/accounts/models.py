@@ -1,10 +1,10 @@
 from enum import Enum
 
 from fastapi_users_db_sqlalchemy import SQLAlchemyBaseUserTable
-from sqlalchemy import String, Boolean, Text
+from sqlalchemy import String, Boolean, Text, Enum as SAEnum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from src.models import Base
+from src.models import Base, VersionedMixin
 
 
 class Position(str, Enum):
@@ -16,7 +16,7 @@ class Position(str, Enum):
     QA = "QA"
 
 
-class User(SQLAlchemyBaseUserTable[int], Base):
+class User(SQLAlchemyBaseUserTable[int], VersionedMixin, Base):
     __tablename__ = "users"
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -41,7 +41,9 @@ class User(SQLAlchemyBaseUserTable[int], Base):
         nullable=False,
     )
     position: Mapped[Position] = mapped_column(
-        server_default=Position.DEFAULT,
+        # "position" is a keyword PostgreSQL won't accept as a type name.
+        SAEnum(Position, name="userposition"),
+        server_default=Position.DEFAULT.name,
         default=Position.DEFAULT,
     )
     contact: Mapped[str] = mapped_column(
@@ -0,0 +1,134 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from fastapi_users.password import PasswordHelper
+from passlib.context import CryptContext
+
+from src.config import (
+    PASSWORD_HASH_EXECUTOR,
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_MAX_PENDING,
+)
+from src.metrics import Counter, Gauge, Histogram
+
+context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def _hash(password: str) -> str:
+    return context.hash(password)
+
+
+def _verify_and_update(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    return context.verify_and_update(plain_password, hashed_password)
+
+
+password_hash_seconds = Histogram(
+    "password_hash_duration_seconds",
+    "bcrypt hash and verify calls, including the wait for a worker.",
+    ("operation",),
+)
+OPERATIONS = {_hash: "hash", _verify_and_update: "verify"}
+
+
+class AsyncPasswordHelper(PasswordHelper):
+    """
+    Password helper that runs bcrypt in a bounded worker pool.
+
+    The synchronous ``hash``/``verify_and_update`` methods are kept for
+    compatibility with fastapi-users; request handlers should use the
+    ``*_async`` variants so hashing never blocks the event loop.
+    """
+
+    def __init__(
+        self,
+        executor: str = PASSWORD_HASH_EXECUTOR,
+        workers: int = PASSWORD_HASH_WORKERS,
+        max_pending: int = PASSWORD_HASH_MAX_PENDING,
+    ) -> None:
+        super().__init__(context)
+        self.executor_type = executor
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self.pending = 0
+        self.calls = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="password-hash",
+                )
+        return self._executor
+
+    async def _run(self, func, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="PASSWORD_HASHER_BUSY",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.pending -= 1
+            self.calls += 1
+            self.total_seconds += elapsed
+            self.max_seconds = max(self.max_seconds, elapsed)
+            password_hash_seconds.observe(elapsed, OPERATIONS[func])
+
+    async def hash_async(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify_and_update_async(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        return await self._run(_verify_and_update, plain_password, hashed_password)
+
+    def metrics(self) -> dict:
+        return {
+            "calls": self.calls,
+            "rejected": self.rejected,
+            "pending": self.pending,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "saturation": self.pending / self.max_pending,
+            "avg_seconds": self.total_seconds / self.calls if self.calls else 0.0,
+            "max_seconds": self.max_seconds,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_helper = AsyncPasswordHelper()
+
+Gauge(
+    "password_hash_pending",
+    "bcrypt calls queued or running in the worker pool.",
+    callback=lambda: password_helper.pending,
+)
+Counter(
+    "password_hash_rejected_total",
+    "bcrypt calls refused with 503 because the worker pool queue was full.",
+    callback=lambda: password_helper.rejected,
+)
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from PIL import Image
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from src.accounts.cache import user_cache
+from src.accounts.models import User
+from src.accounts.photos import (
+    CONTENT_ADDRESSED_NAME,
+    PhotoProcessor,
+    photo_files,
+    photo_processor,
+)
+from src.config import PHOTO_GC_INTERVAL, PHOTO_GC_GRACE_SECONDS
+from src.database import async_session_maker
+
+logger = logging.getLogger(__name__)
+
+
+class PhotoCollector:
+    """
+    Background task that deletes stored photos no user refers to any more.
+
+    Stored files are shared by every user who uploaded the same image, so
+    replacing a photo or deleting a user removes nothing right away.
+    Instead, every ``interval`` seconds the referenced names are read in one
+    query and any other generated file older than ``grace_seconds`` is
+    deleted; the grace period protects uploads that are stored but not yet
+    committed. Photos saved under random names before content addressing
+    are re-stored under their hash on the way, which also generates their
+    variants, and the legacy file is deleted once its users are moved.
+    """
+
+    def __init__(
+        self,
+        session_maker: sessionmaker,
+        processor: PhotoProcessor = photo_processor,
+        interval: float = PHOTO_GC_INTERVAL,
+        grace_seconds: float = PHOTO_GC_GRACE_SECONDS,
+    ) -> None:
+        self.session_maker = session_maker
+        self.processor = processor
+        self.interval = interval
+        self.grace_seconds = grace_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def adopt(self, session: AsyncSession, photo: str) -> str:
+        """Move users of a legacy ``photo`` onto its content-addressed copy."""
+        try:
+            name = await self.processor.restore(photo)
+        except (OSError, Image.DecompressionBombError) as error:
+            logger.warning("Cannot re-store photo %s: %s", photo, error)
+            return photo
+        await session.execute(
+            update(User).where(User.photo == photo).values(photo=name)
+        )
+        await session.commit()
+        user_cache.clear()
+        await self.processor.delete([photo])
+        return name
+
+    async def collect(self) -> int:
+        """Run one collection pass and return how many files were deleted."""
+        cutoff = time.time() - self.grace_seconds
+        async with self.session_maker() as session:
+            photos = set(
+                await session.scalars(
+                    select(User.photo).distinct().where(User.photo != "")
+                )
+            )
+            for photo in list(photos):
+                if not CONTENT_ADDRESSED_NAME.fullmatch(photo):
+                    photos.discard(photo)
+                    photos.add(await self.adopt(session, photo))
+        keep = {file for photo in photos for file in photo_files(photo)}
+        return await self.processor.sweep(keep, cutoff)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                removed = await self.collect()
+                if removed:
+                    logger.info("Deleted %d unreferenced photo files", removed)
+            except Exception:
+                logger.exception("Photo collection failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+photo_collector = PhotoCollector(async_session_maker)
@@ -0,0 +1,338 @@
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncGenerator, BinaryIO, Optional
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+from fastapi import HTTPException, Request, status
+from starlette.datastructures import UploadFile
+from starlette.formparsers import MultiPartException, MultiPartParser
+
+from src.config import (
+    PHOTO_DIR,
+    PHOTO_MAX_SIZE,
+    PHOTO_MAX_PIXELS,
+    PHOTO_EXTENSIONS,
+    PHOTO_WORKERS,
+    PHOTO_URL,
+    PHOTO_VARIANT_SIZES,
+    PHOTO_VARIANT_FORMATS,
+    PHOTO_VARIANT_QUALITY,
+)
+from src.static import IMMUTABLE_NAME
+
+# Room for the multipart boundaries and part headers around the file.
+MULTIPART_OVERHEAD = 16 * 1024
+
+PHOTO_UPLOAD_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
+
+
+def photo_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail="UNSUPPORTED_FILE_SIZE",
+    )
+
+
+async def limited_stream(
+    request: Request, limit: int
+) -> AsyncGenerator[bytes, None]:
+    """Request body chunks, aborting as soon as more than ``limit`` bytes arrive."""
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > limit:
+            raise photo_too_large()
+        yield chunk
+
+
+VARIANT_EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+# Stored originals keep their decoded format, whatever the upload was named.
+ORIGINAL_EXTENSIONS = {"JPEG": "jpg", "PNG": "png"}
+CONTENT_ADDRESSED_NAME = re.compile(r"[0-9a-f]{64}\.(jpg|png)")
+
+
+def variant_name(photo: str, size: int, image_format: str) -> str:
+    # Called for every member of every listed team; Path(photo).stem is ~10x slower.
+    stem = photo.rsplit(".", 1)[0]
+    return f"{stem}_{size}.{VARIANT_EXTENSIONS[image_format]}"
+
+
+def photo_files(photo: str) -> list[str]:
+    """The stored original and every variant generated from it."""
+    return [photo] + [
+        variant_name(photo, size, image_format)
+        for size in PHOTO_VARIANT_SIZES
+        for image_format in PHOTO_VARIANT_FORMATS
+    ]
+
+
+def photo_urls(photo: str) -> dict[int, dict[str, str]]:
+    """``{size: {format: url}}`` for every variant of ``photo``."""
+    if not photo:
+        return {}
+    return {
+        size: {
+            image_format: f"{PHOTO_URL}/{variant_name(photo, size, image_format)}"
+            for image_format in PHOTO_VARIANT_FORMATS
+        }
+        for size in PHOTO_VARIANT_SIZES
+    }
+
+
+def _save(image: Image.Image, destination: Path, image_format: str, **params):
+    """Encode ``image`` to a temp file and atomically move it to ``destination``."""
+    with tempfile.NamedTemporaryFile(
+        dir=destination.parent, suffix=destination.suffix, delete=False
+    ) as temp:
+        try:
+            image.save(temp, format=image_format, **params)
+        except BaseException:
+            os.unlink(temp.name)
+            raise
+    os.replace(temp.name, destination)
+
+
+def _convert(image: Image.Image, image_format: str) -> Image.Image:
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+    if image_format == "jpeg":
+        if has_alpha:
+            rgba = image.convert("RGBA")
+            flat = Image.new("RGB", rgba.size, (255, 255, 255))
+            flat.paste(rgba, mask=rgba.getchannel("A"))
+            return flat
+        return image if image.mode in ("RGB", "L") else image.convert("RGB")
+    return image.convert("RGBA" if has_alpha else "RGB")
+
+
+def _delete(directory: Path, names: list[str]) -> None:
+    for name in names:
+        try:
+            os.unlink(directory / name)
+        except FileNotFoundError:
+            pass
+
+
+def _store(source: BinaryIO, directory: Path, max_pixels: int) -> str:
+    """
+    Decode the upload once and store it under a hash of its normalized
+    pixels: the re-saved original plus every square variant, each
+    downscaled from the next larger one and never beyond the source, in
+    every variant format. When the
+    same image is already stored nothing is re-encoded; its files are only
+    touched so the collector treats them as fresh. Images of more than
+    ``max_pixels`` are refused from their header, before any decoding.
+    Returns the stored name.
+    """
+    with Image.open(source) as upload:
+        width, height = upload.size
+        if width * height > max_pixels:
+            raise Image.DecompressionBombError(
+                f"Image of {width}x{height} pixels exceeds {max_pixels}"
+            )
+        original_format = upload.format
+        image = ImageOps.exif_transpose(upload)
+    extension = ORIGINAL_EXTENSIONS.get(original_format)
+    if extension is None:
+        raise UnidentifiedImageError(f"Unsupported image format {original_format}")
+    digest = hashlib.sha256(
+        f"{original_format}:{image.mode}:{image.width}x{image.height}:".encode()
+    )
+    digest.update(image.tobytes())
+    name = f"{digest.hexdigest()}.{extension}"
+
+    files = photo_files(name)
+    if all((directory / file).is_file() for file in files):
+        for file in files:
+            os.utime(directory / file)
+        return name
+
+    written = []
+    try:
+        _save(image, directory / name, original_format, optimize=True)
+        written.append(name)
+
+        for size in sorted(PHOTO_VARIANT_SIZES, reverse=True):
+            # Never upscaled: a small upload is stored at its own resolution
+            # under the larger sizes too.
+            side = min(size, *image.size)
+            if image.size != (side, side):
+                image = ImageOps.fit(image, (side, side), Image.Resampling.LANCZOS)
+            for image_format in PHOTO_VARIANT_FORMATS:
+                variant = variant_name(name, size, image_format)
+                _save(
+                    _convert(image, image_format),
+                    directory / variant,
+                    image_format,
+                    quality=PHOTO_VARIANT_QUALITY,
+                )
+                written.append(variant)
+    except BaseException:
+        _delete(directory, written)
+        raise
+    return name
+
+
+def _restore(directory: Path, photo: str, max_pixels: int) -> str:
+    with open(directory / photo, "rb") as source:
+        return _store(source, directory, max_pixels)
+
+
+def _sweep(directory: Path, keep: set[str], cutoff: float) -> int:
+    """
+    Delete stored photos in ``directory`` not in ``keep`` and older than
+    ``cutoff``: content-addressed originals, their variants and legacy
+    uuid-named uploads. Other files, e.g. precompressed siblings or
+    whatever an operator keeps in the directory, are never deleted.
+    """
+    removed = 0
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name in keep or not IMMUTABLE_NAME.fullmatch(entry.name):
+                continue
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
+
+
+class PhotoProcessor:
+    """
+    Ingests photo uploads without blocking the event loop.
+
+    The multipart body is parsed straight off the request stream into a
+    spooled temp file, and the upload is refused with 413 as soon as it
+    exceeds ``max_size`` rather than after it has been read. Images larger
+    than ``max_pixels`` are refused before they are decoded. Pillow decoding
+    and re-encoding, including the thumbnail variants, run in a small
+    thread pool.
+    """
+
+    def __init__(
+        self,
+        directory: Path = PHOTO_DIR,
+        max_size: int = PHOTO_MAX_SIZE,
+        max_pixels: int = PHOTO_MAX_PIXELS,
+        workers: int = PHOTO_WORKERS,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.max_pixels = max_pixels
+        self.workers = workers
+        self._executor: Optional[Executor] = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="photo",
+            )
+        return self._executor
+
+    async def read_upload(self, request: Request) -> UploadFile:
+        limit = self.max_size + MULTIPART_OVERHEAD
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > limit:
+            raise photo_too_large()
+        content_type = request.headers.get("content-type", "")
+        if content_type.partition(";")[0].strip().lower() != "multipart/form-data":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="MULTIPART_REQUIRED",
+            )
+        parser = MultiPartParser(
+            request.headers,
+            limited_stream(request, limit),
+            max_files=1,
+            max_fields=0,
+        )
+        try:
+            form = await parser.parse()
+        except MultiPartException as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="INVALID_MULTIPART_BODY",
+            ) from exc
+        file = form.get("file")
+        if not isinstance(file, UploadFile):
+            await form.close()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="FILE_REQUIRED",
+            )
+        if file.size > self.max_size:
+            await form.close()
+            raise photo_too_large()
+        return file
+
+    async def save(self, file: UploadFile) -> str:
+        """Validate and store ``file``; return the stored file name."""
+        extension = Path(file.filename or "").suffix.lstrip(".").lower()
+        if extension not in PHOTO_EXTENSIONS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="FILE_EXTENSION_NOT_ALLOWED",
+            )
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self.executor, _store, file.file, self.directory, self.max_pixels
+            )
+        except (OSError, Image.DecompressionBombError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="INVALID_IMAGE",
+            )
+
+    async def ingest(self, request: Request) -> str:
+        file = await self.read_upload(request)
+        try:
+            return await self.save(file)
+        finally:
+            await file.close()
+
+    async def restore(self, photo: str) -> str:
+        """Re-store an already saved photo under its content hash."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, _restore, self.directory, photo, self.max_pixels
+        )
+
+    async def delete(self, names: list[str]) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, _delete, self.directory, names)
+
+    async def sweep(self, keep: set[str], cutoff: float) -> int:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, _sweep, self.directory, keep, cutoff
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+photo_processor = PhotoProcessor()
@@ -2,9 +2,10 @@ from typing import Optional
 
 from fastapi_users import models
 from fastapi_users.schemas import CreateUpdateDictModel, BaseUser
-from pydantic import EmailStr, Field, BaseModel
+from pydantic import EmailStr, Field, BaseModel, computed_field
 
 from src.accounts.models import Position
+from src.accounts.photos import photo_urls
 
 
 class UserRead(BaseUser[int]):
@@ -13,7 +14,9 @@ class UserRead(BaseUser[int]):
     id: models.ID
     first_name: str
     last_name: str
-    email: EmailStr
+    # Read back from the database, where only validated addresses are stored:
+    # re-running email validation on every listed member dominated page cost.
+    email: str = Field(json_schema_extra={"format": "email"})
     position: Position
     contact: str
     photo: str
@@ -21,6 +24,12 @@ class UserRead(BaseUser[int]):
     is_superuser: bool = Field(exclude=True)
     is_verified: bool = Field(exclude=True)
 
+    @computed_field
+    @property
+    def photo_urls(self) -> dict[int, dict[str, str]]:
+        """Thumbnail URLs by size (px) and format, e.g. ``photo_urls[48]["webp"]``."""
+        return photo_urls(self.photo)
+
 
 class UserCreate(CreateUpdateDictModel):
     first_name: str
@@ -0,0 +1,95 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import jwt
+from fastapi_users import exceptions, models
+from fastapi_users.authentication import JWTStrategy
+from fastapi_users.jwt import decode_jwt
+from fastapi_users.manager import BaseUserManager
+
+from src.config import JWT_CACHE_SIZE
+from src.metrics import Histogram
+
+jwt_seconds = Histogram(
+    "jwt_duration_seconds",
+    "Signing a new token, or checking the signature of one not yet cached.",
+    ("operation",),
+)
+
+
+class CachedJWTStrategy(JWTStrategy):
+    """
+    JWT strategy that remembers tokens it already verified.
+
+    A client sends the same bearer token on every request for its whole
+    lifetime, so the signature is checked once and later reads only cost a
+    dict lookup. Entries are dropped once the token expires.
+    """
+
+    def __init__(self, *args, cache_size: int = JWT_CACHE_SIZE, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_size = cache_size
+        self._tokens: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def decode_user_id(self, token: str) -> Optional[str]:
+        entry = self._tokens.get(token)
+        if entry is not None:
+            user_id, expires_at = entry
+            if expires_at > time.time():
+                self._tokens.move_to_end(token)
+                self.hits += 1
+                return user_id
+            del self._tokens[token]
+
+        self.misses += 1
+        start = time.perf_counter()
+        try:
+            data = decode_jwt(
+                token, self.decode_key, self.token_audience, algorithms=[self.algorithm]
+            )
+        except jwt.PyJWTError:
+            return None
+        finally:
+            jwt_seconds.observe(time.perf_counter() - start, "decode")
+        user_id = data.get("sub")
+        if user_id is None:
+            return None
+
+        self._tokens[token] = (user_id, data.get("exp", float("inf")))
+        while len(self._tokens) > self.cache_size:
+            self._tokens.popitem(last=False)
+        return user_id
+
+    async def read_token(
+        self, token: Optional[str], user_manager: BaseUserManager[models.UP, models.ID]
+    ) -> Optional[models.UP]:
+        if token is None:
+            return None
+
+        user_id = self.decode_user_id(token)
+        if user_id is None:
+            return None
+
+        try:
+            parsed_id = user_manager.parse_id(user_id)
+            return await user_manager.get(parsed_id)
+        except (exceptions.UserNotExists, exceptions.InvalidID):
+            return None
+
+    async def write_token(self, user: models.UP) -> str:
+        start = time.perf_counter()
+        try:
+            return await super().write_token(user)
+        finally:
+            jwt_seconds.observe(time.perf_counter() - start, "encode")
+
+    def metrics(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._tokens),
+            "max_size": self.cache_size,
+        }
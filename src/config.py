@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from fastapi_mail import ConnectionConfig
@@ -16,3 +17,108 @@ conf = ConnectionConfig(
     USE_CREDENTIALS=True,
     VALIDATE_CERTS=True,
 )
+
+# Password hashing pool: "thread" or "process".
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 4))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 64))
+
+# User photo uploads: decoded and re-encoded off the event loop.
+PHOTO_DIR = Path(os.getenv("PHOTO_DIR", BASE_DIR / "static" / "images"))
+PHOTO_MAX_SIZE = int(os.getenv("PHOTO_MAX_SIZE", 1000000))
+# Width times height; a small PNG can still decode to gigabytes of pixels.
+PHOTO_MAX_PIXELS = int(os.getenv("PHOTO_MAX_PIXELS", 4096 * 4096))
+PHOTO_EXTENSIONS = ("jpg", "jpeg", "png")
+PHOTO_WORKERS = int(os.getenv("PHOTO_WORKERS", 2))
+PHOTO_URL = os.getenv("PHOTO_URL", "/static/images")
+# Square thumbnails generated at upload time, in every format.
+PHOTO_VARIANT_SIZES = (48, 128, 512)
+PHOTO_VARIANT_FORMATS = ("webp", "jpeg")
+PHOTO_VARIANT_QUALITY = int(os.getenv("PHOTO_VARIANT_QUALITY", 80))
+# Files are named by content hash; unreferenced ones are collected periodically.
+PHOTO_GC_INTERVAL = float(os.getenv("PHOTO_GC_INTERVAL", 3600))
+PHOTO_GC_GRACE_SECONDS = float(os.getenv("PHOTO_GC_GRACE_SECONDS", 3600))
+
+# Cache lifetime of content-addressed files under /static.
+STATIC_MAX_AGE = int(os.getenv("STATIC_MAX_AGE", 31536000))
+
+# Outbound email queue.
+MAIL_OUTBOX_BATCH_SIZE = int(os.getenv("MAIL_OUTBOX_BATCH_SIZE", 50))
+MAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("MAIL_OUTBOX_MAX_ATTEMPTS", 5))
+MAIL_OUTBOX_POLL_INTERVAL = float(os.getenv("MAIL_OUTBOX_POLL_INTERVAL", 5))
+MAIL_OUTBOX_BACKOFF_BASE = float(os.getenv("MAIL_OUTBOX_BACKOFF_BASE", 2))
+MAIL_OUTBOX_BACKOFF_MAX = float(os.getenv("MAIL_OUTBOX_BACKOFF_MAX", 600))
+MAIL_OUTBOX_LEASE_SECONDS = float(os.getenv("MAIL_OUTBOX_LEASE_SECONDS", 60))
+# Sent messages are deleted after this many days, checked every interval.
+MAIL_OUTBOX_RETENTION_DAYS = float(os.getenv("MAIL_OUTBOX_RETENTION_DAYS", 7))
+MAIL_OUTBOX_PURGE_INTERVAL = float(os.getenv("MAIL_OUTBOX_PURGE_INTERVAL", 3600))
+
+# Per-request SQL statistics (see src/query_stats.py). The Server-Timing
+# header exposes query counts and timings to every client, so it is opt-in.
+QUERY_STATS_SERVER_TIMING = os.getenv("QUERY_STATS_SERVER_TIMING", "0") == "1"
+QUERY_REPEAT_WARNING = int(os.getenv("QUERY_REPEAT_WARNING", 10))
+
+# Prometheus text exposition at /metrics (see src/metrics.py). The endpoint
+# is unauthenticated, so only enable it where the scraper alone can reach it.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0") == "1"
+
+# Pooled SMTP sessions used by the outbox dispatcher.
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", 3))
+SMTP_POOL_IDLE_TIMEOUT = float(os.getenv("SMTP_POOL_IDLE_TIMEOUT", 60))
+SMTP_POOL_MAX_MESSAGES = int(os.getenv("SMTP_POOL_MAX_MESSAGES", 100))
+
+# Strip indentation and blank lines from email templates when they are loaded.
+EMAIL_TEMPLATES_MINIFY = os.getenv("EMAIL_TEMPLATES_MINIFY", "1") == "1"
+
+# In-process cache of users resolved by the auth dependency.
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", 30))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 1024))
+
+# Verified bearer tokens memoized by the JWT strategy.
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", 4096))
+
+# Largest (user_id, team_id) list accepted by the bulk membership endpoints.
+BULK_MEMBERSHIP_MAX_ITEMS = int(os.getenv("BULK_MEMBERSHIP_MAX_ITEMS", 5000))
+
+# Bulk import CLI (python -m src.importer): rows per executemany batch and
+# per committed transaction.
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 1000))
+IMPORT_TRANSACTION_SIZE = int(os.getenv("IMPORT_TRANSACTION_SIZE", 50000))
+
+# Database engine.
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./db.sqlite3")
+DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", 5))
+DATABASE_MAX_OVERFLOW = int(os.getenv("DATABASE_MAX_OVERFLOW", 10))
+DATABASE_POOL_TIMEOUT = float(os.getenv("DATABASE_POOL_TIMEOUT", 30))
+DATABASE_POOL_RECYCLE = int(os.getenv("DATABASE_POOL_RECYCLE", 1800))
+
+# Read replicas for read-only endpoints, as comma-separated URLs.
+DATABASE_REPLICA_URLS = [
+    url for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url
+]
+# "round_robin" or "least_connections".
+DATABASE_REPLICA_STRATEGY = os.getenv("DATABASE_REPLICA_STRATEGY", "round_robin")
+DATABASE_REPLICA_MAX_LAG = float(os.getenv("DATABASE_REPLICA_MAX_LAG", 5))
+DATABASE_REPLICA_LAG_CHECK_INTERVAL = float(
+    os.getenv("DATABASE_REPLICA_LAG_CHECK_INTERVAL", 1)
+)
+# A lag check runs on the request path; a replica that doesn't answer
+# within this many seconds is skipped until its next check.
+DATABASE_REPLICA_LAG_CHECK_TIMEOUT = float(
+    os.getenv("DATABASE_REPLICA_LAG_CHECK_TIMEOUT", 0.25)
+)
+# How long a user's reads stay on the primary after their own write.
+DATABASE_STICKY_SECONDS = float(os.getenv("DATABASE_STICKY_SECONDS", 5))
+
+# PostgreSQL (asyncpg) only: prepared statements cached per connection.
+POSTGRES_STATEMENT_CACHE_SIZE = int(os.getenv("POSTGRES_STATEMENT_CACHE_SIZE", 500))
+
+# Applied to every new SQLite connection.
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", -64 * 1024)),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT", 5000)),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+}
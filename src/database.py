@@ -1,16 +1,140 @@
+import time
 from typing import AsyncGenerator
 
-from fastapi import Depends
-from fastapi_users.db import SQLAlchemyUserDatabase
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from fastapi import Depends, Request
+from sqlalchemy import event, exc, insert, make_url
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
+from src.accounts.cache import CachedUserDatabase
 from src.accounts.models import User
+from src.config import (
+    DATABASE_URL,
+    DATABASE_REPLICA_URLS,
+    DATABASE_POOL_SIZE,
+    DATABASE_MAX_OVERFLOW,
+    DATABASE_POOL_TIMEOUT,
+    DATABASE_POOL_RECYCLE,
+    POSTGRES_STATEMENT_CACHE_SIZE,
+    SQLITE_PRAGMAS,
+)
+from src.metrics import Counter, Gauge, Histogram
+from src.query_stats import instrument_engine
+from src.replicas import ReplicaRouter, sticky_key
 
-DATABASE_URL = "sqlite+aiosqlite:///./db.sqlite3"
 
-engine = create_async_engine(DATABASE_URL)
+pool_checkout_seconds = Histogram(
+    "db_pool_checkout_duration_seconds",
+    "Wait for a pooled connection, including opening one when the pool grows.",
+    ("engine",),
+)
+pool_checkout_timeouts = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after DATABASE_POOL_TIMEOUT.",
+    ("engine",),
+)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """``AsyncAdaptedQueuePool`` that times every checkout under ``name``."""
+
+    name = ""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_checkout_timeouts.inc(self.name)
+            raise
+        finally:
+            pool_checkout_seconds.observe(time.perf_counter() - start, self.name)
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.name = self.name
+        return pool
+
+
+def insert_ignoring_duplicates(table, dialect: str):
+    """INSERT that skips rows hitting a unique constraint."""
+    if dialect == "postgresql":
+        return postgresql.insert(table).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        return sqlite.insert(table).on_conflict_do_nothing()
+    return insert(table)
+
+
+def set_sqlite_pragmas(engine: AsyncEngine, pragmas: dict) -> None:
+    @event.listens_for(engine.sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def build_engine(
+    url: str = DATABASE_URL,
+    pragmas: dict | None = SQLITE_PRAGMAS,
+    **kwargs,
+) -> AsyncEngine:
+    """
+    Create the application engine for the backend named by ``url``.
+
+    SQLite gets per-connection pragmas (WAL, busy timeout, cache sizing...),
+    pass ``pragmas=None`` to keep its defaults. PostgreSQL (asyncpg) gets
+    the prepared statement cache, connection recycling and pre-ping. Every
+    engine reports its statements to ``src.query_stats``, and the default
+    pool its checkout waits to ``/metrics`` under the URL (password hidden).
+    """
+    backend = make_url(url).get_backend_name()
+    if "poolclass" not in kwargs:
+        kwargs["poolclass"] = InstrumentedQueuePool
+        kwargs.setdefault("pool_size", DATABASE_POOL_SIZE)
+        kwargs.setdefault("max_overflow", DATABASE_MAX_OVERFLOW)
+        kwargs.setdefault("pool_timeout", DATABASE_POOL_TIMEOUT)
+        if backend == "postgresql":
+            kwargs.setdefault("pool_recycle", DATABASE_POOL_RECYCLE)
+            kwargs.setdefault("pool_pre_ping", True)
+    if backend == "postgresql":
+        connect_args = kwargs.setdefault("connect_args", {})
+        connect_args.setdefault(
+            "prepared_statement_cache_size", POSTGRES_STATEMENT_CACHE_SIZE
+        )
+    engine = create_async_engine(url, **kwargs)
+    if backend == "sqlite" and pragmas:
+        set_sqlite_pragmas(engine, pragmas)
+    instrument_engine(engine)
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.name = engine.url.render_as_string(hide_password=True)
+    return engine
+
+
+engine = build_engine()
 async_session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+read_router = ReplicaRouter(
+    engine, [build_engine(url) for url in DATABASE_REPLICA_URLS]
+)
+
+
+def pool_connections() -> dict[tuple[str, str], int]:
+    values = {}
+    for pool in (engine.pool, *(replica.pool for replica in read_router.replicas)):
+        if isinstance(pool, InstrumentedQueuePool):
+            values[(pool.name, "checked_out")] = pool.checkedout()
+            values[(pool.name, "idle")] = pool.checkedin()
+    return values
+
+
+Gauge(
+    "db_pool_connections",
+    "Open connections of the application pools, checked out or idle.",
+    ("engine", "state"),
+    callback=pool_connections,
+)
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
@@ -18,5 +142,21 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+async def get_read_session(
+    request: Request,
+    session: AsyncSession = Depends(get_async_session),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for read-only endpoints: a healthy replica when one is configured,
+    otherwise (or right after the caller's own write) the primary session.
+    """
+    engine = await read_router.select(sticky_key(request.headers))
+    if engine is read_router.primary:
+        yield session
+        return
+    async with read_router.session(engine) as replica_session:
+        yield replica_session
+
+
 async def get_user_db(session: AsyncSession = Depends(get_async_session)):
-    yield SQLAlchemyUserDatabase(session, User)
+    yield CachedUserDatabase(session, User)
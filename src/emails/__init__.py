@@ -0,0 +1,3 @@
+__all__ = ("OutboxMessage",)
+
+from src.emails.models import OutboxMessage
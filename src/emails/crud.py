@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from fastapi_mail import MessageSchema
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.emails.models import OutboxMessage, OutboxStatus, utcnow
+
+
+async def enqueue_message(session: AsyncSession, message: MessageSchema):
+    outbox_message = OutboxMessage(
+        recipients=[str(recipient) for recipient in message.recipients],
+        subject=message.subject,
+        body=message.body,
+        subtype=message.subtype.value,
+    )
+    session.add(outbox_message)
+    await session.commit()
+    return outbox_message
+
+
+async def claim_due_messages(
+    session: AsyncSession,
+    batch_size: int,
+    lease_seconds: float,
+) -> list[OutboxMessage]:
+    """
+    Lease a batch of due messages so concurrent dispatchers don't send
+    the same message twice. A lease that is never released (e.g. the
+    worker crashed mid-send) expires and the message becomes due again.
+    """
+    now = utcnow()
+    due_ids = select(OutboxMessage.id).where(
+        OutboxMessage.status == OutboxStatus.PENDING,
+        OutboxMessage.next_attempt_at <= now,
+    )
+    stmt = (
+        update(OutboxMessage)
+        .where(
+            OutboxMessage.id.in_(
+                due_ids.order_by(OutboxMessage.id).limit(batch_size).scalar_subquery()
+            ),
+            OutboxMessage.next_attempt_at <= now,
+        )
+        .values(
+            next_attempt_at=now + timedelta(seconds=lease_seconds),
+            attempts=OutboxMessage.attempts + 1,
+        )
+        .returning(OutboxMessage)
+    )
+    result = await session.scalars(
+        stmt, execution_options={"synchronize_session": False}
+    )
+    messages = list(result.all())
+    await session.commit()
+    return messages
+
+
+async def mark_sent(session: AsyncSession, message: OutboxMessage):
+    message.status = OutboxStatus.SENT
+    message.sent_at = utcnow()
+    message.last_error = ""
+    session.add(message)
+    await session.commit()
+
+
+async def mark_failed(
+    session: AsyncSession,
+    message: OutboxMessage,
+    error: str,
+    max_attempts: int,
+    retry_in: float,
+):
+    message.last_error = error
+    if message.attempts >= max_attempts:
+        message.status = OutboxStatus.FAILED
+    else:
+        message.next_attempt_at = utcnow() + timedelta(seconds=retry_in)
+    session.add(message)
+    await session.commit()
+
+
+async def delete_sent(session: AsyncSession, older_than: timedelta) -> int:
+    """Delete messages sent more than ``older_than`` ago; return how many."""
+    result = await session.execute(
+        delete(OutboxMessage).where(
+            OutboxMessage.status == OutboxStatus.SENT,
+            OutboxMessage.sent_at < utcnow() - older_than,
+        )
+    )
+    await session.commit()
+    return result.rowcount
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import Optional
+
+from fastapi_mail import ConnectionConfig, MessageSchema, MessageType
+from sqlalchemy.orm import sessionmaker
+
+from src.config import (
+    conf,
+    MAIL_OUTBOX_BATCH_SIZE,
+    MAIL_OUTBOX_MAX_ATTEMPTS,
+    MAIL_OUTBOX_POLL_INTERVAL,
+    MAIL_OUTBOX_BACKOFF_BASE,
+    MAIL_OUTBOX_BACKOFF_MAX,
+    MAIL_OUTBOX_LEASE_SECONDS,
+    MAIL_OUTBOX_RETENTION_DAYS,
+    MAIL_OUTBOX_PURGE_INTERVAL,
+)
+from src.database import async_session_maker
+from src.emails.crud import claim_due_messages, delete_sent, mark_sent, mark_failed
+from src.emails.models import OutboxMessage
+from src.emails.smtp import SMTPConnectionPool
+from src.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+outbox_messages = Counter(
+    "mail_outbox_messages_total",
+    "Outbox send attempts by result; failed ones are retried or given up.",
+    ("result",),
+)
+
+
+class OutboxDispatcher:
+    """
+    Background task that drains the email outbox in batches.
+
+    Failed sends are retried with exponential backoff until
+    ``max_attempts`` is reached, after which the message is marked failed.
+    Every ``purge_interval`` seconds, messages sent more than
+    ``retention_days`` ago are deleted.
+    """
+
+    def __init__(
+        self,
+        session_maker: sessionmaker,
+        mail_conf: ConnectionConfig = conf,
+        batch_size: int = MAIL_OUTBOX_BATCH_SIZE,
+        max_attempts: int = MAIL_OUTBOX_MAX_ATTEMPTS,
+        poll_interval: float = MAIL_OUTBOX_POLL_INTERVAL,
+        backoff_base: float = MAIL_OUTBOX_BACKOFF_BASE,
+        backoff_max: float = MAIL_OUTBOX_BACKOFF_MAX,
+        lease_seconds: float = MAIL_OUTBOX_LEASE_SECONDS,
+        retention_days: float = MAIL_OUTBOX_RETENTION_DAYS,
+        purge_interval: float = MAIL_OUTBOX_PURGE_INTERVAL,
+    ) -> None:
+        self.session_maker = session_maker
+        self.smtp_pool = SMTPConnectionPool(mail_conf)
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease_seconds = lease_seconds
+        self.retention_days = retention_days
+        self.purge_interval = purge_interval
+        self._purged_at: Optional[float] = None
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def backoff(self, attempts: int) -> float:
+        return min(self.backoff_base * 2 ** (attempts - 1), self.backoff_max)
+
+    def notify(self) -> None:
+        """Wake the dispatcher up so freshly enqueued mail goes out right away."""
+        self._wakeup.set()
+
+    @staticmethod
+    def build_message(message: OutboxMessage) -> MessageSchema:
+        return MessageSchema(
+            subject=message.subject,
+            recipients=message.recipients,
+            body=message.body,
+            subtype=MessageType(message.subtype),
+        )
+
+    async def dispatch_batch(self) -> int:
+        """Send one batch of due messages and return how many were claimed."""
+        async with self.session_maker() as session:
+            messages = await claim_due_messages(
+                session,
+                batch_size=self.batch_size,
+                lease_seconds=self.lease_seconds,
+            )
+            errors = await self.smtp_pool.send_messages(
+                [self.build_message(message) for message in messages]
+            )
+            for message, error in zip(messages, errors):
+                if error is None:
+                    outbox_messages.inc("sent")
+                    await mark_sent(session, message)
+                else:
+                    outbox_messages.inc("failed")
+                    logger.warning("Failed to send email %s: %s", message.id, error)
+                    await mark_failed(
+                        session,
+                        message,
+                        error=str(error),
+                        max_attempts=self.max_attempts,
+                        retry_in=self.backoff(message.attempts),
+                    )
+            return len(messages)
+
+    async def purge_sent(self) -> int:
+        """Delete messages sent before the retention period; return how many."""
+        async with self.session_maker() as session:
+            return await delete_sent(session, timedelta(days=self.retention_days))
+
+    async def run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                while await self.dispatch_batch() == self.batch_size:
+                    pass
+            except Exception:
+                logger.exception("Email outbox dispatch failed")
+            now = time.monotonic()
+            if self._purged_at is None or now - self._purged_at >= self.purge_interval:
+                self._purged_at = now
+                try:
+                    removed = await self.purge_sent()
+                    if removed:
+                        logger.info("Deleted %d sent emails from the outbox", removed)
+                except Exception:
+                    logger.exception("Email outbox purge failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.smtp_pool.close()
+
+
+dispatcher = OutboxDispatcher(async_session_maker)
@@ -0,0 +1,44 @@
+from datetime import datetime, timezone
+from enum import Enum
+
+from sqlalchemy import String, Text, JSON, DateTime, Index, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.models import Base
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class OutboxStatus(str, Enum):
+    PENDING = "Pending"
+    SENT = "Sent"
+    FAILED = "Failed"
+
+
+class OutboxMessage(Base):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    recipients: Mapped[list[str]] = mapped_column(JSON())
+    subject: Mapped[str] = mapped_column(String(length=256))
+    body: Mapped[str] = mapped_column(Text())
+    subtype: Mapped[str] = mapped_column(String(length=16), default="html")
+    status: Mapped[OutboxStatus] = mapped_column(default=OutboxStatus.PENDING)
+    attempts: Mapped[int] = mapped_column(default=0, server_default="0")
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(),
+        default=utcnow,
+        server_default=func.now(),
+    )
+    last_error: Mapped[str] = mapped_column(Text(), default="", server_default="")
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(),
+        default=utcnow,
+        server_default=func.now(),
+    )
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime())
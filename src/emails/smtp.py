@@ -0,0 +1,211 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from email.message import EmailMessage
+from email.utils import formatdate, make_msgid
+from typing import AsyncIterator, Optional
+
+import aiosmtplib
+from fastapi_mail import ConnectionConfig, MessageSchema, MessageType
+
+from src.config import (
+    SMTP_POOL_SIZE,
+    SMTP_POOL_IDLE_TIMEOUT,
+    SMTP_POOL_MAX_MESSAGES,
+)
+from src.metrics import Histogram
+
+mail_send_seconds = Histogram(
+    "mail_send_duration_seconds",
+    "SMTP delivery of one message over a pooled session.",
+    ("result",),
+)
+
+
+def build_mime(message: MessageSchema, sender: str) -> EmailMessage:
+    """
+    The MIME message for ``message``: its body, plus the alternative body
+    when there is one, and the usual headers. Attachments are not supported.
+    """
+    if message.attachments:
+        raise ValueError("Pooled SMTP delivery does not support attachments")
+    mime = EmailMessage()
+    mime["Date"] = formatdate(localtime=True)
+    mime["Message-ID"] = make_msgid()
+    mime["From"] = sender
+    mime["To"] = ", ".join(message.recipients)
+    if message.subject:
+        mime["Subject"] = message.subject
+    for header, addresses in (
+        ("Cc", message.cc),
+        ("Bcc", message.bcc),
+        ("Reply-To", message.reply_to),
+    ):
+        if addresses:
+            mime[header] = ", ".join(addresses)
+    for name, value in (message.headers or {}).items():
+        mime[name] = value
+
+    parts = [(message.body or "", message.subtype.value)]
+    if message.alternative_body is not None:
+        other = "plain" if message.subtype == MessageType.html else "html"
+        parts.append((message.alternative_body, other))
+    # Alternatives go from the plainest to the richest.
+    parts.sort(key=lambda part: part[1] != "plain")
+    (body, subtype), *alternatives = parts
+    mime.set_content(body, subtype=subtype, charset=message.charset)
+    for body, subtype in alternatives:
+        mime.add_alternative(body, subtype=subtype, charset=message.charset)
+    return mime
+
+
+class PooledConnection:
+    def __init__(self, smtp: aiosmtplib.SMTP) -> None:
+        self.smtp = smtp
+        self.last_used = time.monotonic()
+        self.sent = 0
+
+
+class SMTPConnectionPool:
+    """
+    Keeps up to ``size`` authenticated SMTP sessions open and reuses them
+    for consecutive messages instead of paying a TCP+STARTTLS+AUTH
+    handshake per email.
+
+    Sessions idle for longer than ``idle_timeout`` (servers drop them
+    anyway) or that already carried ``max_messages`` are recycled.
+    """
+
+    def __init__(
+        self,
+        mail_conf: ConnectionConfig,
+        size: int = SMTP_POOL_SIZE,
+        idle_timeout: float = SMTP_POOL_IDLE_TIMEOUT,
+        max_messages: int = SMTP_POOL_MAX_MESSAGES,
+    ) -> None:
+        self.mail_conf = mail_conf
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.max_messages = max_messages
+        self._idle: list[PooledConnection] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def sender(self) -> str:
+        if self.mail_conf.MAIL_FROM_NAME is not None:
+            return f"{self.mail_conf.MAIL_FROM_NAME} <{self.mail_conf.MAIL_FROM}>"
+        return self.mail_conf.MAIL_FROM
+
+    async def _connect(self) -> PooledConnection:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.mail_conf.MAIL_SERVER,
+            port=self.mail_conf.MAIL_PORT,
+            timeout=self.mail_conf.TIMEOUT,
+            use_tls=self.mail_conf.MAIL_SSL_TLS,
+            start_tls=self.mail_conf.MAIL_STARTTLS,
+            validate_certs=self.mail_conf.VALIDATE_CERTS,
+        )
+        await smtp.connect()
+        if self.mail_conf.USE_CREDENTIALS:
+            await smtp.login(
+                self.mail_conf.MAIL_USERNAME,
+                self.mail_conf.MAIL_PASSWORD,
+            )
+        return PooledConnection(smtp)
+
+    @staticmethod
+    async def _close(connection: PooledConnection) -> None:
+        try:
+            await connection.smtp.quit()
+        except aiosmtplib.SMTPException:
+            connection.smtp.close()
+
+    def _is_stale(self, connection: PooledConnection) -> bool:
+        return (
+            not connection.smtp.is_connected
+            or time.monotonic() - connection.last_used > self.idle_timeout
+            or connection.sent >= self.max_messages
+        )
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[PooledConnection]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.size)
+        async with self._semaphore:
+            connection = None
+            while self._idle and connection is None:
+                connection = self._idle.pop()
+                if self._is_stale(connection):
+                    await self._close(connection)
+                    connection = None
+            if connection is None:
+                connection = await self._connect()
+            try:
+                yield connection
+            except BaseException:
+                await self._close(connection)
+                raise
+            connection.last_used = time.monotonic()
+            self._idle.append(connection)
+
+    async def _send(
+        self, connection: PooledConnection, message: MessageSchema
+    ) -> PooledConnection:
+        start = time.perf_counter()
+        result = "error"
+        try:
+            mime = build_mime(message, self.sender)
+            try:
+                await connection.smtp.send_message(mime)
+            except aiosmtplib.SMTPServerDisconnected:
+                # The server closed an idle session under us; reconnect once.
+                connection.smtp.close()
+                fresh = await self._connect()
+                connection.smtp, connection.sent = fresh.smtp, 0
+                await connection.smtp.send_message(mime)
+            result = "sent"
+        finally:
+            mail_send_seconds.observe(time.perf_counter() - start, result)
+        connection.sent += 1
+        return connection
+
+    async def send_message(self, message: MessageSchema) -> None:
+        async with self.connection() as connection:
+            await self._send(connection, message)
+
+    async def send_messages(
+        self, messages: list[MessageSchema]
+    ) -> list[Optional[Exception]]:
+        """
+        Send ``messages`` over the pool, one chunk of consecutive messages
+        per session, and return the error (or None) for every message.
+        """
+        results: list[Optional[Exception]] = [None] * len(messages)
+        if not messages:
+            return results
+        chunk_size = -(-len(messages) // self.size)
+
+        async def send_chunk(indexes: list[int]):
+            try:
+                async with self.connection() as connection:
+                    while indexes:
+                        try:
+                            await self._send(connection, messages[indexes[0]])
+                        except aiosmtplib.SMTPRecipientsRefused as e:
+                            results[indexes[0]] = e
+                        indexes.pop(0)
+            except Exception as e:
+                for index in indexes:
+                    results[index] = e
+
+        await asyncio.gather(
+            *(
+                send_chunk(list(range(start, min(start + chunk_size, len(messages)))))
+                for start in range(0, len(messages), chunk_size)
+            )
+        )
+        return results
+
+    async def close(self) -> None:
+        while self._idle:
+            await self._close(self._idle.pop())
@@ -0,0 +1,44 @@
+from pathlib import Path
+
+from jinja2 import Environment, FunctionLoader, Template
+
+from src.config import BASE_DIR, EMAIL_TEMPLATES_MINIFY
+
+
+def minify_html(source: str) -> str:
+    """
+    Drop indentation and blank lines. Every line is stripped alike, inside
+    Outlook conditional comments too, so whitespace that matters (``<pre>``
+    or ``white-space: pre``) would be lost; our templates have none.
+    """
+    return "\n".join(line.strip() for line in source.splitlines() if line.strip())
+
+
+class EmailTemplates:
+    """
+    Loads and compiles every email template once and renders them straight
+    to strings, without going through a Starlette ``TemplateResponse``.
+    """
+
+    def __init__(self, directory: Path, minify: bool = EMAIL_TEMPLATES_MINIFY):
+        self.directory = directory
+        self.minify = minify
+        self.env = Environment(
+            loader=FunctionLoader(self._load_source),
+            autoescape=True,
+            auto_reload=False,
+        )
+        self.templates: dict[str, Template] = {
+            path.name: self.env.get_template(path.name)
+            for path in sorted(directory.glob("*.html"))
+        }
+
+    def _load_source(self, name: str) -> str:
+        source = (self.directory / name).read_text(encoding="utf-8")
+        return minify_html(source) if self.minify else source
+
+    def render(self, name: str, **context) -> str:
+        return self.templates[name].render(**context)
+
+
+templates = EmailTemplates(BASE_DIR / "src" / "emails")
@@ -0,0 +1,37 @@
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts) -> str:
+    """
+    Weak ETag from row versions, e.g. ``W/"team-3-7-12"``. Weak because it
+    names the data, not the exact bytes of its JSON rendering.
+    """
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+
+def if_none_match(request: Request, etag: str) -> bool:
+    """Whether the client's If-None-Match already covers ``etag``."""
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque for tag in header.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+def user_etag(user) -> str:
+    return make_etag("user", user.id, user.version)
+
+
+def team_etag(team) -> str:
+    """Must agree with ``crud.get_team_version`` for the same team."""
+    return make_etag(
+        "team", team.id, team.version, sum(member.version for member in team.members)
+    )
@@ -1,13 +1,41 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import ORJSONResponse
 from fastapi_pagination import add_pagination
 
+from src.accounts.password import password_helper
+from src.accounts.photo_gc import photo_collector
+from src.accounts.photos import photo_processor
 from src.accounts.router import router as accounts_router
-from src.config import BASE_DIR
+from src.config import BASE_DIR, METRICS_ENABLED
+from src.database import read_router
+from src.emails.dispatcher import dispatcher
+from src.metrics import MetricsMiddleware, router as metrics_router
+from src.query_stats import QueryStatsMiddleware
+from src.replicas import ReadYourWritesMiddleware
+from src.search.router import router as search_router
+from src.static import CachedStaticFiles
 from src.teams.router import router as teams_router
 
-app = FastAPI(title="BitBuddies")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    dispatcher.start()
+    photo_collector.start()
+    yield
+    await photo_collector.stop()
+    await dispatcher.stop()
+    password_helper.shutdown()
+    photo_processor.shutdown()
+
+
+app = FastAPI(
+    title="BitBuddies",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -16,6 +44,11 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ReadYourWritesMiddleware, router=read_router)
+app.add_middleware(QueryStatsMiddleware)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
 
 app.include_router(accounts_router)
 
@@ -26,7 +59,13 @@ app.include_router(
     tags=["teams"],
 )
 
+app.include_router(
+    search_router,
+    prefix="/search",
+    tags=["search"],
+)
+
 
-app.mount("/static", StaticFiles(directory=f"{BASE_DIR}/static"), name="static")
+app.mount("/static", CachedStaticFiles(directory=f"{BASE_DIR}/static"), name="static")
 
 add_pagination(app)
@@ -0,0 +1,253 @@
+import math
+import time
+from bisect import bisect_left
+from typing import Callable, Iterator, Optional, Sequence
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Starlette appends the charset.
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Upper bounds in seconds, for anything from a cached lookup to an SMTP send.
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _labels(names: Sequence[str], values: Sequence) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _number(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Registry:
+    """The metrics served by ``/metrics``, rendered in registration order."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, "Metric"] = {}
+
+    def register(self, metric: "Metric") -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        return "".join(metric.render() for metric in self._metrics.values())
+
+
+REGISTRY = Registry()
+
+
+class Metric:
+    """
+    A named family of samples, one per combination of label values. Values
+    are plain dict entries updated from the event loop, so recording costs
+    a dict lookup and an addition; pass label values positionally, in the
+    order of ``labelnames``.
+
+    A ``callback`` reads the values at scrape time instead, from counters
+    the instrumented object already keeps: a number, or a dict keyed by
+    label value tuples when the metric has labels.
+    """
+
+    type = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[Callable[[], object]] = None,
+        registry: Registry = REGISTRY,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+        self._values: dict[tuple, float] = {}
+        registry.register(self)
+
+    def value(self, *labels: str) -> float:
+        return self.values().get(labels, 0)
+
+    def values(self) -> dict[tuple, float]:
+        if self.callback is None:
+            return dict(self._values)
+        values = self.callback()
+        return values if self.labelnames else {(): values}
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in self.values().items():
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+            *self.samples(),
+        ]
+        return "\n".join(lines) + "\n"
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+
+class Histogram(Metric):
+    """
+    Observations counted into fixed buckets. Each series keeps one count
+    per bucket plus the sum; buckets are only made cumulative when scraped.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+        registry: Registry = REGISTRY,
+    ) -> None:
+        super().__init__(name, documentation, labelnames, registry=registry)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[:-1]) if series is not None else 0
+
+    def sum(self, *labels: str) -> float:
+        series = self._series.get(labels)
+        return series[-1] if series is not None else 0.0
+
+    def samples(self) -> Iterator[str]:
+        for labels, series in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), series):
+                cumulative += count
+                bucket_labels = _labels(
+                    (*self.labelnames, "le"), (*labels, _number(bound))
+                )
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            label_text = _labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_text} {_number(series[-1])}"
+            yield f"{self.name}_count{label_text} {cumulative}"
+
+
+http_requests = Counter(
+    "http_requests_total",
+    "HTTP responses by route template and status code.",
+    ("method", "route", "status"),
+)
+http_request_seconds = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response.",
+    ("method", "route"),
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress", "Requests currently being handled."
+)
+
+
+# Any other method a client sends is counted as "other", so it can't add series.
+HTTP_METHODS = frozenset(
+    ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "CONNECT", "TRACE")
+)
+
+
+def route_template(scope: Scope, root_path: str) -> str:
+    """
+    The path pattern that handled the request, e.g. ``/teams/{team_id}``,
+    so label values stay bounded whatever the URLs; ``unmatched`` for 404s.
+    """
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    mount_path = scope.get("root_path", "")[len(root_path):]
+    if mount_path:
+        return f"{mount_path}/{{path}}"
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Counts and times every HTTP request under its route template."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        root_path = scope.get("root_path", "")
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_requests_in_progress.dec()
+            method = scope["method"]
+            if method not in HTTP_METHODS:
+                method = "other"
+            route = route_template(scope, root_path)
+            http_request_seconds.observe(elapsed, method, route)
+            http_requests.inc(method, route, str(status_code))
+
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -1,5 +1,24 @@
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy import literal_column
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
 class Base(DeclarativeBase):
     pass
+
+
+class VersionedMixin:
+    """
+    A row version for ETags. Every UPDATE SQLAlchemy emits for the table,
+    from a flush or an ``update()`` statement, increments it in SQL unless
+    the statement sets it itself; hand-written SQL has to bump it too.
+    ``eager_defaults`` reads the new value back with RETURNING rather than
+    expiring it and loading it again on next access.
+    """
+
+    __mapper_args__ = {"eager_defaults": True}
+
+    version: Mapped[int] = mapped_column(
+        default=1,
+        server_default="1",
+        onupdate=literal_column("version + 1"),
+    )
@@ -0,0 +1,107 @@
+import base64
+import json
+from typing import Any, Generic, Optional, Sequence, TypeVar
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+T = TypeVar("T")
+
+
+class CursorParams(BaseModel):
+    cursor: Optional[str] = None
+    size: int = 50
+    include_total: bool = False
+
+
+def get_cursor_params(
+    cursor: Optional[str] = Query(None, description="Opaque page cursor"),
+    size: int = Query(50, ge=1, le=100, description="Page size"),
+    include_total: bool = Query(False, description="Also count all matching rows"),
+) -> CursorParams:
+    return CursorParams(cursor=cursor, size=size, include_total=include_total)
+
+
+class CursorPage(BaseModel, Generic[T]):
+    items: Sequence[T]
+    total: Optional[int] = None
+    size: int
+    next_cursor: Optional[str] = None
+    previous_cursor: Optional[str] = None
+
+
+def encode_cursor(values: Sequence[Any], backwards: bool = False) -> str:
+    payload = json.dumps({"k": list(values), "b": backwards}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, length: int) -> tuple[list[Any], bool]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        values, backwards = payload["k"], payload["b"]
+        if not isinstance(values, list) or len(values) != length:
+            raise ValueError
+        return values, bool(backwards)
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="INVALID_CURSOR",
+        )
+
+
+async def paginate_keyset(
+    session: AsyncSession,
+    query: Select,
+    order_by: Sequence,
+    params: CursorParams,
+) -> CursorPage:
+    """
+    Seek-based pagination over ``order_by`` (which must end in a unique
+    column, e.g. ``(Team.title, Team.id)``). Unlike OFFSET, every page costs
+    the same, and the total is only counted when asked for.
+    """
+    total = None
+    if params.include_total:
+        total = await session.scalar(
+            select(func.count()).select_from(query.order_by(None).subquery())
+        )
+
+    backwards = False
+    page_query = query.order_by(None)
+    if params.cursor:
+        values, backwards = decode_cursor(params.cursor, len(order_by))
+        key = tuple_(*order_by)
+        page_query = page_query.where(
+            key < tuple_(*values) if backwards else key > tuple_(*values)
+        )
+    page_query = page_query.order_by(
+        *(column.desc() if backwards else column.asc() for column in order_by)
+    ).limit(params.size + 1)
+
+    result = await session.execute(page_query)
+    items = list(result.scalars().all())
+    has_more = len(items) > params.size
+    items = items[: params.size]
+    if backwards:
+        items.reverse()
+
+    def key_of(item) -> list[Any]:
+        return [getattr(item, column.key) for column in order_by]
+
+    next_cursor = previous_cursor = None
+    if items:
+        if has_more or backwards:
+            next_cursor = encode_cursor(key_of(items[-1]))
+        if (has_more and backwards) or (params.cursor and not backwards):
+            previous_cursor = encode_cursor(key_of(items[0]), backwards=True)
+
+    return CursorPage(
+        items=items,
+        total=total,
+        size=params.size,
+        next_cursor=next_cursor,
+        previous_cursor=previous_cursor,
+    )
@@ -0,0 +1,229 @@
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import QUERY_STATS_SERVER_TIMING, QUERY_REPEAT_WARNING
+from src.metrics import HTTP_METHODS, Counter as MetricCounter, Gauge
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """
+    The SQL statements run while this collector is active and the time they
+    took. Collectors nest: a statement is recorded in the innermost one and
+    in every collector around it.
+    """
+
+    def __init__(self, parent: Optional["QueryStats"] = None) -> None:
+        self.parent = parent
+        self.count = 0
+        self.duration = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.slowest_duration = 0.0
+        self.statements: list[str] = []
+        self._executions: Counter = Counter()
+
+    def record(self, statement: str, parameters, duration: float) -> None:
+        execution = (statement, hash(repr(parameters)))
+        stats = self
+        while stats is not None:
+            stats.count += 1
+            stats.duration += duration
+            if duration >= stats.slowest_duration:
+                stats.slowest_statement = statement
+                stats.slowest_duration = duration
+            stats.statements.append(statement)
+            stats._executions[execution] += 1
+            stats = stats.parent
+
+    def repeated(self, threshold: int = 2) -> dict[str, int]:
+        """
+        SQL run at least ``threshold`` times, whatever the parameters: the
+        signature of an N+1 loop.
+        """
+        counts = Counter(self.statements)
+        return {sql: count for sql, count in counts.items() if count >= threshold}
+
+    def duplicates(self) -> dict[str, int]:
+        """Statements run more than once with the very same parameters."""
+        return {
+            statement: count
+            for (statement, _), count in self._executions.items()
+            if count > 1
+        }
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.duration * 1e3:.2f};desc="{self.count} queries", '
+            f"db-slowest;dur={self.slowest_duration * 1e3:.2f}"
+        )
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def collect_queries() -> Iterator[QueryStats]:
+    """Record every statement run in the current context until exit."""
+    stats = QueryStats(parent=_current.get())
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Time each statement on ``engine`` into the active ``QueryStats``."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, *args):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, *args):
+        duration = time.perf_counter() - conn.info["query_started"].pop()
+        stats = _current.get()
+        if stats is not None:
+            stats.record(statement, parameters, duration)
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def handle_error(context):
+        if context.connection is not None:
+            started = context.connection.info.get("query_started")
+            if started:
+                started.pop()
+
+
+class QueryMetrics:
+    """Per-route totals of the SQL that requests ran."""
+
+    def __init__(self) -> None:
+        self.routes: dict[tuple[str, str], dict] = {}
+
+    def observe(self, method: str, route: str, stats: QueryStats) -> None:
+        entry = self.routes.get((method, route))
+        if entry is None:
+            entry = self.routes[(method, route)] = {
+                "requests": 0,
+                "queries": 0,
+                "db_seconds": 0.0,
+                "max_queries": 0,
+                "slowest_seconds": 0.0,
+                "slowest_statement": None,
+            }
+        entry["requests"] += 1
+        entry["queries"] += stats.count
+        entry["db_seconds"] += stats.duration
+        entry["max_queries"] = max(entry["max_queries"], stats.count)
+        if stats.slowest_duration > entry["slowest_seconds"]:
+            entry["slowest_seconds"] = stats.slowest_duration
+            entry["slowest_statement"] = stats.slowest_statement
+
+    def metrics(self) -> dict:
+        return {key: dict(entry) for key, entry in self.routes.items()}
+
+    def values(self, field: str) -> dict[tuple[str, str], float]:
+        """One aggregate of every route, keyed by ``(method, route)``."""
+        return {key: entry[field] for key, entry in self.routes.items()}
+
+
+query_metrics = QueryMetrics()
+
+MetricCounter(
+    "db_route_requests_total",
+    "Requests whose SQL was recorded, by method and route template.",
+    ("method", "route"),
+    callback=lambda: query_metrics.values("requests"),
+)
+MetricCounter(
+    "db_route_queries_total",
+    "SQL statements run by requests, by method and route template.",
+    ("method", "route"),
+    callback=lambda: query_metrics.values("queries"),
+)
+MetricCounter(
+    "db_route_query_duration_seconds_total",
+    "Time requests spent in SQL statements, by method and route template.",
+    ("method", "route"),
+    callback=lambda: query_metrics.values("db_seconds"),
+)
+Gauge(
+    "db_route_max_queries",
+    "Most SQL statements a single request of the route has run.",
+    ("method", "route"),
+    callback=lambda: query_metrics.values("max_queries"),
+)
+Gauge(
+    "db_route_slowest_query_seconds",
+    "Slowest single SQL statement a request of the route has run.",
+    ("method", "route"),
+    callback=lambda: query_metrics.values("slowest_seconds"),
+)
+
+
+class QueryStatsMiddleware:
+    """
+    Collects the SQL each HTTP request runs. The count, total time and
+    slowest statement are added to ``query_metrics``, which ``/metrics``
+    serves, under the method and route template and, with
+    ``server_timing``, sent in a ``Server-Timing`` header. A statement
+    repeated ``repeat_warning`` times is logged as a likely N+1. The header
+    only covers queries run before the response starts.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        metrics: QueryMetrics = query_metrics,
+        server_timing: bool = QUERY_STATS_SERVER_TIMING,
+        repeat_warning: int = QUERY_REPEAT_WARNING,
+    ) -> None:
+        self.app = app
+        self.metrics = metrics
+        self.server_timing = server_timing
+        self.repeat_warning = repeat_warning
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with collect_queries() as stats:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start" and self.server_timing:
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing", stats.server_timing()
+                    )
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                self.finish(scope, stats)
+
+    def finish(self, scope: Scope, stats: QueryStats) -> None:
+        route = scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        # Starlette sets the route on 405s too, whatever the method was.
+        method = scope["method"] if scope["method"] in HTTP_METHODS else "other"
+        self.metrics.observe(method, path, stats)
+        repeated = stats.repeated(self.repeat_warning)
+        if repeated:
+            logger.warning(
+                "%s %s ran the same SQL %d times, likely an N+1: %s",
+                method,
+                path,
+                max(repeated.values()),
+                max(repeated, key=repeated.get),
+            )
@@ -0,0 +1,218 @@
+import asyncio
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Hashable, Optional, Sequence
+
+from fastapi.security.utils import get_authorization_scheme_param
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.accounts.config import jwt_strategy
+from src.config import (
+    DATABASE_REPLICA_STRATEGY,
+    DATABASE_REPLICA_MAX_LAG,
+    DATABASE_REPLICA_LAG_CHECK_INTERVAL,
+    DATABASE_REPLICA_LAG_CHECK_TIMEOUT,
+    DATABASE_STICKY_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+LagProbe = Callable[[AsyncConnection], Awaitable[float]]
+
+POSTGRES_REPLICA_LAG = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery()"
+    " OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())"
+    " END"
+)
+
+
+async def replica_lag(connection: AsyncConnection) -> float:
+    """
+    Seconds the replica is behind its primary. SQLite has no replication,
+    so a SQLite "replica" (e.g. a copied file) is always considered current.
+    """
+    if connection.dialect.name == "postgresql":
+        return float(await connection.scalar(POSTGRES_REPLICA_LAG) or 0)
+    return 0.0
+
+
+class ReplicaRouter:
+    """
+    Picks the engine that serves a read-only request.
+
+    Replicas are chosen round-robin or by fewest sessions in flight
+    (``least_connections``). A replica whose lag exceeds ``max_lag``, or
+    whose probe fails or takes longer than ``lag_check_timeout``, is skipped
+    until its next check, and reads fall back to the primary when no
+    replica qualifies. After ``mark_write(key)`` the
+    same key reads from the primary for ``sticky_seconds`` so users see
+    their own writes.
+    """
+
+    strategies = ("round_robin", "least_connections")
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: Sequence[AsyncEngine] = (),
+        strategy: str = DATABASE_REPLICA_STRATEGY,
+        max_lag: float = DATABASE_REPLICA_MAX_LAG,
+        lag_check_interval: float = DATABASE_REPLICA_LAG_CHECK_INTERVAL,
+        lag_check_timeout: float = DATABASE_REPLICA_LAG_CHECK_TIMEOUT,
+        sticky_seconds: float = DATABASE_STICKY_SECONDS,
+        lag_probe: LagProbe = replica_lag,
+    ) -> None:
+        if strategy not in self.strategies:
+            raise ValueError(f"Unknown replica strategy {strategy!r}")
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.strategy = strategy
+        self.max_lag = max_lag
+        self.lag_check_interval = lag_check_interval
+        self.lag_check_timeout = lag_check_timeout
+        self.sticky_seconds = sticky_seconds
+        self.lag_probe = lag_probe
+        self._counter = itertools.count()
+        self._sticky: dict[Hashable, float] = {}
+        self._lag: dict[AsyncEngine, Optional[float]] = {}
+        self._checked_at: dict[AsyncEngine, float] = {}
+        self._in_flight: dict[AsyncEngine, int] = {}
+        self._session_makers: dict[AsyncEngine, sessionmaker] = {}
+
+    def mark_write(self, key: Optional[Hashable]) -> None:
+        if key is None or not self.sticky_seconds:
+            return
+        now = time.monotonic()
+        self._sticky[key] = now + self.sticky_seconds
+        if len(self._sticky) > 1024:
+            self._sticky = {
+                key: until for key, until in self._sticky.items() if until > now
+            }
+
+    def is_sticky(self, key: Optional[Hashable]) -> bool:
+        if key is None:
+            return False
+        until = self._sticky.get(key)
+        if until is None:
+            return False
+        if until > time.monotonic():
+            return True
+        del self._sticky[key]
+        return False
+
+    async def lag(self, engine: AsyncEngine) -> Optional[float]:
+        """
+        Replica lag in seconds, re-probed at most every ``lag_check_interval``.
+        ``None`` means the replica could not be reached.
+        """
+        now = time.monotonic()
+        checked_at = self._checked_at.get(engine)
+        if checked_at is None or now - checked_at >= self.lag_check_interval:
+            self._checked_at[engine] = now
+            try:
+                self._lag[engine] = await asyncio.wait_for(
+                    self._probe(engine), self.lag_check_timeout
+                )
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "Replica %s did not answer the lag check within %s s",
+                    engine.url,
+                    self.lag_check_timeout,
+                )
+                self._lag[engine] = None
+            except Exception as error:
+                logger.warning("Replica %s is unavailable: %s", engine.url, error)
+                self._lag[engine] = None
+        return self._lag.get(engine)
+
+    async def _probe(self, engine: AsyncEngine) -> float:
+        async with engine.connect() as connection:
+            return await self.lag_probe(connection)
+
+    async def healthy_replicas(self) -> list[AsyncEngine]:
+        # Probed concurrently, so a check costs at most one timeout.
+        lags = await asyncio.gather(*(self.lag(replica) for replica in self.replicas))
+        return [
+            replica
+            for replica, lag in zip(self.replicas, lags)
+            if lag is not None and lag <= self.max_lag
+        ]
+
+    async def select(self, key: Optional[Hashable] = None) -> AsyncEngine:
+        if not self.replicas or self.is_sticky(key):
+            return self.primary
+        replicas = await self.healthy_replicas()
+        if not replicas:
+            return self.primary
+        if self.strategy == "least_connections":
+            return min(replicas, key=lambda replica: self._in_flight.get(replica, 0))
+        return replicas[next(self._counter) % len(replicas)]
+
+    @asynccontextmanager
+    async def session(self, engine: AsyncEngine) -> AsyncIterator[AsyncSession]:
+        session_maker = self._session_makers.get(engine)
+        if session_maker is None:
+            session_maker = self._session_makers[engine] = sessionmaker(
+                engine, class_=AsyncSession, expire_on_commit=False
+            )
+        self._in_flight[engine] = self._in_flight.get(engine, 0) + 1
+        try:
+            async with session_maker() as session:
+                yield session
+        finally:
+            self._in_flight[engine] -= 1
+
+    def metrics(self) -> dict:
+        return {
+            "replicas": len(self.replicas),
+            "strategy": self.strategy,
+            "lag": {
+                str(engine.url): self._lag.get(engine) for engine in self.replicas
+            },
+            "in_flight": {
+                str(engine.url): count for engine, count in self._in_flight.items()
+            },
+            "sticky_keys": len(self._sticky),
+        }
+
+
+def sticky_key(headers: Headers) -> Optional[str]:
+    """User id from the bearer token, used to pin a user's reads after a write."""
+    scheme, token = get_authorization_scheme_param(headers.get("Authorization"))
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return jwt_strategy.decode_user_id(token)
+
+
+class ReadYourWritesMiddleware:
+    """
+    Marks the caller as having written once an unsafe request (POST, PATCH,
+    DELETE...) succeeds, before the response leaves, so a follow-up read
+    cannot race onto a lagging replica.
+    """
+
+    safe_methods = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, app: ASGIApp, router: ReplicaRouter) -> None:
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in self.safe_methods:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                self.router.mark_write(sticky_key(Headers(scope=scope)))
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,3 @@
+__all__ = ("apply_search",)
+
+from src.search.fts import apply_search
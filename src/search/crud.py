@@ -0,0 +1,35 @@
+from fastapi_pagination.ext.sqlalchemy import paginate
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from src.accounts.models import User
+from src.search.fts import INDEXES, apply_search, dialect_name, teams_fts, users_fts
+from src.teams.models import Team
+
+
+def query_terms(index: str, q: str) -> list[tuple[tuple[str, ...], str]]:
+    _, columns = INDEXES[index]
+    return [(columns, word) for word in q.split()]
+
+
+async def search_teams(session: AsyncSession, q: str):
+    query = apply_search(
+        select(Team).options(selectinload(Team.members)),
+        Team,
+        teams_fts,
+        query_terms("teams_fts", q),
+        dialect_name(session),
+    )
+    return await paginate(session, query)
+
+
+async def search_users(session: AsyncSession, q: str):
+    query = apply_search(
+        select(User),
+        User,
+        users_fts,
+        query_terms("users_fts", q),
+        dialect_name(session),
+    )
+    return await paginate(session, query)
@@ -0,0 +1,138 @@
+from sqlalchemy import DDL, Select, column, event, or_, select, table
+from sqlalchemy.orm import DeclarativeBase
+
+from src.models import Base
+
+# Trigram FTS5 needs at least three characters to match anything.
+MIN_TERM_LENGTH = 3
+
+teams_fts = table(
+    "teams_fts",
+    column("rowid"),
+    column("rank"),
+    column("teams_fts"),
+)
+users_fts = table(
+    "users_fts",
+    column("rowid"),
+    column("rank"),
+    column("users_fts"),
+)
+
+INDEXES = {
+    "teams_fts": ("teams", ("title", "project_name", "description")),
+    "users_fts": ("users", ("first_name", "last_name", "email")),
+}
+
+
+def create_statements(name: str) -> list[str]:
+    """DDL for an external-content FTS5 table and the triggers keeping it in sync."""
+    source, columns = INDEXES[name]
+    names = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {name} USING fts5("
+        f"{names}, content='{source}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_ai AFTER INSERT ON {source} BEGIN "
+        f"INSERT INTO {name}(rowid, {names}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_ad AFTER DELETE ON {source} BEGIN "
+        f"INSERT INTO {name}({name}, rowid, {names}) "
+        f"VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_au AFTER UPDATE OF {names} ON {source} "
+        f"BEGIN INSERT INTO {name}({name}, rowid, {names}) "
+        f"VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {name}(rowid, {names}) VALUES (new.id, {new}); END",
+    ]
+
+
+def drop_statements(name: str) -> list[str]:
+    return [
+        f"DROP TRIGGER IF EXISTS {name}_{suffix}" for suffix in ("ai", "ad", "au")
+    ] + [f"DROP TABLE IF EXISTS {name}"]
+
+
+for _name in INDEXES:
+    for _statement in create_statements(_name):
+        event.listen(
+            Base.metadata,
+            "after_create",
+            DDL(_statement).execute_if(dialect="sqlite"),
+        )
+    for _statement in drop_statements(_name):
+        event.listen(
+            Base.metadata,
+            "before_drop",
+            DDL(_statement).execute_if(dialect="sqlite"),
+        )
+
+
+def quote(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def team_terms(title: str = None, project_name: str = None):
+    terms = []
+    if title:
+        terms.append((("title",), title))
+    if project_name:
+        terms.append((("project_name",), project_name))
+    return terms
+
+
+def user_terms(full_name: str = None, email: str = None):
+    terms = []
+    if full_name:
+        parts = full_name.split()
+        if len(parts) == 2:
+            terms.append((("first_name",), parts[0]))
+            terms.append((("last_name",), parts[1]))
+        elif len(parts) == 1:
+            terms.append((("first_name", "last_name"), parts[0]))
+    if email:
+        terms.append((("email",), email))
+    return terms
+
+
+def apply_search(
+    query: Select,
+    model: type[DeclarativeBase],
+    fts_table,
+    terms: list[tuple[tuple[str, ...], str]],
+    dialect: str,
+) -> Select:
+    """
+    Filter ``query`` so that every ``(columns, term)`` pair matches one of
+    ``columns`` as a substring, and order the result by relevance.
+
+    Terms go through the FTS index when possible; short terms and
+    non-SQLite backends fall back to a case-insensitive ``LIKE``.
+    """
+    expressions = []
+    fallback = False
+    for columns, term in terms:
+        if dialect == "sqlite" and len(term) >= MIN_TERM_LENGTH:
+            expressions.append(f"{{{' '.join(columns)}}} : {quote(term)}")
+        else:
+            query = query.filter(
+                or_(*(getattr(model, name).icontains(term) for name in columns))
+            )
+            fallback = True
+
+    if expressions:
+        name = fts_table.name
+        matches = (
+            select(fts_table.c.rowid.label("id"), fts_table.c.rank.label("rank"))
+            .where(fts_table.c[name].op("MATCH")(" AND ".join(expressions)))
+            .subquery()
+        )
+        query = query.join(matches, matches.c.id == model.id).order_by(
+            matches.c.rank, model.id
+        )
+    elif fallback:
+        query = query.order_by(model.id)
+    return query
+
+
+def dialect_name(session) -> str:
+    return session.bind.dialect.name
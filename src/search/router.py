@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi_pagination import Page
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.accounts.manager import fastapi_users
+from src.accounts.schemas import UserRead
+from src.database import get_async_session
+from src.search import crud
+from src.teams.schemas import Team
+
+router = APIRouter()
+
+current_active_verified_user = fastapi_users.current_user()
+
+
+@router.get(
+    "/teams",
+    response_model=Page[Team],
+    dependencies=[
+        Depends(current_active_verified_user),
+    ],
+)
+async def search_teams(
+    q: str = Query(..., min_length=1, description="search teams, best match first"),
+    session: AsyncSession = Depends(get_async_session),
+):
+    return await crud.search_teams(session=session, q=q)
+
+
+@router.get(
+    "/users",
+    response_model=Page[UserRead],
+    dependencies=[
+        Depends(current_active_verified_user),
+    ],
+)
+async def search_users(
+    q: str = Query(..., min_length=1, description="search users, best match first"),
+    session: AsyncSession = Depends(get_async_session),
+):
+    return await crud.search_users(session=session, q=q)
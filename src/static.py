@@ -0,0 +1,215 @@
+import os
+import re
+from mimetypes import guess_type
+from typing import Optional
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, PathLike, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+from src.config import STATIC_MAX_AGE
+
+# Names whose content never changes: content-hashed photos and their
+# variants, and the uuid-named uploads stored before them.
+IMMUTABLE_NAME = re.compile(
+    r"(?P<key>[0-9a-f]{64}(_\d+)?|[0-9a-f]{8}(-[0-9a-f]{4}){3}-[0-9a-f]{12})\.\w+"
+)
+
+# Precompressed siblings, in order of preference.
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def accepted_encodings(header: str) -> set[str]:
+    """Codings named in Accept-Encoding, minus those refused with ``q=0``."""
+    accepted = set()
+    for item in header.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        refused = False
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    refused = float(value) == 0
+                except ValueError:
+                    pass
+        if coding and not refused:
+            accepted.add(coding.lower())
+    return accepted
+
+
+def parse_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """
+    The inclusive offsets of a single ``bytes`` range, or None when the
+    header is to be ignored (another unit, several ranges, bad syntax).
+    Raises ValueError when the range lies outside the file.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, separator, last = (part.strip() for part in spec.partition("-"))
+    if (
+        not separator
+        or not (first or last)
+        or (first and not first.isdigit())
+        or (last and not last.isdigit())
+    ):
+        return None
+    if not first:
+        if int(last) == 0 or size == 0:
+            raise ValueError("Empty suffix range")
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    if start >= size:
+        raise ValueError("Range starts past the end of the file")
+    end = int(last) if last else size - 1
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+class FileRangeResponse(FileResponse):
+    """One byte range of a file, sent as ``206 Partial Content``."""
+
+    def __init__(
+        self,
+        path: PathLike,
+        start: int,
+        end: int,
+        stat_result: os.stat_result,
+        headers: Optional[dict] = None,
+        media_type: Optional[str] = None,
+    ) -> None:
+        super().__init__(
+            path,
+            status_code=206,
+            headers=headers,
+            media_type=media_type,
+            stat_result=stat_result,
+        )
+        self.start = start
+        self.end = end
+        self.headers["content-length"] = str(end - start + 1)
+        self.headers["content-range"] = f"bytes {start}-{end}/{stat_result.st_size}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        if scope["method"].upper() != "HEAD":
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(self.start)
+                remaining = self.end - self.start + 1
+                while remaining > 0:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send(
+                        {"type": "http.response.body", "body": chunk, "more_body": True}
+                    )
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    ``StaticFiles`` tuned for assets that are never rewritten in place.
+
+    Content-addressed names are served with a year-long ``immutable``
+    Cache-Control and an ETag derived from the name, so it does not change
+    when the file is touched or copied to another server; anything else must
+    be revalidated. A ``.br`` or ``.gz`` sibling is sent instead of the file
+    when the client accepts that coding, and a single ``Range`` is answered
+    with 206 from the uncompressed file. ``If-None-Match`` is honoured as
+    before.
+    """
+
+    def __init__(self, *args, max_age: int = STATIC_MAX_AGE, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.max_age = max_age
+
+    def file_response(
+        self,
+        full_path: PathLike,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = os.fspath(full_path)
+        immutable = IMMUTABLE_NAME.fullmatch(os.path.basename(full_path))
+        headers = {
+            "accept-ranges": "bytes",
+            "cache-control": (
+                f"public, max-age={self.max_age}, immutable"
+                if immutable
+                else "no-cache"
+            ),
+        }
+
+        siblings = {}
+        for encoding, suffix in ENCODINGS:
+            try:
+                siblings[encoding] = os.stat(full_path + suffix)
+            except (FileNotFoundError, NotADirectoryError):
+                pass
+        if siblings:
+            headers["vary"] = "Accept-Encoding"
+
+        # Ranges are always served from the uncompressed file.
+        path, encoding = full_path, None
+        if siblings and "range" not in request_headers:
+            accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+            for candidate, suffix in ENCODINGS:
+                if candidate in siblings and candidate in accepted:
+                    path, encoding = full_path + suffix, candidate
+                    stat_result = siblings[candidate]
+                    headers["content-encoding"] = encoding
+                    break
+        if immutable:
+            key = immutable.group("key")
+            headers["etag"] = f'"{key}-{encoding}"' if encoding else f'"{key}"'
+
+        response = FileResponse(
+            path,
+            status_code=status_code,
+            headers=headers,
+            media_type=guess_type(full_path)[0] or "text/plain",
+            stat_result=stat_result,
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+
+        range_header = request_headers.get("range")
+        if range_header is None or status_code != 200:
+            return response
+        if_range = request_headers.get("if-range")
+        if if_range is not None and if_range not in (
+            response.headers["etag"],
+            response.headers["last-modified"],
+        ):
+            return response
+        try:
+            byte_range = parse_range(range_header, stat_result.st_size)
+        except ValueError:
+            return Response(
+                status_code=416,
+                headers={
+                    **headers,
+                    "content-range": f"bytes */{stat_result.st_size}",
+                },
+            )
+        if byte_range is None:
+            return response
+        return FileRangeResponse(
+            path,
+            *byte_range,
+            stat_result=stat_result,
+            headers=headers,
+            media_type=response.media_type,
+        )
@@ -1,41 +1,95 @@
+from collections import Counter
+from typing import Optional
+
 from fastapi import HTTPException, status
 from fastapi_pagination.ext.sqlalchemy import paginate
-from sqlalchemy import select, Result
-from sqlalchemy.exc import NoResultFound
+from sqlalchemy import (
+    Result,
+    case,
+    delete,
+    exists,
+    func,
+    insert,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.exc import IntegrityError, NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
-from src.accounts.crud import get_user_teams
 from src.accounts.models import User
+from src.database import insert_ignoring_duplicates
+from src.pagination import CursorParams, paginate_keyset
+from src.search.fts import apply_search, dialect_name, team_terms, teams_fts
 from src.teams.models import Team, UserTeam, StatusChoices
-from src.teams.schemas import TeamCreate, TeamUpdatePartial
+from src.teams.schemas import (
+    BulkMembershipResult,
+    Membership,
+    MembershipResult,
+    TeamCreate,
+    TeamOrder,
+    TeamUpdatePartial,
+)
 
+TEAM_KEYSETS = {
+    TeamOrder.ID: (Team.id,),
+    TeamOrder.TITLE: (Team.title, Team.id),
+}
 
-async def get_teams(
+
+def teams_query(
     session: AsyncSession,
     title: str,
     project_name: str,
     status: StatusChoices,
 ):
-    query = select(Team).options(joinedload(Team.members))
-    if title:
-        query = query.filter(Team.title.contains(title))
-    if project_name:
-        query = query.filter(Team.project_name.contains(project_name))
+    query = select(Team).options(selectinload(Team.members))
+    query = apply_search(
+        query,
+        Team,
+        teams_fts,
+        team_terms(title=title, project_name=project_name),
+        dialect_name(session),
+    )
     if status:
-        query = query.filter(Team.status.contains(status))
+        query = query.filter(Team.status == status)
+    return query
 
+
+async def get_teams(
+    session: AsyncSession,
+    title: str,
+    project_name: str,
+    status: StatusChoices,
+):
+    query = teams_query(session, title, project_name, status)
     return await paginate(session, query)
 
 
-async def get_team(session: AsyncSession, team_id: int, join: bool = None):
+async def get_teams_cursor(
+    session: AsyncSession,
+    title: str,
+    project_name: str,
+    status: StatusChoices,
+    order: TeamOrder,
+    params: CursorParams,
+):
+    query = teams_query(session, title, project_name, status)
+    return await paginate_keyset(session, query, TEAM_KEYSETS[order], params)
+
+
+async def get_team(session: AsyncSession, team_id: int):
     try:
-        stmt = select(Team).where(Team.id == team_id).options(joinedload(Team.members))
+        stmt = (
+            select(Team)
+            .where(Team.id == team_id)
+            .options(selectinload(Team.members))
+            .execution_options(populate_existing=True)
+        )
         result: Result = await session.execute(stmt)
-        team = result.unique().scalar_one()
-        if join:
-            await session.refresh(team)
-        return team
+        return result.scalar_one()
     except NoResultFound:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -43,22 +97,62 @@ async def get_team(session: AsyncSession, team_id: int, join: bool = None):
         )
 
 
+async def get_team_version(
+    session: AsyncSession, team_id: int
+) -> Optional[tuple[int, int]]:
+    """
+    The team's version and the sum of its members' versions, which together
+    change whenever the serialized team (members included) does. ``None``
+    if the team does not exist.
+    """
+    row = (
+        await session.execute(
+            select(Team.version, func.coalesce(func.sum(User.version), 0))
+            .outerjoin(UserTeam, UserTeam.team_id == Team.id)
+            .outerjoin(User, User.id == UserTeam.user_id)
+            .where(Team.id == team_id)
+            .group_by(Team.id, Team.version)
+        )
+    ).first()
+    return tuple(row) if row is not None else None
+
+
+UNFINISHED_STATUSES = [
+    choice for choice in StatusChoices if choice != StatusChoices.READY
+]
+
+
+async def owns_unfinished_team(session: AsyncSession, owner_id: int) -> bool:
+    """
+    Single EXISTS probe on the ``(owner_id, status)`` index. ``IN`` rather
+    than ``!= READY`` keeps it to index seeks however many finished teams
+    the owner has.
+    """
+    return await session.scalar(
+        select(
+            exists().where(
+                Team.owner_id == owner_id,
+                Team.status.in_(UNFINISHED_STATUSES),
+            )
+        )
+    )
+
+
 async def create_team(
     team_in: TeamCreate,
     user_id: int,
     session: AsyncSession,
 ):
-    teams = await get_user_teams(user_id=user_id, session=session, is_paginate=False)
-    for team in teams:
-        if team.owner_id == user_id and team.status != "Ready":
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="CANNOT_CREATE_TEAM",
-            )
+    if await owns_unfinished_team(session, user_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="CANNOT_CREATE_TEAM",
+        )
     team = Team(
         title=team_in.title,
         project_name=team_in.project_name,
         description=team_in.description,
+        member_count=1,
     )
     team.owner_id = user_id
     session.add(team)
@@ -103,24 +197,102 @@ async def delete_team(
 
 
 async def join_team(
-    team: Team,
+    team_id: int,
     user: User,
     session: AsyncSession,
 ):
-    if len(team.members) == team.MAX_TEAM_MEMBERS:
+    """
+    Take a seat with one conditional UPDATE, so capacity is enforced by the
+    database even when joins race, then insert the membership in the same
+    transaction. A duplicate membership rolls the seat back.
+    """
+    team = await session.scalar(
+        update(Team)
+        .where(Team.id == team_id, Team.member_count < Team.MAX_TEAM_MEMBERS)
+        .values(member_count=Team.member_count + 1)
+        .returning(Team)
+        .execution_options(populate_existing=True)
+    )
+    if team is None:
+        if await session.scalar(select(exists().where(Team.id == team_id))):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="MAX_MEMBERS",
+            )
+        # The same response team_by_id gives for a missing team.
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="MAX_MEMBERS",
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Team {team_id} not found!",
+        )
+    try:
+        await session.execute(
+            insert(UserTeam).values(user_id=user.id, team_id=team_id)
         )
-    if user in team.members:
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="ALREADY_IN_TEAM",
         )
-    user_team = UserTeam(user_id=user.id, team_id=team.id)
-    session.add(user_team)
+    members = await session.scalars(
+        select(User).join(UserTeam).where(UserTeam.team_id == team_id)
+    )
+    set_committed_value(team, "members", list(members))
+    return team
+
+
+async def release_seat(
+    session: AsyncSession, team_id: int, user_id: int
+) -> Optional[Team]:
+    """
+    Delete one membership and give its seat back, in the caller's transaction.
+    Returns the team with its updated columns, or None if there was no seat.
+    """
+    result = await session.execute(
+        delete(UserTeam).where(
+            UserTeam.team_id == team_id,
+            UserTeam.user_id == user_id,
+        )
+    )
+    if not result.rowcount:
+        return None
+    return await session.scalar(
+        update(Team)
+        .where(Team.id == team_id)
+        .values(member_count=Team.member_count - result.rowcount)
+        .returning(Team)
+        .execution_options(populate_existing=True)
+    )
+
+
+async def _remove_from_team(session: AsyncSession, team: Team, user: User) -> Team:
+    """
+    Release ``user``'s seat and return ``team`` without them, reusing the
+    members already loaded instead of reading the team again.
+    """
+    remaining = [member for member in team.members if member.id != user.id]
+    released = await release_seat(session, team.id, user.id)
+    if released is None:
+        # Removed by a concurrent request since the team was loaded.
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="NOT_TEAM_MEMBER",
+        )
     await session.commit()
-    return await get_team(session=session, team_id=team.id, join=True)
+    set_committed_value(released, "members", remaining)
+    return released
+
+
+async def release_all_seats(session: AsyncSession, user_id: int) -> None:
+    """Give back the seats of every team ``user_id`` is in, before it is deleted."""
+    await session.execute(
+        update(Team)
+        .where(
+            Team.id.in_(select(UserTeam.team_id).where(UserTeam.user_id == user_id))
+        )
+        .values(member_count=Team.member_count - 1)
+    )
 
 
 async def leave_team(
@@ -135,9 +307,7 @@ async def leave_team(
                 detail="OWNER_CANNOT_LEAVE",
             )
         if user in team.members:
-            team.members.remove(user)
-            await session.commit()
-            return await get_team(session=session, team_id=team.id)
+            return await _remove_from_team(session, team, user)
         else:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -151,23 +321,235 @@ async def remove_member(
     owner: User,
     session: AsyncSession,
 ):
-    try:
-        if None not in (member, team, owner):
-            if team.owner_id == member.id:
+    if None not in (member, team, owner):
+        if team.owner_id == member.id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="OWNER_CANNOT_LEAVE",
+            )
+        if team.owner_id == owner.id:
+            if member not in team.members:
                 raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="OWNER_CANNOT_LEAVE",
+                    status_code=status.HTTP_400_BAD_REQUEST, detail="BAD_REQUEST"
+                )
+            return await _remove_from_team(session, team, member)
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="NOT_OWNER",
+            )
+
+
+async def _load_memberships(session: AsyncSession, items: list[Membership]):
+    """Teams, existing users and current memberships touched by ``items``."""
+    team_ids = {item.team_id for item in items}
+    user_ids = {item.user_id for item in items}
+    teams = {
+        team.id: team
+        for team in await session.execute(
+            select(Team.id, Team.owner_id, Team.member_count).where(
+                Team.id.in_(team_ids)
+            )
+        )
+    }
+    users = set(await session.scalars(select(User.id).where(User.id.in_(user_ids))))
+    memberships = {
+        tuple(row)
+        for row in await session.execute(
+            select(UserTeam.user_id, UserTeam.team_id).where(
+                UserTeam.team_id.in_(team_ids),
+                UserTeam.user_id.in_(user_ids),
+            )
+        )
+    }
+    return teams, users, memberships
+
+
+def _check_membership(item, actor, teams, users, seen) -> Optional[str]:
+    key = (item.user_id, item.team_id)
+    if key in seen:
+        return "DUPLICATE_ITEM"
+    seen.add(key)
+    team = teams.get(item.team_id)
+    if team is None:
+        return "DOES_NOT_EXIST"
+    if item.user_id not in users:
+        return "USER_NOT_EXIST"
+    if not actor.is_superuser and team.owner_id != actor.id:
+        return "NOT_OWNER"
+    return None
+
+
+def _bulk_result(items: list[Membership], details: list) -> BulkMembershipResult:
+    results = [
+        MembershipResult(
+            user_id=item.user_id,
+            team_id=item.team_id,
+            ok=detail is None,
+            detail=detail,
+        )
+        for item, detail in zip(items, details)
+    ]
+    succeeded = sum(result.ok for result in results)
+    return BulkMembershipResult(
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=results,
+    )
+
+
+async def _claim_seats(session: AsyncSession, wanted: Counter) -> Counter:
+    """
+    Take up to ``wanted[team_id]`` seats of each team and return how many
+    each team gave. One conditional UPDATE (as in ``join_team``) claims
+    every team with room for all it asks for, so concurrent joins cannot
+    overfill a team; a team that lost seats to a concurrent join since it
+    was read is read again and claimed for whatever room it has left.
+    """
+    granted = Counter()
+    while wanted:
+        added = case(wanted, value=Team.id)
+        claimed = set(
+            await session.scalars(
+                update(Team)
+                .where(
+                    Team.id.in_(wanted),
+                    Team.member_count + added <= Team.MAX_TEAM_MEMBERS,
                 )
-            if team.owner_id == owner.id:
-                team.members.remove(member)
-                await session.commit()
-                return await get_team(session=session, team_id=team.id)
+                .values(member_count=Team.member_count + added)
+                .returning(Team.id)
+                .execution_options(synchronize_session=False)
+            )
+        )
+        granted.update({team_id: wanted[team_id] for team_id in claimed})
+        retry = [team_id for team_id in wanted if team_id not in claimed]
+        if not retry:
+            break
+        rooms = await session.execute(
+            select(Team.id, Team.MAX_TEAM_MEMBERS - Team.member_count).where(
+                Team.id.in_(retry)
+            )
+        )
+        wanted = Counter(
+            {team_id: min(wanted[team_id], room) for team_id, room in rooms if room > 0}
+        )
+    return granted
+
+
+async def bulk_add_members(
+    session: AsyncSession,
+    items: list[Membership],
+    actor: User,
+) -> BulkMembershipResult:
+    """
+    Add many memberships in one transaction. Items are validated against
+    three set-based reads, seats are claimed per team with
+    ``_claim_seats`` and the memberships go in as one multi-row INSERT
+    that skips pairs a concurrent join added meanwhile; their seats are
+    given back before the commit.
+    """
+    teams, users, memberships = await _load_memberships(session, items)
+    seen = set()
+    seats = Counter()
+    details = []
+    for item in items:
+        detail = _check_membership(item, actor, teams, users, seen)
+        if detail is None:
+            team = teams[item.team_id]
+            if (item.user_id, item.team_id) in memberships:
+                detail = "ALREADY_IN_TEAM"
+            elif team.member_count + seats[team.id] >= Team.MAX_TEAM_MEMBERS:
+                detail = "MAX_MEMBERS"
             else:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="NOT_OWNER",
+                seats[team.id] += 1
+        details.append(detail)
+    if not seats:
+        return _bulk_result(items, details)
+
+    granted = await _claim_seats(session, seats)
+    # Seats are handed out in request order when a team has fewer left.
+    for index, (item, detail) in enumerate(zip(items, details)):
+        if detail is None:
+            if granted[item.team_id]:
+                granted[item.team_id] -= 1
+            else:
+                details[index] = "MAX_MEMBERS"
+    pairs = [
+        (item.user_id, item.team_id)
+        for item, detail in zip(items, details)
+        if detail is None
+    ]
+    if pairs:
+        inserted = {
+            tuple(row)
+            for row in await session.execute(
+                insert_ignoring_duplicates(UserTeam, dialect_name(session))
+                .values([{"user_id": user, "team_id": team} for user, team in pairs])
+                .returning(UserTeam.user_id, UserTeam.team_id)
+            )
+        }
+        # Pairs a concurrent join added since the memberships were read.
+        unused = Counter(team for user, team in pairs if (user, team) not in inserted)
+        if unused:
+            details = [
+                "ALREADY_IN_TEAM"
+                if detail is None and (item.user_id, item.team_id) not in inserted
+                else detail
+                for item, detail in zip(items, details)
+            ]
+            await session.execute(
+                update(Team)
+                .where(Team.id.in_(unused))
+                .values(
+                    member_count=Team.member_count - case(unused, value=Team.id)
                 )
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="BAD_REQUEST"
+                .execution_options(synchronize_session=False)
+            )
+    await session.commit()
+    return _bulk_result(items, details)
+
+
+async def bulk_remove_members(
+    session: AsyncSession,
+    items: list[Membership],
+    actor: User,
+) -> BulkMembershipResult:
+    """
+    Remove many memberships with one multi-row DELETE and recount the
+    affected teams, all in one transaction.
+    """
+    teams, users, memberships = await _load_memberships(session, items)
+    seen = set()
+    details = []
+    for item in items:
+        detail = _check_membership(item, actor, teams, users, seen)
+        if detail is None:
+            if (item.user_id, item.team_id) not in memberships:
+                detail = "NOT_TEAM_MEMBER"
+            elif teams[item.team_id].owner_id == item.user_id:
+                detail = "OWNER_CANNOT_LEAVE"
+        details.append(detail)
+
+    pairs = [
+        (item.user_id, item.team_id)
+        for item, detail in zip(items, details)
+        if detail is None
+    ]
+    if pairs:
+        await session.execute(
+            delete(UserTeam).where(
+                tuple_(UserTeam.user_id, UserTeam.team_id).in_(pairs)
+            )
         )
+        await session.execute(
+            update(Team)
+            .where(Team.id.in_({team_id for _, team_id in pairs}))
+            .values(
+                member_count=select(func.count())
+                .where(UserTeam.team_id == Team.id)
+                .scalar_subquery()
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+    return _bulk_result(items, details)
@@ -19,3 +19,4 @@ async def team_by_id(
         status_code=status.HTTP_404_NOT_FOUND,
         detail=f"Team {team_id} not found!",
     )
+
@@ -1,9 +1,9 @@
 from enum import Enum
 
-from sqlalchemy import String, Text, ForeignKey
+from sqlalchemy import String, Text, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from src.models import Base
+from src.models import Base, VersionedMixin
 
 
 class StatusChoices(str, Enum):
@@ -16,8 +16,9 @@ class StatusChoices(str, Enum):
     READY = "Ready"
 
 
-class Team(Base):
+class Team(VersionedMixin, Base):
     __tablename__ = "teams"
+    __table_args__ = (Index("ix_teams_owner_id_status", "owner_id", "status"),)
 
     MAX_TEAM_MEMBERS = 8
 
@@ -30,9 +31,11 @@ class Team(Base):
     owner_id: Mapped[int]
     project_name: Mapped[str] = mapped_column(String(length=256))
     description: Mapped[str] = mapped_column(Text())
+    # Kept equal to the number of users_teams rows by every membership write.
+    member_count: Mapped[int] = mapped_column(default=0, server_default="0")
     status: Mapped[StatusChoices] = mapped_column(
         default=StatusChoices.INITIATION,
-        server_default=StatusChoices.INITIATION,
+        server_default=StatusChoices.INITIATION.name,
     )
     members: Mapped[list["User"]] = relationship(
         back_populates="teams",
@@ -42,6 +45,8 @@ class Team(Base):
 
 class UserTeam(Base):
     __tablename__ = "users_teams"
+    # The primary key leads with user_id; loading a team's members seeks here.
+    __table_args__ = (Index("ix_users_teams_team_id", "team_id"),)
 
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"),
@@ -1,15 +1,24 @@
-from fastapi import APIRouter, Depends, status, Query
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from fastapi_pagination import Page
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.accounts.dependencies import get_user_by_id
 from src.accounts.manager import fastapi_users
 from src.accounts.schemas import User
-from src.database import get_async_session
+from src.database import get_async_session, get_read_session
+from src.etags import if_none_match, make_etag, not_modified, team_etag
+from src.pagination import CursorPage, CursorParams, get_cursor_params
 from src.teams import crud
 from src.teams.dependencies import team_by_id
 from src.teams.models import StatusChoices
-from src.teams.schemas import Team, TeamCreate, TeamUpdatePartial
+from src.teams.schemas import (
+    BulkMembership,
+    BulkMembershipResult,
+    Team,
+    TeamCreate,
+    TeamOrder,
+    TeamUpdatePartial,
+)
 
 router = APIRouter()
 
@@ -27,13 +36,38 @@ async def get_teams(
     title: str = Query(None, description="filter teams by title"),
     project_name: str = Query(None, description="filter teams by project name."),
     status: StatusChoices = Query(None, description="filter teams by status"),
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     return await crud.get_teams(
         title=title, project_name=project_name, status=status, session=session
     )
 
 
+@router.get(
+    "/cursor",
+    response_model=CursorPage[Team],
+    dependencies=[
+        Depends(current_active_verified_user),
+    ],
+)
+async def get_teams_cursor(
+    title: str = Query(None, description="filter teams by title"),
+    project_name: str = Query(None, description="filter teams by project name."),
+    status: StatusChoices = Query(None, description="filter teams by status"),
+    order: TeamOrder = Query(TeamOrder.ID, description="sort teams by id or title"),
+    params: CursorParams = Depends(get_cursor_params),
+    session: AsyncSession = Depends(get_read_session),
+):
+    return await crud.get_teams_cursor(
+        title=title,
+        project_name=project_name,
+        status=status,
+        order=order,
+        params=params,
+        session=session,
+    )
+
+
 @router.get(
     "/{team_id}",
     response_model=Team,
@@ -41,7 +75,22 @@ async def get_teams(
         Depends(current_active_verified_user),
     ],
 )
-async def get_team(team: Team = Depends(team_by_id)):
+async def get_team(
+    team_id: int,
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_read_session),
+):
+    # A conditional request checks versions first, so an unchanged team is
+    # answered without loading its members.
+    if "if-none-match" in request.headers:
+        version = await crud.get_team_version(session=session, team_id=team_id)
+        if version is not None:
+            etag = make_etag("team", team_id, *version)
+            if if_none_match(request, etag):
+                return not_modified(etag)
+    team = await team_by_id(team_id=team_id, session=session)
+    response.headers["ETag"] = team_etag(team)
     return team
 
 
@@ -104,12 +153,12 @@ async def delete_team(
     response_model=Team,
 )
 async def join_team(
+    team_id: int,
     user: User = Depends(current_active_verified_user),
-    team: Team = Depends(team_by_id),
     session: AsyncSession = Depends(get_async_session),
 ):
     return await crud.join_team(
-        team=team,
+        team_id=team_id,
         user=user,
         session=session,
     )
@@ -143,11 +192,48 @@ async def remove_member_by_owner(
     owner: User = Depends(current_active_verified_user),
     session: AsyncSession = Depends(get_async_session),
 ):
-    user = await get_user_by_id(user_id=user_id, session=session)
     team = await team_by_id(team_id=team_id, session=session)
+    # A member is already loaded with the team; only look up outsiders.
+    user = next((member for member in team.members if member.id == user_id), None)
+    if user is None:
+        user = await get_user_by_id(user_id=user_id, session=session)
     return await crud.remove_member(
         member=user,
         team=team,
         owner=owner,
         session=session,
     )
+
+
+@router.post(
+    "/bulk/add_members",
+    status_code=status.HTTP_200_OK,
+    response_model=BulkMembershipResult,
+)
+async def bulk_add_members(
+    bulk: BulkMembership,
+    actor: User = Depends(current_active_verified_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    return await crud.bulk_add_members(
+        session=session,
+        items=bulk.items,
+        actor=actor,
+    )
+
+
+@router.post(
+    "/bulk/remove_members",
+    status_code=status.HTTP_200_OK,
+    response_model=BulkMembershipResult,
+)
+async def bulk_remove_members(
+    bulk: BulkMembership,
+    actor: User = Depends(current_active_verified_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    return await crud.bulk_remove_members(
+        session=session,
+        items=bulk.items,
+        actor=actor,
+    )
@@ -1,6 +1,9 @@
-from pydantic import BaseModel, ConfigDict
+from enum import Enum
+
+from pydantic import BaseModel, ConfigDict, Field
 
 from src.accounts.schemas import UserRead
+from src.config import BULK_MEMBERSHIP_MAX_ITEMS
 from src.teams.models import StatusChoices
 
 
@@ -10,6 +13,7 @@ class TeamBase(BaseModel):
     description: str
     owner_id: int
     status: StatusChoices
+    member_count: int
     members: list[UserRead]
 
 
@@ -33,3 +37,28 @@ class TeamUpdatePartial(TeamCreate):
 class Team(TeamBase):
     id: int
     model_config = ConfigDict(from_attributes=True)
+
+
+class TeamOrder(str, Enum):
+    ID = "id"
+    TITLE = "title"
+
+
+class Membership(BaseModel):
+    user_id: int
+    team_id: int
+
+
+class BulkMembership(BaseModel):
+    items: list[Membership] = Field(min_length=1, max_length=BULK_MEMBERSHIP_MAX_ITEMS)
+
+
+class MembershipResult(Membership):
+    ok: bool
+    detail: str | None = None
+
+
+class BulkMembershipResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: list[MembershipResult]
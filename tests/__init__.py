@@ -1 +1,16 @@
-from . import conftest, test_auth, test_user
+from . import (
+    conftest,
+    test_auth,
+    test_user,
+    test_password,
+    test_emails,
+    test_search,
+    test_pagination,
+    test_teams,
+    test_replicas,
+    test_photos,
+    test_static,
+    test_query_stats,
+    test_metrics,
+    test_importer,
+)
@@ -1,20 +1,28 @@
 import asyncio
+import os
+from contextlib import contextmanager
 from typing import AsyncGenerator
 
 import pytest
 from fastapi.testclient import TestClient
+from fastapi_users.authentication import JWTStrategy
+from fastapi_users.password import PasswordHelper
 from httpx import AsyncClient
+from sqlalchemy import insert
 from sqlalchemy.pool import NullPool
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
 
-from src.database import get_async_session
+from src.accounts.models import User
+from src.database import get_async_session, build_engine
 from src.main import app
 from src.models import Base
+from src.query_stats import collect_queries
 
-DATABASE_URL_TEST = "sqlite+aiosqlite:///./test.sqlite3"
+# Point at e.g. a temporary Postgres cluster from benchmarks/postgres.py.
+DATABASE_URL_TEST = os.getenv("TEST_DATABASE_URL", "sqlite+aiosqlite:///./test.sqlite3")
 
-engine_test = create_async_engine(
+engine_test = build_engine(
     DATABASE_URL_TEST,
     poolclass=NullPool,
 )
@@ -34,6 +42,65 @@ async def override_get_async_session() -> AsyncGenerator[AsyncSession, None]:
 
 app.dependency_overrides[get_async_session] = override_get_async_session
 
+PASSWORD = "qwe123"
+password_helper = PasswordHelper()
+jwt_strategy = JWTStrategy(secret="SECRET", lifetime_seconds=3600)
+
+
+async def auth_headers(user: User | int) -> dict:
+    """Bearer headers for ``user``, or for the user with that id."""
+    if isinstance(user, int):
+        async with async_session_maker() as session:
+            user = await session.get(User, user)
+    return {"Authorization": "Bearer " + await jwt_strategy.write_token(user)}
+
+
+@pytest.fixture(scope="session")
+def create_users():
+    """
+    ``await create_users({"email": ..., "first_name": ...}, ...)`` inserts
+    verified users with the password ``PASSWORD`` and returns them in order.
+    """
+    hashed_password = password_helper.hash(PASSWORD)
+
+    async def create(*rows: dict) -> list[User]:
+        values = [
+            {"hashed_password": hashed_password, "is_verified": True, **row}
+            for row in rows
+        ]
+        async with async_session_maker() as session:
+            users = (
+                await session.scalars(insert(User).values(values).returning(User))
+            ).all()
+            await session.commit()
+        return list(users)
+
+    return create
+
+
+@pytest.fixture
+def query_budget():
+    """
+    ``with query_budget(3): await ac.get(...)`` fails the test if the block
+    runs more than three statements, or one statement twice with the same
+    parameters (pass ``duplicates=True`` where that is intended).
+    """
+
+    @contextmanager
+    def budget(max_queries: int, duplicates: bool = False):
+        with collect_queries() as stats:
+            yield stats
+        listing = "\n".join(stats.statements)
+        assert stats.count <= max_queries, (
+            f"{stats.count} queries, budget {max_queries}:\n{listing}"
+        )
+        if not duplicates:
+            assert not stats.duplicates(), (
+                f"Repeated identical statements: {stats.duplicates()}"
+            )
+
+    return budget
+
 
 @pytest.fixture(autouse=True, scope="session")
 async def prepare_database():
@@ -1,8 +1,10 @@
+from fastapi_users import IntegerIDMixin
 from httpx import AsyncClient
 from sqlalchemy import select
 
 from conftest import async_session_maker
 from src.accounts.models import User
+from src.accounts.strategy import CachedJWTStrategy
 
 test_user = {
     "first_name": "test",
@@ -122,3 +124,32 @@ async def test_request_verify_token_failed(ac: AsyncClient):
     )
     assert response.status_code == 422
     assert response.json()["detail"][0]["input"] is None
+
+
+class StubUserManager(IntegerIDMixin):
+    async def get(self, id):
+        return User(id=id)
+
+
+async def test_jwt_strategy_caches_verified_token():
+    strategy = CachedJWTStrategy(secret="SECRET", lifetime_seconds=3600)
+    token = await strategy.write_token(User(id=1))
+
+    for _ in range(3):
+        user = await strategy.read_token(token, StubUserManager())
+        assert user.id == 1
+    assert strategy.misses == 1
+    assert strategy.hits == 2
+
+    assert await strategy.read_token(token + "x", StubUserManager()) is None
+
+
+async def test_jwt_strategy_drops_expired_token():
+    strategy = CachedJWTStrategy(secret="SECRET", lifetime_seconds=3600)
+    token = await strategy.write_token(User(id=1))
+    await strategy.read_token(token, StubUserManager())
+
+    strategy._tokens[token] = ("1", 0)
+    assert await strategy.read_token(token, StubUserManager()) is not None
+    assert strategy.hits == 0
+    assert strategy.misses == 2
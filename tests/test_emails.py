@@ -0,0 +1,158 @@
+from datetime import timedelta
+
+from fastapi_mail import MessageSchema, MessageType, MultipartSubtypeEnum
+
+from conftest import async_session_maker
+from smtp_stub import SMTPStub
+from src.emails.crud import enqueue_message, mark_sent
+from src.emails.dispatcher import OutboxDispatcher
+from src.emails.models import OutboxMessage, OutboxStatus, utcnow
+from src.emails.smtp import SMTPConnectionPool, build_mime
+from src.emails.templates import templates
+
+
+def build_message() -> MessageSchema:
+    return MessageSchema(
+        subject="Verify account",
+        recipients=["outbox@test.com"],
+        body="<p>hello</p>",
+        subtype=MessageType.html,
+    )
+
+
+async def test_dispatcher_sends_enqueued_message():
+    smtp = await SMTPStub().start()
+    async with async_session_maker() as session:
+        message = await enqueue_message(session, build_message())
+
+    dispatcher = OutboxDispatcher(async_session_maker, mail_conf=smtp.conf)
+    await dispatcher.dispatch_batch()
+    await dispatcher.stop()
+    await smtp.stop()
+
+    async with async_session_maker() as session:
+        message = await session.get(OutboxMessage, message.id)
+    assert message.status == OutboxStatus.SENT
+    assert message.attempts == 1
+    assert any(b"Verify account" in data for data in smtp.messages)
+
+
+async def test_dispatcher_backs_off_on_failure():
+    smtp = await SMTPStub().start()
+    await smtp.stop()
+    async with async_session_maker() as session:
+        message = await enqueue_message(session, build_message())
+
+    dispatcher = OutboxDispatcher(
+        async_session_maker,
+        mail_conf=smtp.conf,
+        max_attempts=2,
+        backoff_base=60,
+    )
+    await dispatcher.dispatch_batch()
+
+    async with async_session_maker() as session:
+        message = await session.get(OutboxMessage, message.id)
+        assert message.status == OutboxStatus.PENDING
+        assert message.attempts == 1
+        assert message.last_error
+        assert message.next_attempt_at > utcnow()
+
+        # The retry is not due yet, so the next batch must skip it.
+        await dispatcher.dispatch_batch()
+        await session.refresh(message)
+        assert message.attempts == 1
+
+        message.next_attempt_at = utcnow()
+        await session.commit()
+
+    await dispatcher.dispatch_batch()
+    await dispatcher.stop()
+    async with async_session_maker() as session:
+        message = await session.get(OutboxMessage, message.id)
+    assert message.status == OutboxStatus.FAILED
+    assert message.attempts == 2
+
+
+async def test_dispatcher_purges_old_sent_messages():
+    async with async_session_maker() as session:
+        old, recent, pending = [
+            await enqueue_message(session, build_message()) for _ in range(3)
+        ]
+        for message in (old, recent):
+            await mark_sent(session, message)
+        old.sent_at = utcnow() - timedelta(days=8)
+        await session.commit()
+
+    dispatcher = OutboxDispatcher(async_session_maker, retention_days=7)
+    assert await dispatcher.purge_sent() == 1
+
+    async with async_session_maker() as session:
+        assert await session.get(OutboxMessage, old.id) is None
+        assert await session.get(OutboxMessage, recent.id) is not None
+        assert await session.get(OutboxMessage, pending.id) is not None
+
+
+async def test_smtp_pool_reuses_connections():
+    smtp = await SMTPStub().start()
+    pool = SMTPConnectionPool(smtp.conf, size=2)
+
+    errors = await pool.send_messages([build_message() for _ in range(10)])
+    await pool.send_message(build_message())
+    await pool.close()
+    await smtp.stop()
+
+    assert errors == [None] * 10
+    assert len(smtp.messages) == 11
+    assert smtp.connections == 2
+
+
+async def test_smtp_pool_recycles_idle_connections():
+    smtp = await SMTPStub().start()
+    pool = SMTPConnectionPool(smtp.conf, size=1, idle_timeout=0)
+
+    await pool.send_message(build_message())
+    await pool.send_message(build_message())
+    await pool.close()
+    await smtp.stop()
+
+    assert len(smtp.messages) == 2
+    assert smtp.connections == 2
+
+
+def test_build_mime():
+    message = MessageSchema(
+        subject="Verify account",
+        recipients=["outbox@test.com"],
+        cc=["copy@test.com"],
+        body="<p>hello</p>",
+        alternative_body="hello",
+        subtype=MessageType.html,
+        multipart_subtype=MultipartSubtypeEnum.alternative,
+    )
+    mime = build_mime(message, "BitBuddies <noreply@example.com>")
+
+    assert mime["From"] == "BitBuddies <noreply@example.com>"
+    assert mime["To"] == "outbox@test.com"
+    assert mime["Cc"] == "copy@test.com"
+    assert mime["Subject"] == "Verify account"
+    assert mime.get_content_type() == "multipart/alternative"
+    assert [part.get_content_type() for part in mime.iter_parts()] == [
+        "text/plain",
+        "text/html",
+    ]
+    assert mime.get_body().get_content().strip() == "<p>hello</p>"
+
+
+def test_render_email_template():
+    html = templates.render(
+        "forgot_password_confirmation.html",
+        url="http://localhost:3000/forgot-password/token",
+        first_name="<Test>",
+        last_name="User",
+    )
+
+    assert 'href="http://localhost:3000/forgot-password/token"' in html
+    assert "Hi &lt;Test&gt; User," in html
+    assert "<!--[if mso | IE]>" in html
+    assert "\n    " not in html
@@ -0,0 +1,130 @@
+import json
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from conftest import async_session_maker, engine_test
+from src.accounts.models import Position, User
+from src.importer import ImportFormatError, Importer
+from src.teams.models import StatusChoices, Team, UserTeam
+
+
+@pytest.fixture(scope="session")
+async def imported(tmp_path_factory) -> Importer:
+    directory = tmp_path_factory.mktemp("import")
+    (directory / "users.csv").write_text(
+        "email,first_name,last_name,position,password,is_verified\n"
+        "ada@import.com,Ada,Lovelace,Backend,,true\n"
+        "alan@import.com,Alan,Turing,DESIGNER,,\n"
+        "grace@import.com,Grace,Hopper,,own-password,yes\n"
+    )
+    (directory / "teams.jsonl").write_text(
+        json.dumps(
+            {"title": "Imported Engine", "owner_email": "ada@import.com"}
+        )
+        + "\n\n"
+        + json.dumps(
+            {
+                "title": "Imported Compiler",
+                "status": "Ready",
+                "owner_email": "grace@import.com",
+            }
+        )
+        + "\n"
+    )
+    importer = Importer(engine_test, password="placeholder", batch_size=2)
+    users = await importer.import_users(directory / "users.csv")
+    teams = await importer.import_teams(directory / "teams.jsonl")
+
+    async with async_session_maker() as session:
+        team_id = await session.scalar(
+            select(Team.id).where(Team.title == "Imported Engine")
+        )
+    (directory / "memberships.csv").write_text(
+        "team_id,user_email\n"
+        f"{team_id},alan@import.com\n"
+        f"{team_id},grace@import.com\n"
+        f"{team_id},ada@import.com\n"
+    )
+    memberships = await importer.import_memberships(directory / "memberships.csv")
+    assert (users.rows, teams.rows, memberships.rows) == (3, 2, 3)
+    return importer
+
+
+async def test_import(imported: Importer):
+    async with async_session_maker() as session:
+        users = {
+            user.email: user
+            for user in await session.scalars(
+                select(User).where(User.email.endswith("@import.com"))
+            )
+        }
+        teams = {
+            team.title: team
+            for team in await session.scalars(
+                select(Team).where(Team.title.startswith("Imported"))
+            )
+        }
+        members = set(
+            await session.scalars(
+                select(UserTeam.user_id).where(
+                    UserTeam.team_id == teams["Imported Engine"].id
+                )
+            )
+        )
+
+    assert users["alan@import.com"].position == Position.DESIGNER
+    assert not users["alan@import.com"].is_verified
+    assert users["grace@import.com"].is_verified
+    # One bcrypt call for the placeholder, one for the explicit password.
+    assert len({user.hashed_password for user in users.values()}) == 2
+    assert teams["Imported Compiler"].status == StatusChoices.READY
+    assert teams["Imported Compiler"].member_count == 1
+    assert members == {user.id for user in users.values()}
+    assert teams["Imported Engine"].member_count == 3
+
+
+async def test_imported_users_can_log_in(imported: Importer, ac: AsyncClient):
+    for username, password in (
+        ("ada@import.com", "placeholder"),
+        ("grace@import.com", "own-password"),
+    ):
+        response = await ac.post(
+            "/auth/jwt/login", data={"username": username, "password": password}
+        )
+        assert response.status_code == 200
+
+
+@pytest.mark.parametrize(
+    "name, content, message",
+    [
+        ("users.csv", "email,is_active\nok@bad.com,1\nbad@bad.com,maybe\n", ":3: "),
+        ("users.jsonl", '{"email": "nobody"}\n', ":1: invalid email"),
+        ("teams.csv", "title,owner_email\nTeam,ghost@bad.com\n", ":2: unknown owner"),
+        ("memberships.csv", "team_id,user_id\n999999,1\n", ":2: unknown team"),
+        ("users.txt", "email\n", "expected a .csv or .jsonl file"),
+    ],
+)
+async def test_invalid_rows(imported: Importer, tmp_path, name, content, message):
+    path = tmp_path / name
+    path.write_text(content)
+    kind = name.split(".")[0]
+    with pytest.raises(ValueError, match=message):
+        await getattr(imported, f"import_{kind}")(path)
+
+
+async def test_duplicate_user_is_reported(imported: Importer, tmp_path):
+    path = tmp_path / "users.csv"
+    path.write_text("email\nnew@import.com\nada@import.com\n")
+    with pytest.raises(ImportFormatError, match=":2: batch rejected"):
+        await imported.import_users(path)
+
+
+async def test_import_rows(imported: Importer):
+    result = await imported.import_users(
+        {"email": f"row{index}@import.com", "position": "PM"} for index in range(3)
+    )
+    assert result.rows == 3
+    with pytest.raises(ImportFormatError, match="<rows>:2: invalid email"):
+        await imported.import_users([{"email": "row3@import.com"}, {"email": "x"}])
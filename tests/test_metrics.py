@@ -0,0 +1,100 @@
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+
+from src.accounts.password import AsyncPasswordHelper, password_hash_seconds
+from src.database import build_engine, pool_checkout_seconds
+from src.main import app
+from src.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsMiddleware,
+    Registry,
+    http_request_seconds,
+    router,
+)
+
+
+def test_exposition_format():
+    registry = Registry()
+    requests = Counter("requests_total", "Requests.", ("path",), registry=registry)
+    requests.inc('/a"b\\')
+    requests.inc('/a"b\\', amount=2)
+    Gauge("workers", "Workers.", callback=lambda: 4, registry=registry)
+    latency = Histogram(
+        "latency_seconds", "Latency.", ("op",), buckets=(0.1, 1), registry=registry
+    )
+    for value in (0.05, 0.1, 0.5, 3):
+        latency.observe(value, "read")
+
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests.",
+        "# TYPE requests_total counter",
+        'requests_total{path="/a\\"b\\\\"} 3',
+        "# HELP workers Workers.",
+        "# TYPE workers gauge",
+        "workers 4",
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{op="read",le="0.1"} 2',
+        'latency_seconds_bucket{op="read",le="1"} 3',
+        'latency_seconds_bucket{op="read",le="+Inf"} 4',
+        'latency_seconds_sum{op="read"} 3.65',
+        'latency_seconds_count{op="read"} 4',
+    ]
+    with pytest.raises(ValueError):
+        Counter("workers", "Again.", registry=registry)
+
+
+async def test_requests_labelled_by_route_template():
+    # /metrics is off by default; instrument the app as METRICS_ENABLED does.
+    scraper = FastAPI()
+    scraper.include_router(router)
+    transport = ASGITransport(app=MetricsMiddleware(app))
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        before = http_request_seconds.count("GET", "/teams/{team_id}")
+        await ac.get("/teams/123456")
+        await ac.get("/teams/654321")
+        await ac.get("/no/such/page")
+        await ac.get("/static/missing.js")
+        await ac.request("BREW", "/teams/123456")
+    assert http_request_seconds.count("GET", "/teams/{team_id}") == before + 2
+
+    transport = ASGITransport(app=scraper)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "123456" not in response.text
+    assert 'route="/teams/{team_id}",status="401"' in response.text
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"}' in (
+        response.text
+    )
+    assert 'route="/static/{path}"' in response.text
+    assert 'method="other",route="/teams/{team_id}"' in response.text
+    assert "BREW" not in response.text
+    assert "# TYPE db_pool_connections gauge" in response.text
+
+
+async def test_password_hashing_is_timed():
+    helper = AsyncPasswordHelper(workers=1)
+    before = password_hash_seconds.count("hash"), password_hash_seconds.count("verify")
+    hashed = await helper.hash_async("password")
+    await helper.verify_and_update_async("password", hashed)
+    helper.shutdown()
+    after = password_hash_seconds.count("hash"), password_hash_seconds.count("verify")
+    assert after == (before[0] + 1, before[1] + 1)
+
+
+async def test_pool_checkouts_are_timed(tmp_path):
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path}/pool.sqlite3")
+    name = engine.pool.name
+    assert "pool.sqlite3" in name
+    for _ in range(3):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    await engine.dispose()
+    assert engine.pool.name == name
+    assert pool_checkout_seconds.count(name) == 3
@@ -0,0 +1,100 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import insert
+
+from conftest import async_session_maker, auth_headers
+from src.teams.models import Team, UserTeam
+
+
+@pytest.fixture(scope="session")
+async def owner(create_users):
+    [user] = await create_users(
+        {"first_name": "Paginator", "last_name": "Owner", "email": "paginator@test.com"}
+    )
+    async with async_session_maker() as session:
+        team_ids = (
+            await session.scalars(
+                insert(Team)
+                .values(
+                    [
+                        {
+                            "title": f"Paged {title}",
+                            "project_name": "Pagination",
+                            "description": "",
+                            "owner_id": user.id,
+                        }
+                        for title in "GFEDCBA"
+                    ]
+                )
+                .returning(Team.id)
+            )
+        ).all()
+        await session.execute(
+            insert(UserTeam).values(
+                [{"user_id": user.id, "team_id": team_id} for team_id in team_ids]
+            )
+        )
+        await session.commit()
+    return await auth_headers(user)
+
+
+async def walk(ac: AsyncClient, url: str, headers: dict, **params):
+    pages = []
+    cursor = None
+    while True:
+        if cursor:
+            params["cursor"] = cursor
+        response = await ac.get(url, params={**params, "size": 3}, headers=headers)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = pages[-1]["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+async def test_teams_cursor_by_title(owner, ac: AsyncClient):
+    pages = await walk(
+        ac, "/teams/cursor", owner, project_name="Pagination", order="title"
+    )
+    titles = [[team["title"][-1] for team in page["items"]] for page in pages]
+    assert titles == [["A", "B", "C"], ["D", "E", "F"], ["G"]]
+    assert pages[0]["previous_cursor"] is None
+    assert pages[0]["total"] is None
+
+    response = await ac.get(
+        "/teams/cursor",
+        params={"cursor": pages[2]["previous_cursor"], "size": 3, "order": "title"},
+        headers=owner,
+    )
+    assert [team["title"][-1] for team in response.json()["items"]] == [
+        "D",
+        "E",
+        "F",
+    ]
+
+
+async def test_me_teams_cursor(owner, ac: AsyncClient):
+    pages = await walk(ac, "/users/me/teams/cursor", owner, include_total=True)
+    ids = [team["id"] for page in pages for team in page["items"]]
+    assert ids == sorted(ids)
+    assert len(ids) == 7
+    assert pages[0]["total"] == 7
+
+
+async def test_users_cursor(owner, ac: AsyncClient):
+    pages = await walk(ac, "/users/all/cursor", owner)
+    ids = [user["id"] for page in pages for user in page["items"]]
+    assert ids == sorted(set(ids))
+
+
+async def test_invalid_cursor(owner, ac: AsyncClient):
+    response = await ac.get(
+        "/teams/cursor", params={"cursor": "garbage"}, headers=owner
+    )
+    assert response.status_code == 400
+    assert response.json() == {"detail": "INVALID_CURSOR"}
+
+
+async def test_me_teams(owner, ac: AsyncClient):
+    response = await ac.get("/users/me/teams", headers=owner)
+    assert response.status_code == 200
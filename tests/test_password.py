@@ -0,0 +1,32 @@
+import asyncio
+
+from fastapi import HTTPException
+
+from src.accounts.password import AsyncPasswordHelper
+
+
+async def test_hash_and_verify_async():
+    helper = AsyncPasswordHelper(workers=2, max_pending=4)
+    hashed = await helper.hash_async("qwe123")
+
+    verified, _ = await helper.verify_and_update_async("qwe123", hashed)
+    assert verified is True
+    verified, _ = await helper.verify_and_update_async("wrong", hashed)
+    assert verified is False
+    assert helper.metrics()["calls"] == 3
+    helper.shutdown()
+
+
+async def test_hash_rejected_when_pool_saturated():
+    helper = AsyncPasswordHelper(workers=1, max_pending=1)
+    results = await asyncio.gather(
+        helper.hash_async("qwe123"),
+        helper.hash_async("qwe123"),
+        return_exceptions=True,
+    )
+
+    errors = [result for result in results if isinstance(result, HTTPException)]
+    assert len(errors) == 1
+    assert errors[0].status_code == 503
+    assert helper.metrics()["rejected"] == 1
+    helper.shutdown()
@@ -0,0 +1,286 @@
+import io
+
+import pytest
+from PIL import Image
+from httpx import AsyncClient
+from sqlalchemy import update
+
+from conftest import async_session_maker, auth_headers
+from src.accounts.models import User
+from src.accounts.photo_gc import PhotoCollector
+from src.accounts.photos import CONTENT_ADDRESSED_NAME, photo_files, photo_processor
+
+def image_bytes(image_format: str = "PNG", size: int = 64) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (size, size), (200, 40, 90)).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+@pytest.fixture(scope="session")
+async def photo_users(create_users) -> list:
+    return await create_users(
+        *(
+            {"first_name": "Photo", "last_name": "Upload", "email": email}
+            for email in ("photo@upload.com", "other.photo@upload.com")
+        )
+    )
+
+
+@pytest.fixture(scope="session")
+async def photo_headers(photo_users) -> dict:
+    return await auth_headers(photo_users[0])
+
+
+@pytest.fixture(scope="session")
+async def other_photo_headers(photo_users) -> dict:
+    return await auth_headers(photo_users[1])
+
+
+@pytest.fixture
+def photo_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(photo_processor, "directory", tmp_path)
+    return tmp_path
+
+
+async def test_upload_photo(photo_dir, photo_headers, ac: AsyncClient):
+    response = await ac.post(
+        "/users/me/upload_photo",
+        files={"file": ("avatar.png", image_bytes(), "image/png")},
+        headers=photo_headers,
+    )
+    assert response.status_code == 200
+    photo = response.json()["photo"]
+    assert photo.endswith(".png")
+    with Image.open(photo_dir / photo) as image:
+        assert image.format == "PNG"
+        assert image.size == (64, 64)
+
+    urls = response.json()["photo_urls"]
+    assert sorted(urls) == ["128", "48", "512"]
+    for size, formats in urls.items():
+        for image_format, url in formats.items():
+            assert url.startswith("/static/images/")
+            with Image.open(photo_dir / url.rsplit("/", 1)[1]) as image:
+                assert image.format == image_format.upper()
+                side = min(int(size), 64)
+                assert image.size == (side, side)
+
+
+async def test_variants_are_not_upscaled(photo_dir, photo_headers, ac: AsyncClient):
+    buffer = io.BytesIO()
+    Image.new("RGB", (100, 60), (10, 120, 30)).save(buffer, format="PNG")
+    response = await ac.post(
+        "/users/me/upload_photo",
+        files={"file": ("small.png", buffer.getvalue(), "image/png")},
+        headers=photo_headers,
+    )
+    assert response.status_code == 200
+    sizes = {}
+    for formats in response.json()["photo_urls"].values():
+        for url in formats.values():
+            with Image.open(photo_dir / url.rsplit("/", 1)[1]) as image:
+                sizes[url] = image.size
+    assert all(width <= 60 and height <= 60 for width, height in sizes.values())
+    assert sorted(set(sizes.values())) == [(48, 48), (60, 60)]
+
+
+async def test_same_image_is_stored_once(
+    photo_dir, photo_headers, other_photo_headers, ac: AsyncClient
+):
+    photos = []
+    for headers, filename in (
+        (photo_headers, "avatar.png"),
+        (other_photo_headers, "copy.PNG"),
+    ):
+        response = await ac.post(
+            "/users/me/upload_photo",
+            files={"file": (filename, image_bytes())},
+            headers=headers,
+        )
+        assert response.status_code == 200
+        photos.append(response.json()["photo"])
+    assert photos[0] == photos[1]
+    assert CONTENT_ADDRESSED_NAME.fullmatch(photos[0])
+    assert sorted(path.name for path in photo_dir.iterdir()) == sorted(
+        photo_files(photos[0])
+    )
+
+
+async def test_collector_removes_unreferenced_files(
+    photo_dir, photo_headers, other_photo_headers, ac: AsyncClient
+):
+    photos = {}
+    for headers, image_format in (
+        (photo_headers, "PNG"),
+        (other_photo_headers, "PNG"),
+        (photo_headers, "JPEG"),
+    ):
+        response = await ac.post(
+            "/users/me/upload_photo",
+            files={"file": (f"avatar.{image_format}", image_bytes(image_format))},
+            headers=headers,
+        )
+        photos[image_format] = response.json()["photo"]
+    # An orphaned variant and a legacy upload nobody refers to any more.
+    for name in (f"{'0' * 64}_48.webp", "ffb6fb3c-1eba-4f09-85b3-863311eb391f.jpg"):
+        (photo_dir / name).write_bytes(b"")
+    # Files not named like a stored photo are never collected.
+    untouched = ["tmpupload.png", f"{photos['PNG']}.br"]
+    for name in untouched:
+        (photo_dir / name).write_bytes(b"")
+
+    # Within the grace period nothing is touched.
+    collector = PhotoCollector(async_session_maker, photo_processor)
+    assert await collector.collect() == 0
+
+    # The PNG is still used by the other user; only the orphans go.
+    collector.grace_seconds = -1
+    assert await collector.collect() == 2
+    assert sorted(path.name for path in photo_dir.iterdir()) == sorted(
+        photo_files(photos["PNG"]) + photo_files(photos["JPEG"]) + untouched
+    )
+
+    response = await ac.post(
+        "/users/me/upload_photo",
+        files={"file": ("avatar.jpg", image_bytes("JPEG"))},
+        headers=other_photo_headers,
+    )
+    assert response.json()["photo"] == photos["JPEG"]
+    assert await collector.collect() == len(photo_files(photos["PNG"]))
+    assert sorted(path.name for path in photo_dir.iterdir()) == sorted(
+        photo_files(photos["JPEG"]) + untouched
+    )
+
+
+async def test_collector_restores_legacy_photos(
+    photo_dir, photo_headers, ac: AsyncClient
+):
+    legacy = "ffb6fb3c-1eba-4f09-85b3-863311eb391f.jpg"
+    (photo_dir / legacy).write_bytes(image_bytes("JPEG"))
+    async with async_session_maker() as session:
+        await session.execute(
+            update(User)
+            .where(User.email == "photo@upload.com")
+            .values(photo=legacy)
+        )
+        await session.commit()
+
+    collector = PhotoCollector(async_session_maker, photo_processor, grace_seconds=-1)
+    await collector.collect()
+
+    response = await ac.get("/users/me", headers=photo_headers)
+    photo = response.json()["photo"]
+    assert CONTENT_ADDRESSED_NAME.fullmatch(photo)
+    # The legacy file goes as soon as its users are moved off it.
+    assert sorted(path.name for path in photo_dir.iterdir()) == sorted(
+        photo_files(photo)
+    )
+
+
+async def test_upload_photo_too_large(photo_dir, photo_headers, ac: AsyncClient):
+    chunks_sent = 0
+
+    async def body():
+        nonlocal chunks_sent
+        yield (
+            b"--boundary\r\n"
+            b'Content-Disposition: form-data; name="file"; filename="big.png"\r\n'
+            b"Content-Type: image/png\r\n\r\n"
+        )
+        for _ in range(64):
+            chunks_sent += 1
+            yield b"\0" * 64 * 1024
+
+    # Streamed without a Content-Length, so the limit has to trip mid-body.
+    response = await ac.post(
+        "/users/me/upload_photo",
+        content=body(),
+        headers={
+            **photo_headers,
+            "Content-Type": "multipart/form-data; boundary=boundary",
+        },
+    )
+    assert response.status_code == 413
+    assert response.json() == {"detail": "UNSUPPORTED_FILE_SIZE"}
+    assert chunks_sent < 64
+    assert list(photo_dir.iterdir()) == []
+
+
+@pytest.mark.parametrize(
+    "filename, content, detail",
+    [
+        ("avatar.svg", b"<svg/>", "FILE_EXTENSION_NOT_ALLOWED"),
+        ("avatar.png", b"not an image", "INVALID_IMAGE"),
+        ("avatar.png", image_bytes("GIF"), "INVALID_IMAGE"),
+    ],
+)
+async def test_upload_photo_rejected(
+    filename, content, detail, photo_dir, photo_headers, ac: AsyncClient
+):
+    response = await ac.post(
+        "/users/me/upload_photo",
+        files={"file": (filename, content, "image/png")},
+        headers=photo_headers,
+    )
+    assert response.status_code == 400
+    assert response.json() == {"detail": detail}
+    assert list(photo_dir.iterdir()) == []
+
+
+async def test_upload_photo_too_many_pixels(
+    photo_dir, photo_headers, ac: AsyncClient
+):
+    buffer = io.BytesIO()
+    Image.new("1", (5000, 5000)).save(buffer, format="PNG")
+    assert len(buffer.getvalue()) < photo_processor.max_size
+    response = await ac.post(
+        "/users/me/upload_photo",
+        files={"file": ("huge.png", buffer.getvalue(), "image/png")},
+        headers=photo_headers,
+    )
+    assert response.status_code == 400
+    assert response.json() == {"detail": "INVALID_IMAGE"}
+    assert list(photo_dir.iterdir()) == []
+
+
+@pytest.mark.parametrize(
+    "request_kwargs, detail",
+    [
+        ({"json": {"file": "avatar.png"}}, "MULTIPART_REQUIRED"),
+        (
+            {
+                "content": b"--boundary--\r\n",
+                "headers": {"Content-Type": "multipart/form-data"},
+            },
+            "INVALID_MULTIPART_BODY",
+        ),
+        (
+            {
+                "data": {"note": "hello"},
+                "files": {"file": ("avatar.png", image_bytes(), "image/png")},
+            },
+            "INVALID_MULTIPART_BODY",
+        ),
+        (
+            {
+                "files": [
+                    ("file", ("one.png", image_bytes(), "image/png")),
+                    ("file", ("two.png", image_bytes(), "image/png")),
+                ]
+            },
+            "INVALID_MULTIPART_BODY",
+        ),
+    ],
+    ids=["json", "no-boundary", "extra-field", "two-files"],
+)
+async def test_upload_photo_malformed_body(
+    request_kwargs, detail, photo_dir, photo_headers, ac: AsyncClient
+):
+    request_kwargs = dict(request_kwargs)
+    headers = {**photo_headers, **request_kwargs.pop("headers", {})}
+    response = await ac.post(
+        "/users/me/upload_photo", headers=headers, **request_kwargs
+    )
+    assert response.status_code == 400
+    assert response.json() == {"detail": detail}
+    assert list(photo_dir.iterdir()) == []
@@ -0,0 +1,88 @@
+import logging
+
+from httpx import AsyncClient
+from sqlalchemy import insert, select
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from conftest import async_session_maker, auth_headers
+from src.metrics import REGISTRY
+from src.query_stats import QueryStatsMiddleware, collect_queries, query_metrics
+from src.teams.models import Team
+
+
+async def test_collectors_nest():
+    async with async_session_maker() as session:
+        with collect_queries() as outer:
+            await session.execute(select(Team.id).where(Team.id == 1))
+            with collect_queries() as inner:
+                for team_id in (1, 2, 2):
+                    await session.execute(select(Team.id).where(Team.id == team_id))
+    assert (outer.count, inner.count) == (4, 3)
+    assert outer.duration >= inner.duration > 0
+    assert list(inner.repeated(3).values()) == [3]
+    assert list(inner.duplicates().values()) == [2]
+    assert inner.slowest_statement is not None
+
+
+async def test_route_metrics(create_users, ac: AsyncClient):
+    [user] = await create_users(
+        {"first_name": "Query", "last_name": "Stats", "email": "query@stats.com"}
+    )
+    async with async_session_maker() as session:
+        team_id = await session.scalar(
+            insert(Team)
+            .values(title="Timed", project_name="Timed", description="", owner_id=0)
+            .returning(Team.id)
+        )
+        await session.commit()
+    headers = await auth_headers(user)
+
+    route = ("GET", "/teams/{team_id}")
+    before = query_metrics.metrics().get(route, {"requests": 0})
+    response = await ac.get(f"/teams/{team_id}", headers=headers)
+    assert response.status_code == 200
+    # Server-Timing is opt-in.
+    assert "server-timing" not in response.headers
+
+    after = query_metrics.metrics()[route]
+    assert after["requests"] == before["requests"] + 1
+    assert after["max_queries"] >= 2
+    assert after["slowest_statement"].startswith("SELECT")
+
+    exported = REGISTRY.render()
+    labels = '{method="GET",route="/teams/{team_id}"}'
+    assert f"db_route_requests_total{labels} {after['requests']}" in exported
+    assert f"db_route_max_queries{labels} {after['max_queries']}" in exported
+
+
+async def test_unknown_methods_share_one_route_entry(ac: AsyncClient):
+    for method in ("X0", "X1", "X2"):
+        response = await ac.request(method, "/teams/1")
+        assert response.status_code == 405
+    routes = query_metrics.metrics()
+    assert routes[("other", "/teams/{team_id}")]["requests"] >= 3
+    assert not any(method.startswith("X") for method, _ in routes)
+
+
+async def test_repeated_statement_is_logged(caplog):
+    async def n_plus_one(request):
+        async with async_session_maker() as session:
+            for team_id in range(3):
+                await session.execute(select(Team.id).where(Team.id == team_id))
+        return PlainTextResponse("ok")
+
+    app = QueryStatsMiddleware(
+        Starlette(routes=[Route("/loop", n_plus_one)]),
+        server_timing=True,
+        repeat_warning=3,
+    )
+    with caplog.at_level(logging.WARNING, logger="src.query_stats"):
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get("/loop")
+    database, slowest = response.headers["server-timing"].split(", ")
+    assert database.startswith("db;dur=")
+    assert database.endswith('desc="3 queries"')
+    assert slowest.startswith("db-slowest;dur=")
+    assert "likely an N+1" in caplog.text
@@ -0,0 +1,155 @@
+import asyncio
+import os
+import time
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import insert
+from sqlalchemy.pool import NullPool
+
+from conftest import async_session_maker, auth_headers, engine_test, metadata
+from src.database import build_engine, read_router
+from src.replicas import ReplicaRouter
+from src.teams.models import Team
+
+REPLICA_FILES = ["test_replica1.sqlite3", "test_replica2.sqlite3"]
+
+
+@pytest.fixture(scope="session")
+async def replicas():
+    """Two empty SQLite databases standing in for replicas that lag behind."""
+    engines = [
+        build_engine(f"sqlite+aiosqlite:///./{name}", poolclass=NullPool)
+        for name in REPLICA_FILES
+    ]
+    for engine in engines:
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+    yield engines
+    for engine, name in zip(engines, REPLICA_FILES):
+        await engine.dispose()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(name + suffix):
+                os.remove(name + suffix)
+
+
+async def test_round_robin(replicas):
+    router = ReplicaRouter(engine_test, replicas, strategy="round_robin")
+    chosen = [await router.select() for _ in range(4)]
+    assert chosen == [replicas[0], replicas[1], replicas[0], replicas[1]]
+
+
+async def test_least_connections(replicas):
+    router = ReplicaRouter(engine_test, replicas, strategy="least_connections")
+    async with router.session(await router.select()) as session:
+        assert session.bind is replicas[0]
+        assert await router.select() is replicas[1]
+    assert await router.select() is replicas[0]
+
+
+async def test_unknown_strategy(replicas):
+    with pytest.raises(ValueError):
+        ReplicaRouter(engine_test, replicas, strategy="random")
+
+
+async def test_sticky_after_write(replicas):
+    router = ReplicaRouter(engine_test, replicas[:1], sticky_seconds=0.05)
+    router.mark_write("1")
+    assert await router.select("1") is engine_test
+    assert await router.select("2") is replicas[0]
+    await asyncio.sleep(0.06)
+    assert await router.select("1") is replicas[0]
+
+
+async def test_lagging_replica_falls_back_to_primary(replicas):
+    lag = {replicas[0]: 30.0, replicas[1]: 0.5}
+
+    async def probe(connection):
+        return lag[connection.engine]
+
+    router = ReplicaRouter(
+        engine_test, replicas, max_lag=5, lag_check_interval=0, lag_probe=probe
+    )
+    assert [await router.select() for _ in range(2)] == [replicas[1]] * 2
+
+    lag[replicas[1]] = 60.0
+    assert await router.select() is engine_test
+
+    lag[replicas[0]] = 1.0
+    assert await router.select() is replicas[0]
+
+
+async def test_unreachable_replica_falls_back_to_primary(replicas):
+    async def probe(connection):
+        raise ConnectionError("replica down")
+
+    router = ReplicaRouter(engine_test, replicas, lag_probe=probe)
+    assert await router.select() is engine_test
+    assert router.metrics()["lag"] == {str(engine.url): None for engine in replicas}
+
+
+async def test_slow_replica_falls_back_to_primary(replicas):
+    async def probe(connection):
+        if connection.engine is replicas[0]:
+            await asyncio.sleep(10)
+        return 0.0
+
+    router = ReplicaRouter(
+        engine_test, replicas[:1], lag_check_timeout=0.05, lag_probe=probe
+    )
+    start = time.monotonic()
+    assert await router.select() is engine_test
+    assert time.monotonic() - start < 1
+    assert router.metrics()["lag"] == {str(replicas[0].url): None}
+
+    router.replicas = list(replicas)
+    assert await router.select() is replicas[1]
+
+
+@pytest.fixture
+async def routed_to_replica(replicas, monkeypatch):
+    monkeypatch.setattr(read_router, "replicas", replicas[:1])
+    monkeypatch.setattr(read_router, "_sticky", {})
+
+
+async def test_reads_see_own_writes(
+    routed_to_replica, create_users, ac: AsyncClient
+):
+    writer, reader = await create_users(
+        *(
+            {
+                "first_name": name,
+                "last_name": "Replica",
+                "email": f"{name.lower()}@replica.com",
+            }
+            for name in ("Writer", "Reader")
+        )
+    )
+    async with async_session_maker() as session:
+        team_id = await session.scalar(
+            insert(Team)
+            .values(
+                title="Replicated",
+                project_name="Replicated",
+                description="",
+                owner_id=reader.id,
+            )
+            .returning(Team.id)
+        )
+        await session.commit()
+    writer_headers = await auth_headers(writer)
+    reader_headers = await auth_headers(reader)
+
+    # The replica has not caught up with the new team yet.
+    response = await ac.get(f"/teams/{team_id}", headers=writer_headers)
+    assert response.json() == {"detail": "DOES_NOT_EXIST"}
+
+    response = await ac.post(f"/teams/join/{team_id}", headers=writer_headers)
+    assert response.status_code == 200
+
+    response = await ac.get(f"/teams/{team_id}", headers=writer_headers)
+    assert response.status_code == 200
+    assert writer.id in [member["id"] for member in response.json()["members"]]
+
+    response = await ac.get(f"/teams/{team_id}", headers=reader_headers)
+    assert response.json() == {"detail": "DOES_NOT_EXIST"}
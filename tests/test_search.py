@@ -0,0 +1,85 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import insert, select
+
+from conftest import async_session_maker, auth_headers
+from src.teams.models import Team
+
+
+@pytest.fixture(scope="session")
+async def headers(create_users):
+    user, *_ = await create_users(
+        *(
+            {
+                "first_name": first_name,
+                "last_name": last_name,
+                "email": f"{first_name.lower()}@search.com",
+            }
+            for first_name, last_name in (
+                ("Searcher", "Owner"),
+                ("Robert", "Stone"),
+                ("Alice", "Roberts"),
+            )
+        )
+    )
+    async with async_session_maker() as session:
+        await session.execute(
+            insert(Team).values(
+                [
+                    {
+                        "title": title,
+                        "project_name": project_name,
+                        "description": description,
+                        "owner_id": user.id,
+                    }
+                    for title, project_name, description in (
+                        ("Rocketeers", "Rocket launcher", "We build rockets"),
+                        ("Gardeners", "Greenhouse", "Rocket salad"),
+                        ("Al team", "Helper", "Algorithms"),
+                    )
+                ]
+            )
+        )
+        await session.commit()
+    return await auth_headers(user)
+
+
+async def test_search_teams_ranked(headers, ac: AsyncClient):
+    response = await ac.get("/search/teams", params={"q": "rocket"}, headers=headers)
+    assert response.status_code == 200
+    titles = [team["title"] for team in response.json()["items"]]
+    assert titles == ["Rocketeers", "Gardeners"]
+
+
+async def test_filter_teams_by_title(headers, ac: AsyncClient):
+    response = await ac.get("/teams", params={"title": "ocketee"}, headers=headers)
+    assert [team["title"] for team in response.json()["items"]] == ["Rocketeers"]
+
+    # Terms shorter than a trigram fall back to LIKE.
+    response = await ac.get("/teams", params={"title": "Al"}, headers=headers)
+    assert [team["title"] for team in response.json()["items"]] == ["Al team"]
+
+
+async def test_filter_users_by_full_name(headers, ac: AsyncClient):
+    response = await ac.get(
+        "/users/all", params={"full_name": "robert"}, headers=headers
+    )
+    emails = {user["email"] for user in response.json()["items"]}
+    assert emails == {"robert@search.com", "alice@search.com"}
+
+    response = await ac.get(
+        "/users/all", params={"full_name": "Robert Stone"}, headers=headers
+    )
+    assert [user["email"] for user in response.json()["items"]] == [
+        "robert@search.com"
+    ]
+
+
+async def test_search_index_follows_updates(headers, ac: AsyncClient):
+    async with async_session_maker() as session:
+        team = await session.scalar(select(Team).where(Team.title == "Gardeners"))
+        team.description = "Tomatoes"
+        await session.commit()
+
+    response = await ac.get("/search/teams", params={"q": "rocket"}, headers=headers)
+    assert [team["title"] for team in response.json()["items"]] == ["Rocketeers"]
@@ -0,0 +1,108 @@
+import gzip
+
+import pytest
+from httpx import AsyncClient
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+from src.static import CachedStaticFiles, parse_range
+
+PHOTO = "0" * 64 + "_48.webp"
+SCRIPT = "app.js"
+BODY = b"console.log('static');\n" * 100
+
+
+@pytest.fixture(scope="session")
+async def static(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp("static")
+    (tmp_path / PHOTO).write_bytes(bytes(range(256)))
+    (tmp_path / SCRIPT).write_bytes(BODY)
+    (tmp_path / f"{SCRIPT}.gz").write_bytes(gzip.compress(BODY))
+    app = Starlette(routes=[Mount("/static", CachedStaticFiles(directory=tmp_path))])
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+
+
+async def test_content_addressed_files_are_immutable(static: AsyncClient):
+    response = await static.get(f"/static/{PHOTO}")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert response.headers["etag"] == '"' + PHOTO.split(".")[0] + '"'
+    assert response.headers["content-type"] == "image/webp"
+
+    response = await static.get(f"/static/{SCRIPT}")
+    assert response.headers["cache-control"] == "no-cache"
+
+
+async def test_if_none_match(static: AsyncClient):
+    etag = (await static.get(f"/static/{PHOTO}")).headers["etag"]
+    response = await static.get(f"/static/{PHOTO}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert "immutable" in response.headers["cache-control"]
+
+
+async def test_precompressed_sibling(static: AsyncClient):
+    response = await static.get(
+        f"/static/{SCRIPT}", headers={"Accept-Encoding": "br, gzip"}
+    )
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["content-type"].startswith("text/javascript")
+    assert int(response.headers["content-length"]) < len(BODY)
+    assert response.content == BODY
+
+    response = await static.get(
+        f"/static/{SCRIPT}", headers={"Accept-Encoding": "gzip;q=0"}
+    )
+    assert "content-encoding" not in response.headers
+    assert response.content == BODY
+
+
+@pytest.mark.parametrize(
+    "header, status_code, content",
+    [
+        ("bytes=10-19", 206, bytes(range(10, 20))),
+        ("bytes=250-", 206, bytes(range(250, 256))),
+        ("bytes=-4", 206, bytes(range(252, 256))),
+        ("bytes=0-0,5-6", 200, bytes(range(256))),
+        ("bytes=300-", 416, b""),
+    ],
+)
+async def test_range(header, status_code, content, static: AsyncClient):
+    response = await static.get(f"/static/{PHOTO}", headers={"Range": header})
+    assert response.status_code == status_code
+    assert response.content == content
+    if status_code == 206:
+        start = content[0]
+        end = content[-1]
+        assert response.headers["content-range"] == f"bytes {start}-{end}/256"
+
+
+async def test_range_with_stale_if_range(static: AsyncClient):
+    response = await static.get(
+        f"/static/{PHOTO}", headers={"Range": "bytes=0-9", "If-Range": '"other"'}
+    )
+    assert response.status_code == 200
+    assert len(response.content) == 256
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("bytes=0-99", (0, 99)),
+        ("bytes=90-200", (90, 99)),
+        ("bytes=-0", ValueError),
+        ("bytes=100-", ValueError),
+        ("bytes=5-1", None),
+        ("items=0-1", None),
+        ("bytes=a-b", None),
+    ],
+)
+def test_parse_range(header, expected):
+    if expected is ValueError:
+        with pytest.raises(ValueError):
+            parse_range(header, 100)
+    else:
+        assert parse_range(header, 100) == expected
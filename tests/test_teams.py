@@ -0,0 +1,421 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, insert, select, update
+
+from conftest import async_session_maker, auth_headers
+from src.teams import crud
+from src.teams.models import Team, UserTeam
+from src.teams.schemas import Membership
+
+
+@pytest.fixture(scope="session")
+async def members(create_users):
+    users = await create_users(
+        *(
+            {
+                "first_name": f"Member{index}",
+                "last_name": "Teams",
+                "email": f"member{index}@teams.com",
+            }
+            for index in range(8)
+        )
+    )
+    user_ids = [user.id for user in users]
+    async with async_session_maker() as session:
+        team_ids = (
+            await session.scalars(
+                insert(Team)
+                .values(
+                    [
+                        {
+                            "title": f"Crowded {index}",
+                            "project_name": "Crowded",
+                            "description": "",
+                            "owner_id": user_ids[0],
+                            "member_count": 6,
+                        }
+                        for index in range(6)
+                    ]
+                )
+                .returning(Team.id)
+            )
+        ).all()
+        await session.execute(
+            insert(UserTeam).values(
+                [
+                    {"user_id": user_id, "team_id": team_id}
+                    for team_id in team_ids
+                    for user_id in user_ids[:6]
+                ]
+            )
+        )
+        await session.commit()
+    return user_ids
+
+
+@pytest.mark.parametrize("size", [2, 6])
+async def test_teams_page_query_count(
+    members, size, query_budget, ac: AsyncClient
+):
+    headers = await auth_headers(members[0])
+    # Warm the user cache so only the listing itself is counted.
+    await ac.get("/users/me", headers=headers)
+
+    with query_budget(3):
+        response = await ac.get(
+            "/teams",
+            params={"project_name": "Crowded", "size": size},
+            headers=headers,
+        )
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert len(items) == size
+    assert all(len(team["members"]) == 6 for team in items)
+
+
+async def test_team_detail_query_count(members, query_budget, ac: AsyncClient):
+    headers = await auth_headers(members[0])
+    await ac.get("/users/me", headers=headers)
+    async with async_session_maker() as session:
+        team_id = await session.scalar(
+            select(Team.id).where(Team.project_name == "Crowded").limit(1)
+        )
+
+    with query_budget(2):
+        response = await ac.get(f"/teams/{team_id}", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()["members"]) == 6
+
+
+async def test_team_detail_etag(members, query_budget, ac: AsyncClient):
+    headers = await auth_headers(members[1])
+    async with async_session_maker() as session:
+        team_id = await session.scalar(
+            select(Team.id)
+            .where(Team.project_name == "Crowded")
+            .order_by(Team.id.desc())
+            .limit(1)
+        )
+    response = await ac.get(f"/teams/{team_id}", headers=headers)
+    etag = response.headers["etag"]
+
+    # Only the version check; the members are never loaded.
+    with query_budget(1):
+        response = await ac.get(
+            f"/teams/{team_id}", headers={**headers, "If-None-Match": etag}
+        )
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+    # A member renaming themselves changes the team representation too.
+    await ac.patch("/users/me", json={"last_name": "Renamed"}, headers=headers)
+    response = await ac.get(
+        f"/teams/{team_id}", headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    etag = response.headers["etag"]
+
+    async with async_session_maker() as session:
+        await session.execute(
+            update(Team).where(Team.id == team_id).values(description="Edited")
+        )
+        await session.commit()
+    response = await ac.get(
+        f"/teams/{team_id}", headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["description"] == "Edited"
+
+
+async def test_remove_member_query_budget(members, query_budget, ac: AsyncClient):
+    owner, member = members[0], members[7]
+    async with async_session_maker() as session:
+        team_id = await session.scalar(
+            insert(Team)
+            .values(
+                title="Budget",
+                project_name="Budget",
+                description="",
+                owner_id=owner,
+                member_count=2,
+            )
+            .returning(Team.id)
+        )
+        await session.execute(
+            insert(UserTeam).values(
+                [
+                    {"user_id": user_id, "team_id": team_id}
+                    for user_id in (owner, member)
+                ]
+            )
+        )
+        await session.commit()
+    headers = await auth_headers(owner)
+    await ac.get("/users/me", headers=headers)
+
+    with query_budget(4):
+        response = await ac.delete(
+            f"/teams/remove_member/{team_id}/{member}", headers=headers
+        )
+    assert response.status_code == 200
+    assert [user["id"] for user in response.json()["members"]] == [owner]
+    assert response.json()["member_count"] == 1
+
+
+async def test_join_and_leave_team(members, query_budget, ac: AsyncClient):
+    headers = await auth_headers(members[6])
+    async with async_session_maker() as session:
+        team_id = await session.scalar(
+            select(Team.id).where(Team.project_name == "Crowded").limit(1)
+        )
+
+    # Cached user, then UPDATE ... RETURNING, INSERT and the member list.
+    with query_budget(4):
+        response = await ac.post(f"/teams/join/{team_id}", headers=headers)
+    assert response.status_code == 200
+    assert members[6] in [member["id"] for member in response.json()["members"]]
+    assert response.json()["member_count"] == 7
+
+    response = await ac.post(f"/teams/join/{team_id}", headers=headers)
+    assert response.status_code == 403
+    assert response.json() == {"detail": "ALREADY_IN_TEAM"}
+
+    response = await ac.post(f"/teams/join/{10**6}", headers=headers)
+    assert response.status_code == 404
+    assert response.json() == {"detail": f"Team {10**6} not found!"}
+
+    response = await ac.delete(f"/teams/leave/{team_id}", headers=headers)
+    assert response.status_code == 200
+    assert members[6] not in [member["id"] for member in response.json()["members"]]
+    assert response.json()["member_count"] == 6
+
+
+async def test_create_team_requires_finished_teams(
+    members, query_budget, ac: AsyncClient
+):
+    headers = await auth_headers(members[7])
+    team_in = {"title": "Side project", "project_name": "Side", "description": ""}
+
+    response = await ac.post("/teams", json=team_in, headers=headers)
+    assert response.status_code == 201
+    team_id = response.json()["id"]
+
+    with query_budget(1):
+        response = await ac.post("/teams", json=team_in, headers=headers)
+    assert response.status_code == 403
+    assert response.json() == {"detail": "CANNOT_CREATE_TEAM"}
+
+    response = await ac.patch(
+        f"/teams/{team_id}", json={"status": "Ready"}, headers=headers
+    )
+    assert response.status_code == 200
+    response = await ac.post("/teams", json=team_in, headers=headers)
+    assert response.status_code == 201
+
+
+async def test_concurrent_joins_respect_capacity(create_users, ac: AsyncClient):
+    users = await create_users(
+        *(
+            {
+                "first_name": f"Racer{index}",
+                "last_name": "Teams",
+                "email": f"racer{index}@teams.com",
+            }
+            for index in range(21)
+        )
+    )
+    async with async_session_maker() as session:
+        team_id = await session.scalar(
+            insert(Team)
+            .values(
+                title="Race",
+                project_name="Race",
+                description="",
+                owner_id=users[0].id,
+                member_count=1,
+            )
+            .returning(Team.id)
+        )
+        await session.execute(
+            insert(UserTeam).values(user_id=users[0].id, team_id=team_id)
+        )
+        await session.commit()
+    headers = [await auth_headers(user) for user in users[1:]]
+
+    responses = await asyncio.gather(
+        *(ac.post(f"/teams/join/{team_id}", headers=h) for h in headers)
+    )
+    codes = sorted(response.status_code for response in responses)
+    assert codes == [200] * 7 + [400] * 13
+    assert all(
+        response.json() == {"detail": "MAX_MEMBERS"}
+        for response in responses
+        if response.status_code == 400
+    )
+
+    async with async_session_maker() as session:
+        team = await session.get(Team, team_id)
+        members = await session.scalar(
+            select(func.count()).where(UserTeam.team_id == team_id)
+        )
+    assert team.member_count == members == Team.MAX_TEAM_MEMBERS
+
+
+async def test_bulk_membership(create_users, query_budget, ac: AsyncClient):
+    users = await create_users(
+        *(
+            {
+                "first_name": f"Cohort{index}",
+                "last_name": "Teams",
+                "email": f"cohort{index}@teams.com",
+                "is_superuser": index == 1,
+            }
+            for index in range(12)
+        )
+    )
+    owner, admin, *cohort = [user.id for user in users]
+    async with async_session_maker() as session:
+        own_team, other_team = (
+            await session.scalars(
+                insert(Team)
+                .values(
+                    [
+                        {
+                            "title": f"Cohort {owner_id}",
+                            "project_name": "Cohort",
+                            "description": "",
+                            "owner_id": owner_id,
+                            "member_count": 1,
+                        }
+                        for owner_id in (owner, admin)
+                    ]
+                )
+                .returning(Team.id)
+            )
+        ).all()
+        await session.execute(
+            insert(UserTeam).values(
+                [
+                    {"user_id": owner, "team_id": own_team},
+                    {"user_id": admin, "team_id": other_team},
+                ]
+            )
+        )
+        await session.commit()
+    headers = await auth_headers(owner)
+    await ac.get("/users/me", headers=headers)
+
+    items = [{"user_id": user_id, "team_id": own_team} for user_id in cohort[:8]]
+    items += [
+        {"user_id": cohort[0], "team_id": own_team},
+        {"user_id": cohort[0], "team_id": other_team},
+        {"user_id": cohort[0], "team_id": 10**6},
+        {"user_id": 10**6, "team_id": own_team},
+    ]
+    # Three reads, the seat UPDATE and one multi-row INSERT.
+    with query_budget(5):
+        response = await ac.post(
+            "/teams/bulk/add_members", json={"items": items}, headers=headers
+        )
+    assert response.status_code == 200
+    body = response.json()
+    assert [result["detail"] for result in body["results"]] == [None] * 7 + [
+        "MAX_MEMBERS",
+        "DUPLICATE_ITEM",
+        "NOT_OWNER",
+        "DOES_NOT_EXIST",
+        "USER_NOT_EXIST",
+    ]
+    assert (body["succeeded"], body["failed"]) == (7, 5)
+
+    items = [
+        {"user_id": cohort[0], "team_id": own_team},
+        {"user_id": cohort[1], "team_id": own_team},
+        {"user_id": owner, "team_id": own_team},
+        {"user_id": cohort[9], "team_id": own_team},
+    ]
+    response = await ac.post(
+        "/teams/bulk/remove_members", json={"items": items}, headers=headers
+    )
+    assert [result["detail"] for result in response.json()["results"]] == [
+        None,
+        None,
+        "OWNER_CANNOT_LEAVE",
+        "NOT_TEAM_MEMBER",
+    ]
+
+    response = await ac.post(
+        "/teams/bulk/add_members",
+        json={"items": [{"user_id": cohort[9], "team_id": other_team}]},
+        headers=await auth_headers(admin),
+    )
+    assert response.json()["succeeded"] == 1
+
+    async with async_session_maker() as session:
+        for team_id, expected in ((own_team, 6), (other_team, 2)):
+            team = await session.get(Team, team_id)
+            members = await session.scalar(
+                select(func.count()).where(UserTeam.team_id == team_id)
+            )
+            assert team.member_count == members == expected
+
+
+async def test_bulk_add_races_a_join(create_users, monkeypatch):
+    owner, racer, *cohort = await create_users(
+        *(
+            {
+                "first_name": f"Overlap{index}",
+                "last_name": "Teams",
+                "email": f"overlap{index}@teams.com",
+            }
+            for index in range(8)
+        )
+    )
+    async with async_session_maker() as session:
+        team_id = await session.scalar(
+            insert(Team)
+            .values(
+                title="Overlap",
+                project_name="Overlap",
+                description="",
+                owner_id=owner.id,
+                member_count=1,
+            )
+            .returning(Team.id)
+        )
+        await session.execute(
+            insert(UserTeam).values(user_id=owner.id, team_id=team_id)
+        )
+        await session.commit()
+
+    load_memberships = crud._load_memberships
+
+    async def join_after_read(session, items):
+        loaded = await load_memberships(session, items)
+        async with async_session_maker() as other:
+            await crud.join_team(team_id, racer, other)
+        return loaded
+
+    # The racer joins between the reads and the writes, taking one of the
+    # seven seats the batch was validated against.
+    monkeypatch.setattr(crud, "_load_memberships", join_after_read)
+    items = [
+        Membership(user_id=user.id, team_id=team_id) for user in [racer, *cohort]
+    ]
+    async with async_session_maker() as session:
+        result = await crud.bulk_add_members(session, items, owner)
+    assert [item.detail for item in result.results] == [
+        "ALREADY_IN_TEAM",
+        *[None] * 5,
+        "MAX_MEMBERS",
+    ]
+
+    async with async_session_maker() as session:
+        team = await session.get(Team, team_id)
+        members = await session.scalar(
+            select(func.count()).where(UserTeam.team_id == team_id)
+        )
+    assert team.member_count == members == 7
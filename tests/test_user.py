@@ -5,6 +5,7 @@ from fastapi_users.authentication import JWTStrategy
 from fastapi_users.password import PasswordHelper
 from httpx import AsyncClient
 from sqlalchemy import insert
+from src.accounts.cache import CachedUserDatabase, user_cache
 from src.accounts.schemas import UserRead
 from conftest import async_session_maker
 from src.accounts.crud import get_user
@@ -51,3 +52,64 @@ class TestUser:
         assert create_user.is_active is not None
         assert create_user.is_verified is not None
         assert create_user.is_superuser is not None
+
+    async def test_user_me_cached(self, write_user_token, ac: AsyncClient):
+        user_cache.clear()
+        hits = user_cache.hits
+        for _ in range(2):
+            response = await ac.get(
+                "/users/me",
+                headers={"Authorization": "Bearer " + write_user_token},
+            )
+            assert response.status_code == 200
+        assert user_cache.hits == hits + 1
+
+    async def test_update_me_invalidates_cache(self, write_user_token, ac: AsyncClient):
+        headers = {"Authorization": "Bearer " + write_user_token}
+        await ac.get("/users/me", headers=headers)
+
+        response = await ac.patch(
+            "/users/me", json={"contact": "@test"}, headers=headers
+        )
+        assert response.status_code == 200
+
+        response = await ac.get("/users/me", headers=headers)
+        assert response.json()["contact"] == "@test"
+
+    async def test_update_invalidates_after_commit(self, create_user, monkeypatch):
+        async with async_session_maker() as session, async_session_maker() as other:
+            user_db = CachedUserDatabase(session, User)
+            user = await user_db.get(create_user.id)
+            commit = session.commit
+
+            async def commit_after_read():
+                # Another request reads the user before the UPDATE commits.
+                await CachedUserDatabase(other, User).get(user.id)
+                await commit()
+
+            monkeypatch.setattr(session, "commit", commit_after_read)
+            await user_db.update(user, {"contact": "@race"})
+
+        assert user_cache.get(create_user.id) is None
+
+    async def test_user_me_etag(self, write_user_token, ac: AsyncClient):
+        headers = {"Authorization": "Bearer " + write_user_token}
+        response = await ac.get("/users/me", headers=headers)
+        etag = response.headers["etag"]
+        assert etag.startswith('W/"user-')
+
+        response = await ac.get("/users/me", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+
+        await ac.patch("/users/me", json={"contact": "@etag"}, headers=headers)
+        response = await ac.get("/users/me", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+        user_id = response.json()["id"]
+        response = await ac.get(
+            f"/users/{user_id}",
+            headers={**headers, "If-None-Match": response.headers["etag"]},
+        )
+        assert response.status_code == 304